@@ -17,7 +17,9 @@
 from oslo_config import cfg
 import pecan
 
-from lbaas.db.v1 import api as db_api
+from lbaas.api import hooks
+from lbaas.api import middleware
+from lbaas.utils import rest_utils
 
 
 def get_pecan_config():
@@ -41,12 +43,29 @@ def setup_app(config=None):
 
     app_conf = dict(config.app)
 
-    db_api.setup_db()
+    app_hooks = [
+        hooks.ETagHook(),
+        hooks.NegotiationHook(),
+        hooks.MsgPackHook()
+    ]
+
+    if (cfg.CONF.database.slave_connection and
+            cfg.CONF.lbaas.primary_read_window):
+        app_hooks.insert(0, hooks.ReadYourWritesHook())
 
     app = pecan.make_app(
         app_conf.pop('root'),
         logging=getattr(config, 'logging', {}),
+        hooks=app_hooks,
+        custom_renderers=rest_utils.RENDERERS,
         **app_conf
     )
 
+    if cfg.CONF.api.compress_responses:
+        app = middleware.GzipMiddleware(
+            app,
+            min_size=cfg.CONF.api.compress_min_size,
+            level=cfg.CONF.api.compress_level
+        )
+
     return app
@@ -14,6 +14,8 @@
 
 import json
 
+import six
+from six.moves.urllib import parse
 from wsme import types as wtypes
 
 
@@ -22,13 +24,27 @@ class Resource(wtypes.Base):
 
     _wsme_attributes = []
 
+    @classmethod
+    def _get_attribute_names(cls):
+        """Returns the attribute names of the class, listed once."""
+        names = cls.__dict__.get('_attribute_names')
+
+        if names is None:
+            names = tuple(
+                attr.key for attr in wtypes.list_attributes(cls)
+            )
+
+            cls._attribute_names = names
+
+        return names
+
     def to_dict(self):
         d = {}
 
-        for attr in self._wsme_attributes:
-            attr_val = getattr(self, attr.name)
+        for key in self._get_attribute_names():
+            attr_val = getattr(self, key)
             if not isinstance(attr_val, wtypes.UnsetType):
-                d[attr.name] = attr_val
+                d[key] = attr_val
 
         return d
 
@@ -36,8 +52,10 @@ class Resource(wtypes.Base):
     def from_dict(cls, d):
         obj = cls()
 
-        for key, val in d.items():
-            if hasattr(obj, key):
+        names = cls._get_attribute_names()
+
+        for key, val in six.iteritems(d):
+            if key in names:
                 setattr(obj, key, val)
 
         return obj
@@ -63,9 +81,7 @@ class Resource(wtypes.Base):
 
     @classmethod
     def get_fields(cls):
-        obj = cls()
-
-        return [attr.name for attr in obj._wsme_attributes]
+        return [attr.name for attr in wtypes.list_attributes(cls)]
 
 
 class ResourceList(Resource):
@@ -103,25 +119,23 @@ class ResourceList(Resource):
         if not self.has_next(limit):
             return wtypes.Unset
 
-        q_args = ''.join(
-            ['%s=%s&' % (key, value) for key, value in kwargs.items()]
-        )
-
-        resource_args = (
-            '?%(args)slimit=%(limit)d&marker=%(marker)s' %
-            {
-                'args': q_args,
-                'limit': limit,
-                'marker': self.collection[-1].id
-            }
-        )
+        params = list(kwargs.items())
+        params += [('limit', limit), ('marker', self.collection[-1].id)]
 
         # Fields is handled specially here, we can move it above when it's
         # supported by all resources query.
         if fields:
-            resource_args += '&fields=%s' % fields
+            params.append(('fields', fields))
 
-        next_link = "%(host_url)s/v2/%(resource)s%(args)s" % {
+        if six.PY2:
+            params = [
+                (k, v.encode('utf-8') if isinstance(v, six.text_type) else v)
+                for k, v in params
+            ]
+
+        resource_args = '?' + parse.urlencode(params)
+
+        next_link = "%(host_url)s/v1/%(resource)s%(args)s" % {
             'host_url': url,
             'resource': self._type,
             'args': resource_args
@@ -132,14 +146,14 @@ class ResourceList(Resource):
     def to_dict(self):
         d = {}
 
-        for attr in self._wsme_attributes:
-            attr_val = getattr(self, attr.name)
+        for key in self._get_attribute_names():
+            attr_val = getattr(self, key)
 
             if isinstance(attr_val, list):
-                if isinstance(attr_val[0], Resource):
-                    d[attr.name] = [v.to_dict() for v in attr_val]
+                if attr_val and isinstance(attr_val[0], Resource):
+                    d[key] = [v.to_dict() for v in attr_val]
             elif not isinstance(attr_val, wtypes.UnsetType):
-                d[attr.name] = attr_val
+                d[key] = attr_val
 
         return d
 
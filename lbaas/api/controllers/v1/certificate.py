@@ -0,0 +1,154 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from oslo_log import log as logging
+from pecan import rest
+from wsme import types as wtypes
+import wsmeext.pecan as wsme_pecan
+
+from lbaas.api.controllers import resource
+from lbaas.db.v1 import api as db_api
+from lbaas.drivers import driver
+from lbaas import exceptions
+from lbaas.utils import rest_utils
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Certificate(resource.Resource):
+    """Certificate resource.
+
+    'content' is a PEM bundle with certificate chain and private key.
+    It is accepted on create and update but never returned back.
+    """
+
+    id = wtypes.text
+    name = wtypes.text
+    description = wtypes.text
+
+    listener_name = wtypes.text
+    content = wtypes.text
+    fingerprint = wtypes.text
+    sni = [wtypes.text]
+
+    created_at = wtypes.text
+    updated_at = wtypes.text
+
+    @classmethod
+    def from_db_model(cls, db_model):
+        certificate = cls.from_dict(db_model.to_dict())
+        certificate.content = wtypes.Unset
+
+        return certificate
+
+
+class Certificates(resource.Resource):
+    """A collection of Certificates."""
+
+    certificates = [Certificate]
+
+
+class CertificatesController(rest.RestController):
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Certificate, wtypes.text)
+    def get(self, name):
+        """Return the named certificate."""
+        LOG.info("Fetch certificate [name=%s]" % name)
+
+        db_model = db_api.get_certificate(name)
+
+        return Certificate.from_db_model(db_model)
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Certificate, wtypes.text, body=Certificate)
+    def put(self, name, certificate):
+        """Update a certificate.
+
+        Updating the content is how a certificate gets renewed.
+        """
+        LOG.info("Update certificate [name=%s]" % name)
+
+        values = certificate.to_dict()
+        values.pop('listener_name', None)
+        values.pop('fingerprint', None)
+
+        lb_driver = driver.LB_DRIVER()
+
+        with db_api.transaction():
+            certificate = db_api.update_certificate(name, values)
+            db_model = lb_driver.update_certificate(certificate)
+
+        lb_driver.apply_changes()
+
+        return Certificate.from_db_model(db_model)
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Certificate, body=Certificate, status_code=201)
+    def post(self, certificate):
+        """Create a new certificate."""
+        LOG.info("Create certificate [name=%s]" % certificate.name)
+
+        if not (certificate.name and certificate.content
+                and certificate.listener_name):
+            raise exceptions.InputException(
+                'You must provide at least name, content and '
+                'listener_name of the certificate.'
+            )
+
+        values = certificate.to_dict()
+        values.pop('fingerprint', None)
+        listener_name = values.pop('listener_name')
+
+        lb_driver = driver.LB_DRIVER()
+
+        with db_api.transaction():
+            listener = db_api.get_listener(listener_name)
+
+            values['listener_id'] = listener.id
+
+            certificate = db_api.create_certificate(values)
+            db_model = lb_driver.create_certificate(certificate)
+
+        lb_driver.apply_changes()
+
+        return Certificate.from_db_model(db_model)
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(None, wtypes.text, status_code=204)
+    def delete(self, name):
+        """Delete the named certificate."""
+        LOG.info("Delete certificate [name=%s]" % name)
+
+        lb_driver = driver.LB_DRIVER()
+
+        with db_api.transaction():
+            certificate = db_api.get_certificate(name)
+            db_api.delete_certificate(name)
+
+            lb_driver.delete_certificate(certificate)
+
+        lb_driver.apply_changes()
+
+    @wsme_pecan.wsexpose(Certificates)
+    def get_all(self):
+        """Return all certificates."""
+        LOG.info("Fetch certificates.")
+
+        certificates = [
+            Certificate.from_db_model(db_model)
+            for db_model in db_api.get_certificates()
+        ]
+
+        return Certificates(certificates=certificates)
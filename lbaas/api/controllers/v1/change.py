@@ -0,0 +1,99 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from pecan import rest
+from wsme import types as wtypes
+import wsmeext.pecan as wsme_pecan
+
+from lbaas.api.controllers import resource
+from lbaas.db.v1 import api as db_api
+from lbaas import exceptions
+from lbaas.utils import rest_utils
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('changes', 'lbaas.config')
+
+
+class Change(resource.Resource):
+    """Change of a listener or member."""
+
+    revision = int
+    resource = wtypes.text
+    name = wtypes.text
+    action = wtypes.text
+
+    created_at = wtypes.text
+
+
+class Changes(resource.Resource):
+    """Changes made after a revision."""
+
+    changes = [Change]
+
+    revision = int
+    "Revision to pass as 'since' to get the following changes."
+
+
+class ChangesController(rest.RestController):
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Changes, int, float)
+    def get_all(self, since=None, wait=None):
+        """Return listener and member changes made after a revision.
+
+        :param since: Optional. Revision returned by the previous call.
+                      If not given, no changes are returned, only the
+                      current revision to start from.
+        :param wait: Optional. Seconds to wait for a change if there are
+                     none yet, up to [changes]/max_wait.
+        """
+        LOG.debug("Fetch changes [since=%s, wait=%s]" % (since, wait))
+
+        if since is not None and since < 0:
+            raise exceptions.InputException(
+                "Revision can't be negative [since=%s]" % since
+            )
+
+        if wait is not None and wait < 0:
+            raise exceptions.InputException(
+                "Wait time can't be negative [wait=%s]" % wait
+            )
+
+        revision = db_api.get_revision()
+
+        if since is None:
+            return Changes(changes=[], revision=revision)
+
+        changes = db_api.get_changes(since)
+
+        if not changes and wait:
+            db_api.wait_for_revision(
+                max(since, revision),
+                min(wait, CONF.changes.max_wait)
+            )
+
+            revision = db_api.get_revision()
+            changes = db_api.get_changes(since)
+
+        if changes:
+            revision = max(revision, changes[-1].revision)
+
+        return Changes(
+            changes=[Change.from_dict(c.to_dict()) for c in changes],
+            revision=max(since, revision)
+        )
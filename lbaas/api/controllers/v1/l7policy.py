@@ -0,0 +1,215 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import re
+
+from oslo_log import log as logging
+from pecan import rest
+from wsme import types as wtypes
+import wsmeext.pecan as wsme_pecan
+
+from lbaas.api.controllers import resource
+from lbaas.db.v1 import api as db_api
+from lbaas.drivers import driver
+from lbaas import exceptions
+from lbaas.utils import rest_utils
+
+
+LOG = logging.getLogger(__name__)
+
+L7_RULE_TYPES = ('host', 'path_prefix', 'header', 'method')
+
+# Header names are tokens (RFC 7230, 3.2.6), anything else would break
+# the req.hdr() sample fetch of HAProxy configuration.
+_HEADER_NAME = re.compile(r"^[!#$%&'*+.^_`|~0-9A-Za-z-]+$")
+
+
+class L7Rule(resource.Resource):
+    """L7 rule resource.
+
+    A rule matches requests by host, path prefix, header value (header
+    name is given by 'key') or method.
+    """
+
+    type = wtypes.text
+    key = wtypes.text
+    value = wtypes.text
+
+
+class L7Policy(resource.Resource):
+    """L7 policy resource.
+
+    Requests matching all the rules are routed to the backend of the
+    listener named by 'backend'. Policies are evaluated in order of
+    'position'.
+    """
+
+    id = wtypes.text
+    name = wtypes.text
+    description = wtypes.text
+
+    listener_name = wtypes.text
+    backend = wtypes.text
+    position = wtypes.IntegerType()
+    rules = [L7Rule]
+
+    created_at = wtypes.text
+    updated_at = wtypes.text
+
+    def to_dict(self):
+        d = super(L7Policy, self).to_dict()
+
+        if d.get('rules') is not None:
+            d['rules'] = [r.to_dict() for r in d['rules']]
+
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+
+        if d.get('rules') is not None:
+            d['rules'] = [L7Rule.from_dict(r) for r in d['rules']]
+
+        return super(L7Policy, cls).from_dict(d)
+
+
+class L7Policies(resource.Resource):
+    """A collection of L7 policies."""
+
+    l7policies = [L7Policy]
+
+
+def _validate(values):
+    for rule in values.get('rules', []):
+        if rule.get('type') not in L7_RULE_TYPES:
+            raise exceptions.InputException(
+                'L7 rule type must be one of: %s.' % ', '.join(L7_RULE_TYPES)
+            )
+
+        if rule['type'] == 'header':
+            if not rule.get('key'):
+                raise exceptions.InputException(
+                    'L7 rule of type header requires key.'
+                )
+
+            if not _HEADER_NAME.match(rule['key']):
+                raise exceptions.InputException(
+                    'L7 rule key must be a valid header name [key=%s].' %
+                    rule['key']
+                )
+
+        # Values are written to ACLs and map files as single tokens.
+        if not rule.get('value') or len(rule['value'].split()) != 1:
+            raise exceptions.InputException(
+                'L7 rule value must be a non-empty string without spaces.'
+            )
+
+    if 'backend' in values and not db_api.load_listener(values['backend']):
+        raise exceptions.InputException(
+            'L7 policy backend must be a name of existing listener.'
+        )
+
+
+class L7PoliciesController(rest.RestController):
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(L7Policy, wtypes.text)
+    def get(self, name):
+        """Return the named L7 policy."""
+        LOG.info("Fetch L7 policy [name=%s]" % name)
+
+        db_model = db_api.get_l7policy(name)
+
+        return L7Policy.from_dict(db_model.to_dict())
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(L7Policy, wtypes.text, body=L7Policy)
+    def put(self, name, l7policy):
+        """Update an L7 policy."""
+        LOG.info("Update L7 policy [name=%s]" % name)
+
+        values = l7policy.to_dict()
+        values.pop('listener_name', None)
+
+        _validate(values)
+
+        lb_driver = driver.LB_DRIVER()
+
+        with db_api.transaction():
+            l7policy = db_api.update_l7policy(name, values)
+            db_model = lb_driver.update_l7policy(l7policy)
+
+        lb_driver.apply_changes()
+
+        return L7Policy.from_dict(db_model.to_dict())
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(L7Policy, body=L7Policy, status_code=201)
+    def post(self, l7policy):
+        """Create a new L7 policy."""
+        LOG.info("Create L7 policy [name=%s]" % l7policy.name)
+
+        if not (l7policy.name and l7policy.listener_name
+                and l7policy.backend and l7policy.rules):
+            raise exceptions.InputException(
+                'You must provide at least name, listener_name, backend '
+                'and rules of the L7 policy.'
+            )
+
+        values = l7policy.to_dict()
+        listener_name = values.pop('listener_name')
+
+        _validate(values)
+
+        lb_driver = driver.LB_DRIVER()
+
+        with db_api.transaction():
+            listener = db_api.get_listener(listener_name)
+
+            values['listener_id'] = listener.id
+
+            l7policy = db_api.create_l7policy(values)
+            db_model = lb_driver.create_l7policy(l7policy)
+
+        lb_driver.apply_changes()
+
+        return L7Policy.from_dict(db_model.to_dict())
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(None, wtypes.text, status_code=204)
+    def delete(self, name):
+        """Delete the named L7 policy."""
+        LOG.info("Delete L7 policy [name=%s]" % name)
+
+        lb_driver = driver.LB_DRIVER()
+
+        with db_api.transaction():
+            l7policy = db_api.get_l7policy(name)
+            db_api.delete_l7policy(name)
+
+            lb_driver.delete_l7policy(l7policy)
+
+        lb_driver.apply_changes()
+
+    @wsme_pecan.wsexpose(L7Policies)
+    def get_all(self):
+        """Return all L7 policies."""
+        LOG.info("Fetch L7 policies.")
+
+        l7policies = [
+            L7Policy.from_dict(db_model.to_dict())
+            for db_model in db_api.get_l7policies()
+        ]
+
+        return L7Policies(l7policies=l7policies)
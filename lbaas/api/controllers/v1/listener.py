@@ -11,13 +11,18 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import datetime
+
+from oslo_config import cfg
 from oslo_log import log as logging
+import pecan
 from pecan import rest
 from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
 from lbaas.api.controllers import resource
 from lbaas.api.controllers.v1 import member
+from lbaas.api.controllers.v1 import types
 from lbaas.db.v1 import api as db_api
 from lbaas.drivers import driver
 from lbaas import exceptions as exceptions
@@ -26,6 +31,9 @@ from lbaas.utils import rest_utils
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_group('api', 'lbaas.config')
+
 
 class Listener(resource.Resource):
     """Environment resource."""
@@ -37,51 +45,192 @@ class Listener(resource.Resource):
     protocol = wtypes.text
     protocol_port = wtypes.IntegerType()
     algorithm = wtypes.text
+    server_name = wtypes.text
     options = wtypes.DictType(wtypes.text, wtypes.text)
     ssl_info = wtypes.DictType(wtypes.text, wtypes.text)
 
     members = [member.Member]
+
+    version = int
+
     created_at = wtypes.text
     updated_at = wtypes.text
 
 
-class Listeners(resource.Resource):
+class Listeners(resource.ResourceList):
     """A collection of Environment resources."""
 
     listeners = [Listener]
 
+    def __init__(self, **kwargs):
+        self._type = 'listeners'
 
-class ListenersController(rest.RestController):
-    @wsme_pecan.wsexpose(Listeners)
-    def get_all(self):
-        """Return all listeners."""
+        super(Listeners, self).__init__(**kwargs)
 
-        LOG.info("Fetch listeners.")
 
-        listeners = []
+def _to_resources(columns, rows, member_columns=None, members=None):
+    """Converts rows of listeners into resources.
 
-        for l in db_api.get_listeners():
-            l_dict = l.to_dict()
-            l_dict['members'] = [
-                member.Member.from_dict(m.to_dict()) for m in l.members
+    :param members: Optional. Rows of member_columns of the members of
+                    the listeners, by listener id.
+    """
+    listeners = []
+
+    for row in rows:
+        listener = rest_utils.row_to_dict(columns, row)
+
+        if members is not None:
+            listener['members'] = [
+                member.Member.from_dict(
+                    rest_utils.row_to_dict(member_columns, member_row)
+                )
+                for member_row in members[listener['id']]
             ]
 
-            listeners += [Listener.from_dict(l_dict)]
+        listeners.append(Listener.from_dict(listener))
+
+    return listeners
 
-        return Listeners(listeners=listeners)
+
+class ListenersController(rest.RestController):
+    members = member.ListenerMembersController()
 
     @rest_utils.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose(Listener, wtypes.text)
-    def get(self, name):
-        """Return the named listener."""
-        LOG.info("Fetch listener [name=%s]" % name)
+    @wsme_pecan.wsexpose(Listeners, wtypes.text, int, types.uniquelist,
+                         types.list, types.uniquelist, wtypes.text,
+                         wtypes.text, int, datetime.datetime, bool)
+    @rest_utils.accept_ndjson
+    @rest_utils.accept_msgpack
+    def get_all(self, marker=None, limit=None, sort_keys=None,
+                sort_dirs=None, fields=None, address=None, protocol=None,
+                protocol_port=None, created_since=None, stream=False):
+        """Return a page of listeners.
+
+        :param marker: Optional. Id of the last listener of the previous
+                       page, the page starts right after it.
+        :param limit: Optional. Maximum number of listeners to return.
+        :param sort_keys: Optional. Comma separated columns to sort by,
+                          'name' by default.
+        :param sort_dirs: Optional. Comma separated directions ('asc' or
+                          'desc') of sort_keys.
+        :param fields: Optional. Comma separated fields to return, all
+                       fields by default. Id is always returned.
+        :param address: Optional. Filter by address.
+        :param protocol: Optional. Filter by protocol.
+        :param protocol_port: Optional. Filter by port.
+        :param created_since: Optional. Only listeners created at this
+                              time or later.
+        :param stream: Optional. If true, all listeners (up to limit) are
+                       streamed as NDJSON, as if NDJSON was accepted.
+        """
+        LOG.info(
+            "Fetch listeners [marker=%s, limit=%s, sort_keys=%s, "
+            "sort_dirs=%s, fields=%s]" %
+            (marker, limit, sort_keys, sort_dirs, fields)
+        )
+
+        sort_keys = sort_keys or ['name']
+        sort_dirs = sort_dirs or ['asc']
+        fields = fields or []
+
+        rest_utils.validate_query_params(limit, sort_keys, sort_dirs)
+        rest_utils.validate_fields(fields, Listener.get_fields())
+
+        if fields and 'id' not in fields:
+            fields.insert(0, 'id')
+
+        filters = dict(
+            (k, v) for k, v in (
+                ('address', address),
+                ('protocol', protocol),
+                ('protocol_port', protocol_port),
+                ('created_since', created_since)
+            ) if v is not None
+        )
+
+        query_args = dict(
+            filters,
+            limit=limit,
+            marker=marker,
+            sort_keys=sort_keys,
+            sort_dirs=sort_dirs
+        )
+
+        # Only the needed columns are selected, as plain rows. Members
+        # of the whole page are selected by one more query.
+        columns = [f for f in fields or Listener.get_fields()
+                   if f != 'members']
+        member_columns = None
+
+        if not fields or 'members' in fields:
+            member_columns = member.get_columns()
+
+        if rest_utils.is_stream_requested(stream):
+            pages = db_api.iter_listener_pages(
+                columns,
+                CONF.api.stream_batch_size,
+                member_columns,
+                **query_args
+            )
+
+            return rest_utils.stream_ndjson(
+                Listener,
+                (
+                    _to_resources(columns, rows, member_columns, members)
+                    for rows, members in pages
+                )
+            )
+
+        rows = db_api.get_listener_rows(columns, **query_args)
+        members = None
+
+        if member_columns:
+            members = db_api.get_listener_member_rows(
+                [row[columns.index('id')] for row in rows],
+                member_columns
+            )
+
+        listeners = _to_resources(columns, rows, member_columns, members)
+
+        if created_since:
+            filters['created_since'] = created_since.isoformat()
+
+        return Listeners.convert_with_links(
+            listeners,
+            limit,
+            pecan.request.host_url,
+            fields=','.join(fields),
+            sort_keys=','.join(sort_keys),
+            sort_dirs=','.join(sort_dirs),
+            **filters
+        )
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Listener, wtypes.text, types.uniquelist)
+    @rest_utils.accept_msgpack
+    def get(self, name, fields=None):
+        """Return the named listener.
+
+        :param fields: Optional. Comma separated fields to return, all
+                       fields by default. Id is always returned. Members
+                       are returned by /v1/listeners/<name>/members.
+        """
+        LOG.info("Fetch listener [name=%s, fields=%s]" % (name, fields))
+
+        rest_utils.validate_fields(
+            fields,
+            [f for f in Listener.get_fields() if f != 'members']
+        )
 
         db_model = db_api.get_listener(name)
 
-        return Listener.from_dict(db_model.to_dict())
+        return Listener.from_dict(
+            rest_utils.select_fields(db_model.to_dict(), fields)
+        )
 
     @rest_utils.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(Listener, body=Listener, status_code=201)
+    @rest_utils.accept_msgpack
     def post(self, listener):
         """Create a new listener."""
         LOG.info("Create listener [listener=%s]" % listener)
@@ -99,12 +248,15 @@ class ListenersController(rest.RestController):
             listener = db_api.create_listener(listener.to_dict())
             db_model = lb_driver.create_listener(listener)
 
-            lb_driver.apply_changes()
+        lb_driver.apply_changes()
+
+        rest_utils.set_version_etag(db_model)
 
         return Listener.from_dict(db_model.to_dict())
 
     @rest_utils.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(Listener, wtypes.text, body=Listener)
+    @rest_utils.accept_msgpack
     def put(self, name, listener):
         """Update an listener."""
 
@@ -113,13 +265,21 @@ class ListenersController(rest.RestController):
             (name, listener)
         )
 
+        version = rest_utils.get_if_match_version()
+
         lb_driver = driver.LB_DRIVER()
 
         with db_api.transaction():
-            listener = db_api.update_listener(name, listener.to_dict())
+            listener = db_api.update_listener(
+                name,
+                listener.to_dict(),
+                version=version
+            )
             db_model = lb_driver.update_listener(listener)
 
-            lb_driver.apply_changes()
+        lb_driver.apply_changes()
+
+        rest_utils.set_version_etag(db_model)
 
         return Listener.from_dict(db_model.to_dict())
 
@@ -136,4 +296,4 @@ class ListenersController(rest.RestController):
             lb_driver.delete_listener(listener)
             db_api.delete_listener(name)
 
-            lb_driver.apply_changes()
+        lb_driver.apply_changes()
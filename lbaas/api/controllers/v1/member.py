@@ -12,14 +12,19 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import datetime
+
+from oslo_config import cfg
 from oslo_log import log as logging
 import pecan
 from pecan import hooks
 from pecan import rest
+import six
 from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
 from lbaas.api.controllers import resource
+from lbaas.api.controllers.v1 import types
 from lbaas.db.v1 import api as db_api
 from lbaas.drivers import driver
 from lbaas import exceptions
@@ -28,6 +33,12 @@ from lbaas.utils import rest_utils
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_group('api', 'lbaas.config')
+
+# Length of the member_tags_v1.tag column.
+MAX_TAG_LENGTH = 80
+
 
 class Member(resource.Resource):
     """Member resource."""
@@ -43,57 +54,409 @@ class Member(resource.Resource):
 
     tags = [wtypes.text]
 
+    version = int
+
     created_at = wtypes.text
     updated_at = wtypes.text
 
 
-class Members(resource.Resource):
+class Members(resource.ResourceList):
     """A collection of Members."""
 
     members = [Member]
 
+    def __init__(self, **kwargs):
+        self._type = 'members'
+
+        super(Members, self).__init__(**kwargs)
+
+
+class MemberResult(resource.Resource):
+    """Result of one item of a bulk member operation."""
+
+    name = wtypes.text
+    status = wtypes.text
+    error = wtypes.text
+
+    member = Member
+
+
+class MemberResults(resource.Resource):
+    """Results of a bulk member operation, in the order of the items."""
+
+    results = [MemberResult]
+
+
+def _validate_member(member):
+    if not (member.name and member.protocol_port
+            and member.address and member.listener_name):
+        raise exceptions.InputException(
+            'You must provide at least name, protocol_port, '
+            'listener_name and address of the member.'
+        )
+
+    _validate_tags(member.tags)
+
+
+def _validate_tags(tags):
+    for tag in tags or []:
+        if len(tag) > MAX_TAG_LENGTH:
+            raise exceptions.InputException(
+                'Member tags must be at most %s characters long [tag=%s].' %
+                (MAX_TAG_LENGTH, tag)
+            )
+
+
+def get_columns(fields=None):
+    """Returns the member columns holding the fields, all by default."""
+    # Listener name is not a member column.
+    return [f for f in fields or Member.get_fields() if f != 'listener_name']
+
+
+def _get_members(marker=None, limit=None, sort_keys=None, sort_dirs=None,
+                 fields=None, listener_name=None, stream=False, **filters):
+    """Return a page of members as a collection resource.
+
+    :param listener_name: Optional. Only members of this listener are
+                          returned.
+    :param stream: Optional. If True, or if NDJSON is accepted, members
+                   are streamed instead, see rest_utils.stream_ndjson().
+    :param filters: Other column values (or created_since) to filter by,
+                    None values are ignored.
+    """
+    sort_keys = sort_keys or ['name']
+    sort_dirs = sort_dirs or ['asc']
+    fields = fields or []
+
+    rest_utils.validate_query_params(limit, sort_keys, sort_dirs)
+    rest_utils.validate_fields(fields, get_columns())
+
+    if fields and 'id' not in fields:
+        fields.insert(0, 'id')
+
+    filters = dict((k, v) for k, v in filters.items() if v is not None)
+
+    if listener_name:
+        filters['listener_id'] = db_api.get_listener(listener_name).id
+
+    # Only the needed columns are selected, as plain rows.
+    columns = get_columns(fields)
+
+    if rest_utils.is_stream_requested(stream):
+        pages = db_api.iter_member_pages(
+            columns,
+            CONF.api.stream_batch_size,
+            limit=limit,
+            marker=marker,
+            sort_keys=sort_keys,
+            sort_dirs=sort_dirs,
+            **filters
+        )
+
+        return rest_utils.stream_ndjson(
+            Member,
+            (
+                [
+                    Member.from_dict(rest_utils.row_to_dict(columns, row))
+                    for row in rows
+                ]
+                for rows in pages
+            )
+        )
+
+    rows = db_api.get_member_rows(
+        columns,
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        **filters
+    )
+
+    members_list = [
+        Member.from_dict(rest_utils.row_to_dict(columns, row))
+        for row in rows
+    ]
+
+    link_args = dict(
+        fields=','.join(fields),
+        sort_keys=','.join(sort_keys),
+        sort_dirs=','.join(sort_dirs)
+    )
+
+    if listener_name:
+        link_args['listener_name'] = listener_name
+
+    for key, val in filters.items():
+        if key == 'created_since':
+            link_args[key] = val.isoformat()
+        elif key in ('tags', 'tags_any'):
+            link_args[key] = ','.join(val)
+        elif key != 'listener_id':
+            link_args[key] = val
+
+    return Members.convert_with_links(
+        members_list,
+        limit,
+        pecan.request.host_url,
+        **link_args
+    )
+
+
+class BulkMembersController(rest.RestController):
+    """Bulk member operations, i.e. /v1/members/bulk.
+
+    All items are validated before the database is touched. Valid items
+    are then applied in one transaction with one driver call, so the load
+    balancer is reconfigured once. Invalid items are reported in the
+    results and skipped.
+    """
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(MemberResults, body=Members)
+    @rest_utils.accept_msgpack
+    def post(self, bulk):
+        """Create members."""
+        items = bulk.members or []
+
+        LOG.info("Create members in bulk [count=%s]" % len(items))
+
+        listener_ids = dict(
+            (name, id) for id, name in
+            db_api.get_listeners(fields=['id', 'name'])
+        )
+        taken_names = set(
+            row[0] for row in db_api.get_members(
+                fields=['name'],
+                names=[m.name for m in items if m.name]
+            )
+        )
+
+        results = []
+        valid = []
+
+        for member in items:
+            result = MemberResult(name=member.name)
+
+            try:
+                _validate_member(member)
+
+                if member.name in taken_names:
+                    raise exceptions.DBDuplicateEntryException(
+                        "Member already exists [name=%s]" % member.name
+                    )
+
+                if member.listener_name not in listener_ids:
+                    raise exceptions.NotFoundException(
+                        "Listener not found [name=%s]" % member.listener_name
+                    )
+            except exceptions.LBaaSException as e:
+                result.status = 'error'
+                result.error = six.text_type(e)
+            else:
+                taken_names.add(member.name)
+
+                values = member.to_dict()
+                values['listener_id'] = listener_ids[
+                    values.pop('listener_name')
+                ]
+
+                valid.append((result, values))
+
+            results.append(result)
+
+        if valid:
+            lb_driver = driver.LB_DRIVER()
+
+            with db_api.transaction():
+                db_models = db_api.create_members([v for _, v in valid])
+                lb_driver.create_members(db_models)
+
+            lb_driver.apply_changes()
+
+            for (result, _), db_model in zip(valid, db_models):
+                result.status = 'created'
+                result.member = Member.from_dict(db_model.to_dict())
+
+        return MemberResults(results=results)
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(MemberResults, body=Members)
+    @rest_utils.accept_msgpack
+    def put(self, bulk):
+        """Update members found by their names."""
+        items = bulk.members or []
+
+        LOG.info("Update members in bulk [count=%s]" % len(items))
+
+        versions = dict(
+            db_api.get_members(
+                fields=['name', 'version'],
+                names=[m.name for m in items if m.name]
+            )
+        )
+
+        results = []
+        valid = []
+
+        for member in items:
+            result = MemberResult(name=member.name)
+            values = member.to_dict()
+
+            if member.name not in versions:
+                result.status = 'error'
+                result.error = "Member not found [member_name=%s]" % (
+                    member.name
+                )
+            elif values.get('version') not in (None, versions[member.name]):
+                result.status = 'error'
+                result.error = (
+                    "Member version doesn't match [member_name=%s, "
+                    "version=%s]" % (member.name, versions[member.name])
+                )
+            else:
+                try:
+                    _validate_tags(values.get('tags'))
+                except exceptions.InputException as e:
+                    result.status = 'error'
+                    result.error = six.text_type(e)
+                else:
+                    values.pop('listener_name', None)
+
+                    valid.append((result, values))
+
+            results.append(result)
+
+        if valid:
+            lb_driver = driver.LB_DRIVER()
+
+            with db_api.transaction():
+                db_models = db_api.update_members([v for _, v in valid])
+                lb_driver.update_members(db_models)
+
+            lb_driver.apply_changes()
+
+            for (result, _), db_model in zip(valid, db_models):
+                result.status = 'updated'
+                result.member = Member.from_dict(db_model.to_dict())
+
+        return MemberResults(results=results)
+
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(MemberResults, types.uniquelist, wtypes.text,
+                         types.uniquelist)
+    @rest_utils.accept_msgpack
+    def delete(self, names=None, listener_name=None, tags=None):
+        """Delete members by names, or all members matching the filters.
+
+        :param names: Optional. Comma separated names of the members.
+        :param listener_name: Optional. Delete members of this listener.
+        :param tags: Optional. Delete members having all these tags.
+        """
+        LOG.info(
+            "Delete members in bulk [names=%s, listener_name=%s, tags=%s]"
+            % (names, listener_name, tags)
+        )
+
+        if not (names or listener_name or tags):
+            raise exceptions.InputException(
+                'You must provide names, listener_name or tags of the '
+                'members to delete.'
+            )
+
+        lb_driver = driver.LB_DRIVER()
+
+        with db_api.transaction():
+            filters = {}
+
+            if listener_name:
+                filters['listener_id'] = db_api.get_listener(listener_name).id
+
+            db_models = db_api.get_members(names=names, tags=tags, **filters)
+
+            # Deleted objects can't be read once committed.
+            deleted = [m.name for m in db_models]
+
+            if deleted:
+                db_api.delete_members(names=deleted)
+                lb_driver.delete_members(db_models)
+
+        if deleted:
+            lb_driver.apply_changes()
+
+        results = [
+            MemberResult(name=name, status='deleted') for name in deleted
+        ]
+
+        for name in names or []:
+            if name not in deleted:
+                results.append(
+                    MemberResult(
+                        name=name,
+                        status='error',
+                        error="Member not found [member_name=%s]" % name
+                    )
+                )
+
+        return MemberResults(results=results)
+
 
 class MembersController(rest.RestController, hooks.HookController):
+    bulk = BulkMembersController()
+
     @rest_utils.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose(Member, wtypes.text)
-    def get(self, name):
-        """Return the named member."""
-        LOG.info("Fetch member [name=%s]" % name)
+    @wsme_pecan.wsexpose(Member, wtypes.text, types.uniquelist)
+    @rest_utils.accept_msgpack
+    def get(self, name, fields=None):
+        """Return the named member.
+
+        :param fields: Optional. Comma separated fields to return, all
+                       fields by default. Id is always returned.
+        """
+        LOG.info("Fetch member [name=%s, fields=%s]" % (name, fields))
+
+        rest_utils.validate_fields(fields, get_columns())
 
         db_model = db_api.get_member(name)
 
-        return Member.from_dict(db_model.to_dict())
+        rest_utils.set_version_etag(db_model)
+
+        return Member.from_dict(
+            rest_utils.select_fields(db_model.to_dict(), fields)
+        )
 
     @rest_utils.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(Member, wtypes.text, body=Member)
+    @rest_utils.accept_msgpack
     def put(self, name, member):
         """Update a member."""
         LOG.info("Update member [member_name=%s]" % name)
 
         values = member.to_dict()
+        version = rest_utils.get_if_match_version()
+
+        _validate_tags(values.get('tags'))
 
         lb_driver = driver.LB_DRIVER()
 
         with db_api.transaction():
-            member = db_api.update_member(name, values)
+            member = db_api.update_member(name, values, version=version)
             db_model = lb_driver.update_member(member)
 
-            lb_driver.apply_changes()
+        lb_driver.apply_changes()
+
+        rest_utils.set_version_etag(db_model)
 
         return Member.from_dict(db_model.to_dict())
 
     @rest_utils.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(Member, body=Member, status_code=201)
+    @rest_utils.accept_msgpack
     def post(self, member):
         """Create a new member."""
         LOG.info("Create member [member_name=%s]" % member.name)
 
-        if not (member.name and member.protocol_port
-                and member.address and member.listener_name):
-            raise exceptions.InputException(
-                'You must provide at least name, protocol_port, '
-                'listener_name and address of the member.'
-            )
+        _validate_member(member)
 
         pecan.response.status = 201
 
@@ -109,7 +472,9 @@ class MembersController(rest.RestController, hooks.HookController):
             member = db_api.create_member(values)
             db_model = lb_driver.create_member(member)
 
-            lb_driver.apply_changes()
+        lb_driver.apply_changes()
+
+        rest_utils.set_version_etag(db_model)
 
         return Member.from_dict(db_model.to_dict())
 
@@ -127,16 +492,102 @@ class MembersController(rest.RestController, hooks.HookController):
 
             lb_driver.delete_member(member)
 
-            lb_driver.apply_changes()
-
-    @wsme_pecan.wsexpose(Members)
-    def get_all(self):
-        """Return all members."""
-        LOG.info("Fetch members.")
+        lb_driver.apply_changes()
 
-        members_list = [
-            Member.from_dict(db_model.to_dict())
-            for db_model in db_api.get_members()
-        ]
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Members, wtypes.text, int, types.uniquelist,
+                         types.list, types.uniquelist, wtypes.text,
+                         wtypes.text, wtypes.text, int, datetime.datetime,
+                         types.uniquelist, types.uniquelist, bool)
+    @rest_utils.accept_ndjson
+    @rest_utils.accept_msgpack
+    def get_all(self, marker=None, limit=None, sort_keys=None,
+                sort_dirs=None, fields=None, listener_name=None,
+                address=None, protocol=None, protocol_port=None,
+                created_since=None, tags=None, tags_any=None,
+                stream=False):
+        """Return a page of members.
+
+        :param marker: Optional. Id of the last member of the previous
+                       page, the page starts right after it.
+        :param limit: Optional. Maximum number of members to return.
+        :param sort_keys: Optional. Comma separated columns to sort by,
+                          'name' by default.
+        :param sort_dirs: Optional. Comma separated directions ('asc' or
+                          'desc') of sort_keys.
+        :param fields: Optional. Comma separated fields to return, all
+                       fields by default. Id is always returned.
+        :param listener_name: Optional. Filter by listener.
+        :param address: Optional. Filter by address.
+        :param protocol: Optional. Filter by protocol.
+        :param protocol_port: Optional. Filter by port.
+        :param created_since: Optional. Only members created at this time
+                              or later.
+        :param tags: Optional. Comma separated tags, only members having
+                     all of them are returned.
+        :param tags_any: Optional. Comma separated tags, only members
+                         having any of them are returned.
+        :param stream: Optional. If true, all members (up to limit) are
+                       streamed as NDJSON, as if NDJSON was accepted.
+        """
+        LOG.info(
+            "Fetch members [marker=%s, limit=%s, sort_keys=%s, "
+            "sort_dirs=%s, fields=%s, listener_name=%s]" %
+            (marker, limit, sort_keys, sort_dirs, fields, listener_name)
+        )
+
+        return _get_members(
+            marker=marker,
+            limit=limit,
+            sort_keys=sort_keys,
+            sort_dirs=sort_dirs,
+            fields=fields,
+            listener_name=listener_name,
+            address=address,
+            protocol=protocol,
+            protocol_port=protocol_port,
+            created_since=created_since,
+            tags=tags,
+            tags_any=tags_any,
+            stream=stream
+        )
+
+
+class ListenerMembersController(rest.RestController):
+    """Members of a listener, i.e. /v1/listeners/<name>/members."""
 
-        return Members(members=members_list)
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Members, wtypes.text, wtypes.text, int,
+                         types.uniquelist, types.list, types.uniquelist,
+                         wtypes.text, wtypes.text, int, datetime.datetime,
+                         types.uniquelist, types.uniquelist, bool)
+    @rest_utils.accept_ndjson
+    @rest_utils.accept_msgpack
+    def get_all(self, listener_name, marker=None, limit=None,
+                sort_keys=None, sort_dirs=None, fields=None, address=None,
+                protocol=None, protocol_port=None, created_since=None,
+                tags=None, tags_any=None, stream=False):
+        """Return a page of members of the listener.
+
+        Accepts the same query parameters as /v1/members.
+        """
+        LOG.info(
+            "Fetch listener members [listener_name=%s, marker=%s, limit=%s]"
+            % (listener_name, marker, limit)
+        )
+
+        return _get_members(
+            marker=marker,
+            limit=limit,
+            sort_keys=sort_keys,
+            sort_dirs=sort_dirs,
+            fields=fields,
+            listener_name=listener_name,
+            address=address,
+            protocol=protocol,
+            protocol_port=protocol_port,
+            created_since=created_since,
+            tags=tags,
+            tags_any=tags_any,
+            stream=stream
+        )
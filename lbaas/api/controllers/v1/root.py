@@ -17,6 +17,9 @@ from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
 from lbaas.api.controllers import resource
+from lbaas.api.controllers.v1 import certificate
+from lbaas.api.controllers.v1 import change
+from lbaas.api.controllers.v1 import l7policy
 from lbaas.api.controllers.v1 import listener
 from lbaas.api.controllers.v1 import member
 
@@ -35,6 +38,9 @@ class Controller(object):
 
     members = member.MembersController()
     listeners = listener.ListenersController()
+    certificates = certificate.CertificatesController()
+    l7policies = l7policy.L7PoliciesController()
+    changes = change.ChangesController()
 
     @wsme_pecan.wsexpose(RootResource)
     def index(self):
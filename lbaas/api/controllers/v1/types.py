@@ -0,0 +1,66 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import six
+from wsme import types as wtypes
+
+
+class ListType(wtypes.UserType):
+    """A simple list type given as comma separated values."""
+
+    basetype = wtypes.text
+    name = 'list'
+
+    @staticmethod
+    def validate(value):
+        """Validate and convert the input to a ListType.
+
+        :param value: A comma separated string of values
+        :returns: A list of values.
+        """
+        items = [v.strip() for v in six.text_type(value).split(',')]
+
+        # Remove empty items.
+        return [x for x in items if x]
+
+    @staticmethod
+    def frombasetype(value):
+        return ListType.validate(value) if value is not None else None
+
+
+class UniqueListType(ListType):
+    """A simple list type with no duplicate items."""
+
+    name = 'uniquelist'
+
+    @staticmethod
+    def validate(value):
+        """Validate and convert the input to a UniqueListType.
+
+        :param value: A comma separated string of values.
+        :returns: A list with no duplicate items.
+        """
+        items = ListType.validate(value)
+
+        seen = set()
+
+        return [x for x in items if not (x in seen or seen.add(x))]
+
+    @staticmethod
+    def frombasetype(value):
+        return UniqueListType.validate(value) if value is not None else None
+
+
+list = ListType()
+uniquelist = UniqueListType()
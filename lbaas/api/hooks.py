@@ -0,0 +1,190 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import math
+import re
+
+from oslo_config import cfg
+from oslo_log import log as logging
+import pecan
+from pecan import hooks
+from wsme import exc
+
+from lbaas.db.v1 import api as db_api
+from lbaas.utils import rest_utils
+
+LOG = logging.getLogger(__name__)
+
+# A member is identified by its version.
+_MEMBER_PATH = re.compile(r'^/v1/members/([^/]+)/?$')
+
+# Listener and its members depend on the listener revision.
+_LISTENER_PATH = re.compile(r'^/v1/listeners/([^/]+)(/members)?/?$')
+
+# Other resources depend on the global revision.
+_GLOBAL_PATH = re.compile(
+    r'^/v1/(listeners|members|certificates|l7policies)(/[^/]+)?/?$'
+)
+
+_ETAG_ENV_KEY = 'lbaas.etag'
+
+_WRITE_TIME_COOKIE = 'lbaas_write_time'
+_WRITE_TIME_ENV_KEY = 'lbaas.write_time'
+
+
+def _get_etag(path):
+    """Returns the ETag of the resource, or None."""
+    match = _MEMBER_PATH.match(path)
+
+    if match:
+        version = db_api.get_member_version(match.group(1))
+
+        return str(version) if version else None
+
+    match = _LISTENER_PATH.match(path)
+
+    if match:
+        revision = db_api.get_listener_revision(match.group(1))
+    elif _GLOBAL_PATH.match(path):
+        revision = db_api.get_revision()
+    else:
+        return None
+
+    # 0 means the data were never changed since revisions exist
+    # (or the listener doesn't exist), so it identifies nothing.
+    return str(revision) if revision else None
+
+
+class ETagHook(hooks.PecanHook):
+    """Conditional GET based on the data revision.
+
+    Responses get an ETag made of the revision they depend on, or of
+    the object version for members. It's weak since JSON, MessagePack
+    and compressed responses share it. A request with a matching
+    If-None-Match header is answered with 304 by one lookup, before the
+    controller loads anything.
+    """
+
+    def before(self, state):
+        request = state.request
+
+        if request.method != 'GET':
+            return
+
+        etag = _get_etag(request.path_info)
+
+        if not etag:
+            return
+
+        if etag in request.if_none_match:
+            LOG.debug("Not modified [path=%s, etag=%s]" %
+                      (request.path_info, etag))
+
+            pecan.abort(304, headers={'ETag': 'W/"%s"' % etag})
+
+        request.environ[_ETAG_ENV_KEY] = etag
+
+    def after(self, state):
+        etag = state.request.environ.get(_ETAG_ENV_KEY)
+        response = state.response
+
+        # The controller may have set a more precise one.
+        if etag and response.status_int == 200 and not response.etag:
+            response.etag = (etag, False)
+
+
+class NegotiationHook(hooks.PecanHook):
+    """Tells caches which responses depend on the Accept header.
+
+    Those of controllers speaking other formats than JSON, see
+    rest_utils.accept_msgpack() and rest_utils.accept_ndjson().
+    """
+
+    def after(self, state):
+        if not rest_utils.is_negotiated(state.controller):
+            return
+
+        response = state.response
+        vary = tuple(response.vary or ())
+
+        if 'Accept' not in vary:
+            response.vary = vary + ('Accept',)
+
+
+class MsgPackHook(hooks.PecanHook):
+    """Passes arguments of MessagePack request bodies to controllers.
+
+    WSME parses JSON and XML bodies only, so MessagePack ones are
+    decoded here and their arguments handed over to wsexposed
+    controllers as keyword arguments.
+    """
+
+    def before(self, state):
+        request = state.request
+
+        if request.content_type != rest_utils.MSGPACK or not request.body:
+            return
+
+        funcdef = getattr(state.controller, '_wsme_definition', None)
+
+        if funcdef is None:
+            pecan.abort(415)
+
+        try:
+            kwargs = rest_utils.read_msgpack_body(funcdef, request.body)
+        except exc.ClientSideError as e:
+            pecan.abort(e.code, e.faultstring)
+
+        # Not to be parsed by WSME once again.
+        request.body = b''
+
+        _, _, keywords = state.arguments
+
+        keywords.update(kwargs)
+
+
+class ReadYourWritesHook(hooks.PecanHook):
+    """Keeps clients reading their own writes with a slave database.
+
+    Reads go to the primary database within [lbaas]/primary_read_window
+    seconds after a write. The time of the last write of a client is
+    kept in a cookie, so that it holds whichever API worker process
+    serves the next request of the client.
+    """
+
+    def before(self, state):
+        try:
+            write_time = float(
+                state.request.cookies.get(_WRITE_TIME_COOKIE, '')
+            )
+        except ValueError:
+            write_time = None
+
+        # Requests of a connection are served by the same green thread.
+        db_api.set_write_time(write_time)
+
+        state.request.environ[_WRITE_TIME_ENV_KEY] = write_time
+
+    def after(self, state):
+        write_time = db_api.get_write_time()
+
+        if write_time == state.request.environ.get(_WRITE_TIME_ENV_KEY):
+            return
+
+        state.response.set_cookie(
+            _WRITE_TIME_COOKIE,
+            '%.6f' % write_time,
+            max_age=int(math.ceil(cfg.CONF.lbaas.primary_read_window)),
+            httponly=True
+        )
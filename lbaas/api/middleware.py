@@ -0,0 +1,205 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import zlib
+
+# Bodies of other types are usually compressed already, if at all
+# compressible.
+_COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-msgpack',
+    'application/x-ndjson',
+    'application/xml',
+    'text/'
+)
+
+
+def _accepts_gzip(accept_encoding):
+    """Returns True if the Accept-Encoding header value allows gzip."""
+    for coding in accept_encoding.split(','):
+        params = coding.strip().split(';')
+        name = params[0].strip().lower()
+
+        if name not in ('gzip', '*'):
+            continue
+
+        for param in params[1:]:
+            key, _, value = param.partition('=')
+
+            if key.strip().lower() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+
+        return True
+
+    return False
+
+
+def _get_header(headers, name):
+    name = name.lower()
+
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+
+    return None
+
+
+def _without_header(headers, name):
+    name = name.lower()
+
+    return [(k, v) for k, v in headers if k.lower() != name]
+
+
+class GzipMiddleware(object):
+    """Compresses response bodies with gzip if the client accepts it.
+
+    Bodies shorter than min_size bytes are sent as they are. Otherwise
+    each chunk the application yields is compressed and flushed right
+    away, so streamed responses are still streamed.
+
+    :param app: WSGI application to wrap.
+    :param min_size: Minimum size of bodies to compress, in bytes.
+    :param level: zlib compression level, from 1 (fastest) to 9.
+    """
+
+    def __init__(self, app, min_size=1024, level=6):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+
+    def __call__(self, environ, start_response):
+        if (environ.get('REQUEST_METHOD') == 'HEAD' or not
+                _accepts_gzip(environ.get('HTTP_ACCEPT_ENCODING', ''))):
+            return self.app(environ, start_response)
+
+        response = {}
+        written = []
+
+        def _start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+            response['exc_info'] = exc_info
+
+            return written.append
+
+        app_iter = self.app(environ, _start_response)
+
+        status = response['status']
+        headers = response['headers']
+
+        if not self._is_compressible(status, headers):
+            start_response(status, headers, response['exc_info'])
+
+            return self._chain(written, app_iter) if written else app_iter
+
+        return self._compress(
+            status,
+            headers,
+            response['exc_info'],
+            written,
+            app_iter,
+            start_response
+        )
+
+    def _is_compressible(self, status, headers):
+        if status[:3] in ('204', '304'):
+            return False
+
+        if _get_header(headers, 'Content-Encoding'):
+            return False
+
+        content_type = (_get_header(headers, 'Content-Type') or '').lower()
+
+        if not content_type.startswith(_COMPRESSIBLE_TYPES):
+            return False
+
+        length = _get_header(headers, 'Content-Length')
+
+        return length is None or int(length) >= self.min_size
+
+    @staticmethod
+    def _chain(written, app_iter):
+        """Returns a generator of the written chunks, then app_iter ones.
+
+        app_iter is closed once the generator is exhausted or closed.
+        """
+        try:
+            for chunk in written:
+                yield chunk
+
+            for chunk in app_iter:
+                yield chunk
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+    def _compress(self, status, headers, exc_info, written, app_iter,
+                  start_response):
+        chunks = self._chain(written, app_iter)
+
+        # The length of streamed bodies is unknown, so they are compressed
+        # only once enough of them is there.
+        head = []
+        size = 0
+
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+
+            if size >= self.min_size:
+                break
+
+        headers = _without_header(headers, 'Content-Length')
+        headers.append(('Vary', 'Accept-Encoding'))
+
+        if size < self.min_size:
+            body = b''.join(head)
+
+            headers.append(('Content-Length', str(len(body))))
+
+            start_response(status, headers, exc_info)
+
+            return [body]
+
+        headers.append(('Content-Encoding', 'gzip'))
+
+        start_response(status, headers, exc_info)
+
+        return self._iterate_compressed(head, chunks)
+
+    def _iterate_compressed(self, head, chunks):
+        # 16 + MAX_WBITS makes zlib write the gzip header and trailer.
+        compressor = zlib.compressobj(
+            self.level,
+            zlib.DEFLATED,
+            16 + zlib.MAX_WBITS
+        )
+
+        try:
+            # Everything compressed so far is flushed, so the client
+            # doesn't wait for the next chunk to get the previous one.
+            yield (compressor.compress(b''.join(head)) +
+                   compressor.flush(zlib.Z_SYNC_FLUSH))
+
+            for chunk in chunks:
+                if chunk:
+                    yield (compressor.compress(chunk) +
+                           compressor.flush(zlib.Z_SYNC_FLUSH))
+
+            yield compressor.flush()
+        finally:
+            chunks.close()
@@ -24,7 +24,9 @@ eventlet.monkey_patch(
     thread=False if '--use-debugger' in sys.argv else True,
     time=True)
 
+import contextlib
 import os
+import time
 
 # If ../lbaas/__init__.py exists, add ../ to Python search path, so that
 # it will override what happens to be installed in /usr/(local/)lib/python...
@@ -34,13 +36,16 @@ POSSIBLE_TOPDIR = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]),
 if os.path.exists(os.path.join(POSSIBLE_TOPDIR, 'lbaas', '__init__.py')):
     sys.path.insert(0, POSSIBLE_TOPDIR)
 
+from eventlet import wsgi
 from oslo_config import cfg
 from oslo_log import log as logging
-from wsgiref import simple_server
 
 from lbaas.api import app
 from lbaas import config
+from lbaas.db.v1 import api as db_api
 from lbaas.drivers import driver
+from lbaas import exceptions as exc
+from lbaas.utils import process_utils
 
 
 CONF = cfg.CONF
@@ -48,20 +53,79 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
-def launch_api():
+def _listen(reuse_port=False):
+    return eventlet.listen(
+        (cfg.CONF.api.host, cfg.CONF.api.port),
+        backlog=cfg.CONF.api.backlog,
+        reuse_port=reuse_port
+    )
+
+
+@contextlib.contextmanager
+def _timed(timings, phase):
+    started_at = time.time()
+
+    yield
+
+    timings.append((phase, time.time() - started_at))
+
+
+def _serve(sock, timings):
+    with _timed(timings, 'app'):
+        api_app = app.setup_app()
+
+    LOG.info(
+        "LBaaS API started in %.3f s (%s)" % (
+            sum(t for _, t in timings),
+            ', '.join('%s: %.3f s' % timing for timing in timings)
+        )
+    )
+
+    # Each connection is served by its own green thread, so a slow
+    # request doesn't hold the others.
+    wsgi.server(
+        sock,
+        api_app,
+        custom_pool=eventlet.GreenPool(cfg.CONF.api.pool_size),
+        keepalive=cfg.CONF.api.keep_alive,
+        socket_timeout=cfg.CONF.api.client_socket_timeout or None,
+        log=logging.getLogger('eventlet.wsgi.server'),
+        debug=False
+    )
+
+
+def launch_api(timings):
     host = cfg.CONF.api.host
     port = cfg.CONF.api.port
+    workers = cfg.CONF.api.workers
 
-    server = simple_server.make_server(
-        host,
-        port,
-        app.setup_app()
-    )
+    # One query, instead of inspecting every table on every start.
+    with _timed(timings, 'database'):
+        db_api.check_db(auto_create=cfg.CONF.lbaas.auto_create_db)
+
+    # With SO_REUSEPORT each worker listens on its own socket and the
+    # kernel spreads the connections between them. Otherwise they all
+    # accept on the socket opened here.
+    reuse_port = workers > 1 and cfg.CONF.api.reuse_port
+
+    sock = None if reuse_port else _listen()
 
-    LOG.info("LBaaS API is serving on http://%s:%s (PID=%s)" %
-             (host, port, os.getpid()))
+    LOG.info("LBaaS API is serving on http://%s:%s (PID=%s, workers=%s)" %
+             (host, port, os.getpid(), workers))
 
-    server.serve_forever()
+    if workers == 1:
+        _serve(sock, timings)
+
+        return
+
+    # Connections are closed before forking, so that each worker opens
+    # its own.
+    db_api.dispose_db()
+
+    def _run_worker():
+        _serve(sock or _listen(reuse_port=True), list(timings))
+
+    process_utils.Supervisor(_run_worker, workers).run()
 
 
 def get_properly_ordered_parameters():
@@ -87,16 +151,21 @@ def get_properly_ordered_parameters():
 
 
 def main():
+    # Durations of the startup phases, logged once the app is ready.
+    timings = []
+
     try:
-        config.parse_args(get_properly_ordered_parameters())
+        with _timed(timings, 'config'):
+            config.parse_args(get_properly_ordered_parameters())
 
-        logging.setup(CONF, 'Lbaas')
+            logging.setup(CONF, 'Lbaas')
 
-        driver.load_lb_drivers()
+        with _timed(timings, 'driver'):
+            driver.load_lb_drivers()
 
-        launch_api()
+        launch_api(timings)
 
-    except RuntimeError as excp:
+    except (RuntimeError, exc.DBException) as excp:
         sys.stderr.write("ERROR: %s\n" % excp)
         sys.exit(1)
 
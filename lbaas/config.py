@@ -27,6 +27,80 @@ from lbaas import version
 api_opts = [
     cfg.StrOpt('host', default='0.0.0.0', help='LBaaS API server host'),
     cfg.PortOpt('port', default=8993, help='LBaaS API server port'),
+    cfg.IntOpt(
+        'stream_batch_size',
+        default=500,
+        min=1,
+        help='Number of objects read from the database at once when a '
+             'collection is streamed as NDJSON.'
+    ),
+    cfg.BoolOpt(
+        'compress_responses',
+        default=True,
+        help='Compress response bodies with gzip for clients accepting '
+             'it.'
+    ),
+    cfg.IntOpt(
+        'compress_min_size',
+        default=1024,
+        min=0,
+        help='Minimum size in bytes of the response bodies to compress. '
+             'Smaller ones cost more to compress than they save.'
+    ),
+    cfg.IntOpt(
+        'compress_level',
+        default=6,
+        min=1,
+        max=9,
+        help='gzip compression level, from 1 (fastest) to 9 (smallest).'
+    ),
+    cfg.IntOpt(
+        'workers',
+        default=1,
+        min=1,
+        help='Number of API worker processes. With more than one, they '
+             'are forked from the server process, which starts them again '
+             'if they die.'
+    ),
+    cfg.BoolOpt(
+        'reuse_port',
+        default=False,
+        help='Make every API worker listen on its own socket with '
+             'SO_REUSEPORT, so that the kernel spreads the connections '
+             'evenly between them. Otherwise the workers accept on one '
+             'shared socket.'
+    ),
+    cfg.IntOpt(
+        'pool_size',
+        default=100,
+        min=1,
+        help='Size of the green thread pool of each worker, which is '
+             'also its maximum number of clients. Every client '
+             'connection holds a green thread until it is closed, idle '
+             'keep-alive ones included, so once all of them are taken, '
+             'new connections wait in the backlog.'
+    ),
+    cfg.IntOpt(
+        'backlog',
+        default=4096,
+        min=1,
+        help='Number of connections waiting to be accepted.'
+    ),
+    cfg.BoolOpt(
+        'keep_alive',
+        default=True,
+        help='Keep client connections open between requests.'
+    ),
+    cfg.IntOpt(
+        'client_socket_timeout',
+        default=900,
+        min=0,
+        help='Seconds a client socket may stay idle before it is '
+             'closed. It limits every single read and write on the '
+             'socket, e.g. while waiting for the next request on a '
+             'keep-alive connection, not the time taken by a whole '
+             'request. 0 means no timeout.'
+    ),
 ]
 
 pecan_opts = [
@@ -56,18 +130,140 @@ lbaas_opts = [
         default='haproxy',
         help='Implementation driver for LBaaS'
     ),
+    cfg.FloatOpt(
+        'primary_read_window',
+        default=0.0,
+        min=0.0,
+        help='Number of seconds after a write when reads keep going to '
+             'the primary database instead of [database]/slave_connection, '
+             'so that clients read their own writes despite replication '
+             'lag. The time of the last write of a client is also kept in '
+             'a cookie, so it holds across API workers for clients sending '
+             'cookies back. 0 disables it.'
+    ),
+    cfg.StrOpt(
+        'json_codec',
+        default='auto',
+        choices=['auto', 'jsonutils', 'orjson', 'ujson'],
+        help='Library encoding and decoding values of JSON database '
+             'columns. "auto" uses the fastest one installed.'
+    ),
+    cfg.BoolOpt(
+        'auto_create_db',
+        default=False,
+        help='Create the tables on start if the database is empty. '
+             'Otherwise the database must be set up with '
+             '"lbaas-db-manage upgrade head" first.'
+    ),
 ]
 
+sqlite_opts = [
+    cfg.StrOpt(
+        'journal_mode',
+        default='WAL',
+        choices=['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'],
+        help='Journal mode of SQLite database files. In WAL mode readers '
+             'do not block the writer and the writer does not block '
+             'readers.'
+    ),
+    cfg.StrOpt(
+        'synchronous',
+        default='NORMAL',
+        choices=['OFF', 'NORMAL', 'FULL', 'EXTRA'],
+        help='SQLite synchronous setting. NORMAL is durable in WAL mode '
+             'except for the last commits on a power loss, and avoids an '
+             'fsync per commit.'
+    ),
+    cfg.IntOpt(
+        'busy_timeout',
+        default=5000,
+        min=0,
+        help='Milliseconds SQLite waits for a lock held by another '
+             'connection before failing with "database is locked".'
+    ),
+    cfg.IntOpt(
+        'mmap_size',
+        default=268435456,
+        min=0,
+        help='Bytes of SQLite database file to access through '
+             'memory-mapped I/O.'
+    ),
+    cfg.IntOpt(
+        'cache_size',
+        default=65536,
+        min=0,
+        help='SQLite page cache size per connection, in KiB.'
+    ),
+    cfg.BoolOpt(
+        'serialize_writes',
+        default=True,
+        help='Run write transactions one at a time within the process, '
+             'so that concurrent writers queue up instead of failing on '
+             'the SQLite database lock.'
+    ),
+]
+
+cache_opts = [
+    cfg.BoolOpt(
+        'enabled',
+        default=True,
+        help='Cache listeners and members read outside of transactions '
+             'in memory of the process.'
+    ),
+    cfg.IntOpt(
+        'size',
+        default=1000,
+        min=1,
+        help='Maximum number of cached results. The least recently used '
+             'ones are evicted first.'
+    ),
+    cfg.FloatOpt(
+        'ttl',
+        default=10.0,
+        min=0.0,
+        help='Seconds a cached result is used for.'
+    ),
+    cfg.FloatOpt(
+        'revision_check_interval',
+        default=1.0,
+        min=0.0,
+        help='Seconds between checks of the database revision, which '
+             'drop the cache when another process changed the data. '
+             'Changes made by this process drop the cache immediately.'
+    ),
+]
+
+changes_opts = [
+    cfg.IntOpt(
+        'retention',
+        default=86400,
+        min=60,
+        help='Seconds the change log keeps changes for. Clients asking '
+             'for older changes have to reload the data instead.'
+    ),
+    cfg.FloatOpt(
+        'max_wait',
+        default=60.0,
+        min=0.0,
+        help='Maximum seconds a change feed request waits for changes.'
+    ),
+]
 
 CONF = cfg.CONF
 
 API_GROUP = 'api'
+CACHE_GROUP = 'cache'
+CHANGES_GROUP = 'changes'
 LBAAS_GROUP = 'lbaas'
 PECAN_GROUP = 'pecan'
+SQLITE_GROUP = 'sqlite'
 
 CONF.register_opts(api_opts, group=API_GROUP)
+CONF.register_opts(cache_opts, group=CACHE_GROUP)
+CONF.register_opts(changes_opts, group=CHANGES_GROUP)
 CONF.register_opts(lbaas_opts, group=LBAAS_GROUP)
 CONF.register_opts(pecan_opts, group=PECAN_GROUP)
+CONF.register_opts(sqlite_opts, group=SQLITE_GROUP)
 
 
 _DEFAULT_LOG_LEVELS = [
@@ -80,8 +276,11 @@ _DEFAULT_LOG_LEVELS = [
 def list_opts():
     return [
         (API_GROUP, api_opts),
+        (CACHE_GROUP, cache_opts),
+        (CHANGES_GROUP, changes_opts),
         (LBAAS_GROUP, lbaas_opts),
         (PECAN_GROUP, pecan_opts),
+        (SQLITE_GROUP, sqlite_opts),
     ]
 
 
@@ -14,13 +14,19 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import functools
+import time
+
+from eventlet import semaphore
 import six
 
 from oslo_config import cfg
 from oslo_db import options
 from oslo_db.sqlalchemy import session as db_session
 from oslo_log import log as logging
+import sqlalchemy as sa
 
+from lbaas.db.sqlalchemy import types
 from lbaas import exceptions as exc
 from lbaas import utils
 
@@ -30,51 +36,233 @@ LOG = logging.getLogger(__name__)
 # Note(dzimine): sqlite only works for basic testing.
 options.set_defaults(cfg.CONF, connection="sqlite:///lbaas.sqlite")
 
-_DB_SESSION_THREAD_LOCAL_NAME = "db_sql_alchemy_session"
+_session = utils.ContextLocal("db_sql_alchemy_session")
+_read_only_flag = utils.ContextLocal("db_sql_alchemy_read_only")
+_writer_lock_held = utils.ContextLocal("db_sql_alchemy_writer_lock")
+_write_time = utils.ContextLocal("db_sql_alchemy_write_time")
+
+# Value of _read_only_flag for reads which must not use the slave.
+_PRIMARY = 'primary'
 
 _facade = None
 
+# Time of the last commit on the primary database made by this process.
+_last_write_time = 0
+
+# Serializes write transactions on SQLite, see _writer_lock().
+_sqlite_writer_lock = None
+
+cfg.CONF.import_opt('primary_read_window', 'lbaas.config', group='lbaas')
+cfg.CONF.import_opt('json_codec', 'lbaas.config', group='lbaas')
+cfg.CONF.import_group('sqlite', 'lbaas.config')
+
 
 def _get_facade():
     global _facade
 
     if not _facade:
+        types.load_json_codec(cfg.CONF.lbaas.json_codec)
+
         _facade = db_session.EngineFacade(
             cfg.CONF.database.connection,
             sqlite_fk=True,
             autocommit=False,
+            json_serializer=types.json_dumps,
+            json_deserializer=types.json_loads,
             **dict(six.iteritems(cfg.CONF.database))
         )
 
+        _init_sqlite(_facade.get_engine())
+
+        if cfg.CONF.database.slave_connection:
+            _init_sqlite(_facade.get_engine(use_slave=True))
+
     return _facade
 
 
+def _init_sqlite(engine):
+    """Tunes connections to SQLite database files."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    if engine.url.database in (None, '', ':memory:'):
+        return
+
+    sa.event.listen(engine, 'connect', _set_sqlite_pragmas)
+
+    # Drop connections opened before the listener was added.
+    engine.dispose()
+
+
+def _set_sqlite_pragmas(dbapi_con, con_record):
+    conf = cfg.CONF.sqlite
+
+    cursor = dbapi_con.cursor()
+
+    cursor.execute("PRAGMA journal_mode = %s" % conf.journal_mode)
+    cursor.execute("PRAGMA synchronous = %s" % conf.synchronous)
+    cursor.execute("PRAGMA busy_timeout = %d" % conf.busy_timeout)
+    cursor.execute("PRAGMA mmap_size = %d" % conf.mmap_size)
+    # Negative value is the size in KiB rather than in pages.
+    cursor.execute("PRAGMA cache_size = -%d" % conf.cache_size)
+
+    cursor.close()
+
+
+def _writer_lock():
+    """Returns the lock to hold during a write transaction, or None.
+
+    SQLite allows a single writer at a time. Queueing writers on a lock
+    is cheaper than letting them fail with "database is locked" and
+    retry, while readers go on in parallel in WAL mode.
+
+    API requests run in green threads, so it's a green lock. It's made
+    on first use rather than on import, which may happen before eventlet
+    patches the standard library.
+    """
+    global _sqlite_writer_lock
+
+    if not cfg.CONF.sqlite.serialize_writes:
+        return None
+
+    if get_engine().dialect.name != 'sqlite':
+        return None
+
+    if _sqlite_writer_lock is None:
+        _sqlite_writer_lock = semaphore.Semaphore()
+
+    return _sqlite_writer_lock
+
+
+def _release_writer_lock():
+    lock = _writer_lock_held.get()
+
+    if lock:
+        _writer_lock_held.set(None)
+        lock.release()
+
+
 def get_engine():
     return _get_facade().get_engine()
 
 
-def _get_session():
-    return _get_facade().get_session()
+def dispose_engine():
+    """Closes the database connections and drops the engine.
+
+    The next database access creates a new engine, e.g. in a process
+    forked after this, instead of sharing connections with the parent.
+    """
+    global _facade
+
+    if not _facade:
+        return
+
+    _facade.get_engine().dispose()
+
+    if cfg.CONF.database.slave_connection:
+        _facade.get_engine(use_slave=True).dispose()
+
+    _facade = None
+
+
+def _get_session(use_slave=False):
+    return _get_facade().get_session(use_slave=use_slave)
+
+
+def _mark_write():
+    global _last_write_time
+
+    _last_write_time = time.time()
+
+    _write_time.set(_last_write_time)
+
+
+def get_write_time():
+    """Returns the time of the last write in this context, or None."""
+    return _write_time.get()
+
+
+def set_write_time(write_time):
+    """Sets the time of the last write made by the client served.
+
+    Reads in this context use the primary database within
+    [lbaas]/primary_read_window seconds after it as well as after
+    writes of this process. It lets a client read its own writes made
+    through another process.
+    """
+    _write_time.set(write_time)
+
+
+def _can_use_slave():
+    if not cfg.CONF.database.slave_connection:
+        return False
+
+    if _read_only_flag.get() == _PRIMARY:
+        return False
+
+    window = cfg.CONF.lbaas.primary_read_window
+    last_write_time = max(_last_write_time, _write_time.get() or 0)
+
+    return time.time() - last_write_time >= window
 
 
 def _get_thread_local_session():
-    return utils.get_thread_local(_DB_SESSION_THREAD_LOCAL_NAME)
+    return _session.get()
 
 
-def _get_or_create_thread_local_session():
+def _get_or_create_thread_local_session(use_slave=False):
     ses = _get_thread_local_session()
 
     if ses:
         return ses, False
 
-    ses = _get_session()
+    ses = _get_session(use_slave=use_slave)
     _set_thread_local_session(ses)
 
     return ses, True
 
 
 def _set_thread_local_session(session):
-    utils.set_thread_local(_DB_SESSION_THREAD_LOCAL_NAME, session)
+    _session.set(session)
+
+
+def _read_only(func, flag):
+    @functools.wraps(func)
+    def _read_only(*args, **kw):
+        read_only_before = _read_only_flag.get()
+
+        _read_only_flag.set(flag)
+
+        try:
+            return func(*args, **kw)
+        finally:
+            _read_only_flag.set(read_only_before)
+
+    return _read_only
+
+
+def read_only(func):
+    """Decorator for read-only methods.
+
+    Sessions they open may use the slave database, if one is configured
+    and there was no write within [lbaas]/primary_read_window seconds.
+    Within a transaction they use its session, i.e. the primary one.
+    """
+    return _read_only(func, True)
+
+
+def read_only_primary(func):
+    """Decorator for read-only methods which must see the last commits.
+
+    Like read_only, but sessions they open always use the primary
+    database, e.g. to read revisions compared with the ones of changes
+    just made.
+    """
+    return _read_only(func, _PRIMARY)
+
+
+def _is_read_only():
+    return bool(_read_only_flag.get())
 
 
 def session_aware(param_name="session"):
@@ -84,7 +272,17 @@ def session_aware(param_name="session"):
         def _within_session(*args, **kw):
             # If 'created' flag is True it means that the transaction is
             # demarcated explicitly outside this module.
-            ses, created = _get_or_create_thread_local_session()
+            slave = _is_read_only() and _can_use_slave()
+
+            ses, created = _get_or_create_thread_local_session(slave)
+
+            lock = None
+
+            if created and not _is_read_only():
+                lock = _writer_lock()
+
+            if lock:
+                lock.acquire()
 
             try:
                 kw[param_name] = ses
@@ -94,6 +292,9 @@ def session_aware(param_name="session"):
                 if created:
                     ses.commit()
 
+                    if not slave:
+                        _mark_write()
+
                 return result
             except Exception:
                 if created:
@@ -104,6 +305,9 @@ def session_aware(param_name="session"):
                     _set_thread_local_session(None)
                     ses.close()
 
+                if lock:
+                    lock.release()
+
         _within_session.__doc__ = func.__doc__
 
         return _within_session
@@ -125,7 +329,24 @@ def start_tx():
             "Database transaction has already been started."
         )
 
-    _set_thread_local_session(_get_session())
+    lock = _writer_lock()
+
+    if lock:
+        lock.acquire()
+
+    try:
+        _set_thread_local_session(_get_session())
+    except Exception:
+        if lock:
+            lock.release()
+        raise
+
+    _writer_lock_held.set(lock)
+
+
+def in_transaction():
+    """Returns True if a transaction was started in this thread."""
+    return _get_thread_local_session() is not None
 
 
 def commit_tx():
@@ -140,6 +361,12 @@ def commit_tx():
 
     ses.commit()
 
+    _mark_write()
+
+    # The changes are written, other writers may go on while the caller
+    # applies them, e.g. restarts the balancer.
+    _release_writer_lock()
+
 
 def rollback_tx():
     """Rolls back previously started database transaction."""
@@ -152,6 +379,8 @@ def rollback_tx():
 
     ses.rollback()
 
+    _release_writer_lock()
+
 
 def end_tx():
     """Ends transaction.
@@ -166,11 +395,15 @@ def end_tx():
             "Database transaction has not been started."
         )
 
-    if ses.dirty:
-        rollback_tx()
+    try:
+        if ses.dirty:
+            rollback_tx()
+
+        ses.close()
+    finally:
+        _set_thread_local_session(None)
 
-    ses.close()
-    _set_thread_local_session(None)
+        _release_writer_lock()
 
 
 @session_aware()
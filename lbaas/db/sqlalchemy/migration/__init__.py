@@ -0,0 +1,73 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import os
+
+from alembic import config as alembic_cfg
+from alembic.runtime import migration
+from alembic import script as alembic_script
+from oslo_db import exception as db_exc
+import sqlalchemy as sa
+
+_VERSION_TABLE = 'alembic_version'
+
+
+def get_alembic_config():
+    config = alembic_cfg.Config(
+        os.path.join(os.path.dirname(__file__), 'alembic.ini')
+    )
+    config.set_main_option(
+        'script_location',
+        'lbaas.db.sqlalchemy.migration:alembic_migrations'
+    )
+
+    return config
+
+
+def _get_script():
+    return alembic_script.ScriptDirectory.from_config(get_alembic_config())
+
+
+def get_head_revision():
+    """Returns the revision of the latest migration."""
+    return _get_script().get_current_head()
+
+
+def get_current_revision(engine):
+    """Returns the revision the database was migrated to.
+
+    Reading it takes one query. None means the database has no revision,
+    i.e. it was not set up with migrations.
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                sa.text('SELECT version_num FROM %s' % _VERSION_TABLE)
+            ).scalar()
+    except db_exc.DBError:
+        if has_table(engine, _VERSION_TABLE):
+            raise
+
+        return None
+
+
+def has_table(engine, name):
+    with engine.connect() as conn:
+        return engine.dialect.has_table(conn, name)
+
+
+def stamp_head(engine):
+    """Records the latest migration as the revision of the database."""
+    with engine.begin() as conn:
+        migration.MigrationContext.configure(conn).stamp(_get_script(), 'head')
@@ -0,0 +1,54 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add certificates
+
+Revision ID: 004
+Revises: 003
+Create Date: 2016-05-12 14:02:41.318804
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+
+from alembic import op
+import sqlalchemy as sa
+
+from lbaas.db.sqlalchemy import types
+
+
+def upgrade():
+    op.create_table(
+        'certificates_v1',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('content', types.LongText(), nullable=True),
+        sa.Column('fingerprint', sa.String(length=64), nullable=True),
+        sa.Column('sni', types.JsonEncoded(), nullable=True),
+        sa.Column('listener_id', sa.String(length=36), nullable=True),
+        sa.ForeignKeyConstraint(['listener_id'], [u'listeners_v1.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(
+        'certificates_v1_fingerprint',
+        'certificates_v1',
+        ['fingerprint']
+    )
@@ -0,0 +1,37 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Added server_name field to listener
+
+Revision ID: 006
+Revises: 005
+Create Date: 2016-05-27 16:12:55.204617
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column(
+        'listeners_v1',
+        sa.Column('server_name', sa.String(length=255), nullable=True)
+    )
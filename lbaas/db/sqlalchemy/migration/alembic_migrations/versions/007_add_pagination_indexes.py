@@ -0,0 +1,42 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add pagination indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2016-06-03 12:27:19.731044
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+
+from alembic import op
+
+
+def upgrade():
+    # Sorting by name is served by the unique constraint index.
+    op.create_index(
+        'listeners_v1_created_at_id',
+        'listeners_v1',
+        ['created_at', 'id']
+    )
+    op.create_index(
+        'members_v1_created_at_id',
+        'members_v1',
+        ['created_at', 'id']
+    )
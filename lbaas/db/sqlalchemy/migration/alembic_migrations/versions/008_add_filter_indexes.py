@@ -0,0 +1,46 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add member and listener filter indexes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2016-06-07 10:41:02.518930
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index(
+        'members_v1_listener_id',
+        'members_v1',
+        ['listener_id']
+    )
+    op.create_index(
+        'members_v1_address_port',
+        'members_v1',
+        ['address', 'protocol_port']
+    )
+    op.create_index(
+        'listeners_v1_address_port',
+        'listeners_v1',
+        ['address', 'protocol_port']
+    )
@@ -0,0 +1,83 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add member tags
+
+Revision ID: 009
+Revises: 008
+Create Date: 2016-06-09 15:02:47.381206
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+
+from alembic import op
+import sqlalchemy as sa
+
+from lbaas.db.sqlalchemy import types
+from lbaas import exceptions
+
+MAX_TAG_LENGTH = 80
+
+
+def upgrade():
+    # Tags stored in the members table are checked first, so an upgrade
+    # which can't backfill them fails before changing the schema.
+    members = sa.table(
+        'members_v1',
+        sa.column('id', sa.String(36)),
+        sa.column('tags', types.JsonListType())
+    )
+
+    rows = []
+    too_long = []
+
+    for member_id, tags in op.get_bind().execute(sa.select([members])):
+        for tag in set(tags or []):
+            if len(tag) > MAX_TAG_LENGTH:
+                too_long.append('%s: %s' % (member_id, tag))
+
+            rows.append({'member_id': member_id, 'tag': tag})
+
+    if too_long:
+        raise exceptions.DBException(
+            'Member tags must be at most %s characters long, shorten these '
+            'tags before upgrading [%s]' %
+            (MAX_TAG_LENGTH, ', '.join(too_long))
+        )
+
+    member_tags = op.create_table(
+        'member_tags_v1',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('member_id', sa.String(length=36), nullable=False),
+        sa.Column('tag', sa.String(length=MAX_TAG_LENGTH), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['member_id'],
+            [u'members_v1.id'],
+            ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('member_id', 'tag')
+    )
+    op.create_index(
+        'member_tags_v1_tag',
+        'member_tags_v1',
+        ['tag', 'member_id']
+    )
+
+    if rows:
+        op.bulk_insert(member_tags, rows)
@@ -0,0 +1,52 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Use native JSON columns
+
+Revision ID: 010
+Revises: 009
+Create Date: 2016-06-14 11:20:36.118422
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+JSON_COLUMNS = (
+    ('listeners_v1', 'options'),
+    ('listeners_v1', 'ssl_info'),
+    ('members_v1', 'tags'),
+    ('certificates_v1', 'sni'),
+    ('l7policies_v1', 'rules'),
+)
+
+
+def upgrade():
+    # MySQL JSON columns need SQLAlchemy 1.1, they stay TEXT.
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, column in JSON_COLUMNS:
+            op.alter_column(
+                table,
+                column,
+                type_=postgresql.JSONB(),
+                existing_type=sa.Text(),
+                postgresql_using='%s::jsonb' % column
+            )
@@ -0,0 +1,42 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add revisions
+
+Revision ID: 011
+Revises: 010
+Create Date: 2016-06-16 09:12:40.552017
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    revisions = op.create_table(
+        'revisions_v1',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('name', sa.String(length=80), nullable=False),
+        sa.Column('revision', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    op.bulk_insert(revisions, [{'name': 'global', 'revision': 0}])
@@ -0,0 +1,44 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add change log
+
+Revision ID: 012
+Revises: 011
+Create Date: 2016-06-20 14:37:05.904163
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'changes_v1',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('revision', sa.BigInteger(), nullable=False),
+        sa.Column('resource', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=False),
+        sa.Column('action', sa.String(length=10), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('changes_v1_revision', 'changes_v1', ['revision'])
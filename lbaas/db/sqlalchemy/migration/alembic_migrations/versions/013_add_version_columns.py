@@ -0,0 +1,42 @@
+# Copyright 2016 OpenStack Foundation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add listener and member versions
+
+Revision ID: 013
+Revises: 012
+Create Date: 2016-06-23 16:05:51.730284
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    for table in ('listeners_v1', 'members_v1'):
+        op.add_column(
+            table,
+            sa.Column(
+                'version',
+                sa.Integer(),
+                nullable=False,
+                server_default='1'
+            )
+        )
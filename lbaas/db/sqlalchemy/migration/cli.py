@@ -13,15 +13,14 @@
 
 """Starter script for lbaas-db-manage."""
 
-import os
-
 from alembic import command as alembic_cmd
-from alembic import config as alembic_cfg
 from alembic import util as alembic_u
 from oslo_config import cfg
 from oslo_utils import importutils
 import six
 
+from lbaas.db.sqlalchemy import migration
+
 
 # We need to import lbaas.api.app to
 # make sure we register all needed options.
@@ -104,13 +103,7 @@ CONF.register_cli_opt(command_opt)
 
 
 def main():
-    config = alembic_cfg.Config(
-        os.path.join(os.path.dirname(__file__), 'alembic.ini')
-    )
-    config.set_main_option(
-        'script_location',
-        'lbaas.db.sqlalchemy.migration:alembic_migrations'
-    )
+    config = migration.get_alembic_config()
     # attach the Mistral conf to the Alembic conf
     config.lbaas_config = CONF
 
@@ -19,7 +19,6 @@ import six
 from oslo_db.sqlalchemy import models as oslo_models
 import sqlalchemy as sa
 from sqlalchemy.ext import declarative
-from sqlalchemy.orm import attributes
 
 from lbaas import utils
 
@@ -58,18 +57,38 @@ class _LbaasModelBase(oslo_models.ModelBase, oslo_models.TimestampMixin):
 
         return True
 
-    def to_dict(self):
-        """sqlalchemy based automatic to_dict method."""
-        d = {}
+    @classmethod
+    def _get_dict_columns(cls):
+        """Returns the names of the columns to_dict() reads, built once.
 
-        # If a column is unloaded at this point, it is
-        # probably deferred. We do not want to access it
-        # here and thereby cause it to load.
-        unloaded = attributes.instance_state(self).unloaded
+        In case of single table inheritance a class attribute
+        corresponding to a table column may not exist so these
+        columns are skipped.
+        """
+        columns = cls.__dict__.get('_dict_columns')
 
-        for col in self.__table__.columns:
-            if col.name not in unloaded and hasattr(self, col.name):
-                d[col.name] = getattr(self, col.name)
+        if columns is None:
+            columns = tuple(
+                col.name for col in cls.__table__.columns
+                if hasattr(cls, col.name)
+            )
+
+            cls._dict_columns = columns
+
+        return columns
+
+    def to_dict(self):
+        """sqlalchemy based automatic to_dict method."""
+        # Loaded column values are kept in the instance dictionary,
+        # reading it avoids the attribute instrumentation. If a column
+        # is unloaded at this point, it is probably deferred. We do not
+        # want to access it here and thereby cause it to load.
+        values = self.__dict__
+
+        d = dict(
+            (name, values[name]) for name in self._get_dict_columns()
+            if name in values
+        )
 
         datetime_to_str(d, 'created_at')
         datetime_to_str(d, 'updated_at')
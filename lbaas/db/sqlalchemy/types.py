@@ -19,28 +19,172 @@
 #
 
 from oslo_serialization import jsonutils
+from oslo_utils import importutils
+import six
 import sqlalchemy as sa
 from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext import mutable
 
 
+# Functions encoding and decoding values of JSON columns.
+_json_dumps = jsonutils.dumps
+_json_loads = jsonutils.loads
+
+# JSON libraries in the order of preference, with functions returning
+# their (dumps, loads) pair.
+_JSON_CODECS = (
+    ('orjson', lambda m: (lambda v: m.dumps(v).decode('utf-8'), m.loads)),
+    ('ujson', lambda m: (m.dumps, m.loads)),
+)
+
+
+def set_json_codec(dumps, loads):
+    """Sets the functions encoding and decoding values of JSON columns."""
+    global _json_dumps, _json_loads
+
+    _json_dumps = dumps
+    _json_loads = loads
+
+
+def load_json_codec(name='auto'):
+    """Sets the JSON library encoding and decoding values of JSON columns.
+
+    :param name: 'jsonutils', a library name from _JSON_CODECS or 'auto'
+                 to use the first installed library from _JSON_CODECS.
+    """
+    if name == 'jsonutils':
+        return set_json_codec(jsonutils.dumps, jsonutils.loads)
+
+    for lib_name, codec in _JSON_CODECS:
+        if name == 'auto':
+            module = importutils.try_import(lib_name)
+
+            if module is None:
+                continue
+        elif name == lib_name:
+            module = importutils.import_module(lib_name)
+        else:
+            continue
+
+        return set_json_codec(*codec(module))
+
+    if name != 'auto':
+        raise ValueError("Unknown JSON codec: %s" % name)
+
+    set_json_codec(jsonutils.dumps, jsonutils.loads)
+
+
+def json_dumps(value):
+    return _json_dumps(value)
+
+
+def json_loads(value):
+    return _json_loads(value)
+
+
+def _native_json_type(dialect):
+    """Returns the type storing JSON natively in the dialect, or None."""
+    if dialect.name == 'postgresql':
+        return postgresql.JSONB(none_as_null=True)
+
+    return None
+
+
 class JsonEncoded(sa.TypeDecorator):
-    """Represents an immutable structure as a json-encoded string."""
+    """Represents an immutable structure as a json-encoded string.
+
+    PostgreSQL stores it in a native JSONB column, encoded by the
+    serializer the engine was created with.
+    """
 
     impl = sa.Text
 
+    def load_dialect_impl(self, dialect):
+        native = _native_json_type(dialect)
+
+        if native is not None:
+            return native
+
+        return dialect.type_descriptor(self.impl)
+
     def process_bind_param(self, value, dialect):
-        if value is not None:
-            value = jsonutils.dumps(value)
-        return value
+        if value is None or _native_json_type(dialect) is not None:
+            return value
+
+        # Values loaded from the database and not changed since then
+        # keep their encoded form.
+        encoded = getattr(value, '_encoded', None)
+
+        if encoded is not None:
+            return encoded
+
+        return json_dumps(value)
 
     def process_result_value(self, value, dialect):
-        if value is not None:
-            value = jsonutils.loads(value)
+        if value is None:
+            return value
+
+        encoded = None
+
+        # Drivers may decode native JSON columns themselves.
+        if isinstance(value, six.string_types):
+            encoded = value
+            value = json_loads(value)
+
+        if isinstance(value, dict):
+            value = MutableDict(value)
+        elif isinstance(value, list):
+            value = MutableList(value)
+        else:
+            return value
+
+        value._encoded = encoded
+
         return value
 
 
+class MutableDict(mutable.MutableDict):
+    """MutableDict forgetting its encoded form when changed."""
+
+    _encoded = None
+
+    def changed(self):
+        self._encoded = None
+
+        super(MutableDict, self).changed()
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self.changed()
+
+    def setdefault(self, key, value=None):
+        result = dict.setdefault(self, key, value)
+        self.changed()
+
+        return result
+
+    def pop(self, *args):
+        result = dict.pop(self, *args)
+        self.changed()
+
+        return result
+
+    def popitem(self):
+        result = dict.popitem(self)
+        self.changed()
+
+        return result
+
+
 class MutableList(mutable.Mutable, list):
+    _encoded = None
+
+    def changed(self):
+        self._encoded = None
+
+        super(MutableList, self).changed()
+
     @classmethod
     def coerce(cls, key, value):
         """Convert plain lists to MutableList."""
@@ -72,10 +216,32 @@ class MutableList(mutable.Mutable, list):
         list.__delitem__(self, i)
         self.changed()
 
+    def extend(self, values):
+        """Detect list extend events and emit change events."""
+        list.extend(self, values)
+        self.changed()
+
+    def insert(self, i, value):
+        """Detect list insert events and emit change events."""
+        list.insert(self, i, value)
+        self.changed()
+
+    def pop(self, *args):
+        """Detect list pop events and emit change events."""
+        result = list.pop(self, *args)
+        self.changed()
+
+        return result
+
+    def remove(self, value):
+        """Detect list remove events and emit change events."""
+        list.remove(self, value)
+        self.changed()
+
 
 def JsonDictType():
     """Returns an SQLAlchemy Column Type suitable to store a Json dict."""
-    return mutable.MutableDict.as_mutable(JsonEncoded)
+    return MutableDict.as_mutable(JsonEncoded)
 
 
 def JsonListType():
@@ -93,4 +259,4 @@ class JsonEncodedLongText(JsonEncoded):
 
 
 def JsonLongDictType():
-    return mutable.MutableDict.as_mutable(JsonEncodedLongText)
+    return MutableDict.as_mutable(JsonEncodedLongText)
@@ -0,0 +1,157 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+#   This module implements single statement "insert or update" for the
+#   dialects supporting it, since the SQLAlchemy version we depend on
+#   doesn't provide it.
+#
+
+import collections
+
+from sqlalchemy.ext import compiler
+from sqlalchemy.sql import expression
+
+
+# SQL giving the current UTC time, as oslo.db timestamps are in UTC.
+_UTC_NOW = {
+    'mysql': 'UTC_TIMESTAMP()',
+    'postgresql': "timezone('utc', now())",
+    'sqlite': 'CURRENT_TIMESTAMP'
+}
+
+
+class Upsert(expression.Insert):
+    """INSERT updating the conflicting row instead of failing.
+
+    :param table: Table to insert into.
+    :param index_elements: Columns of the unique constraint to detect
+                           conflicting rows with.
+    :param update_columns: Columns to update in a conflicting row.
+    :param touch_column: Optional. Column set to the current time when
+                         a conflicting row is updated.
+    :param version_column: Optional. Column incremented when a conflicting
+                           row is updated.
+    """
+
+    def __init__(self, table, index_elements, update_columns,
+                 touch_column=None, version_column=None):
+        super(Upsert, self).__init__(table)
+
+        self.index_elements = index_elements
+        self.update_columns = update_columns
+        self.touch_column = touch_column
+        self.version_column = version_column
+
+
+@compiler.compiles(Upsert)
+def _compile_upsert(element, sql_compiler, **kw):
+    sql = sql_compiler.visit_insert(element, **kw)
+
+    dialect = sql_compiler.dialect.name
+    quote = sql_compiler.preparer.quote
+
+    if dialect == 'mysql':
+        assignments = [
+            '%s = VALUES(%s)' % (quote(c), quote(c))
+            for c in element.update_columns
+        ]
+    else:
+        assignments = [
+            '%s = excluded.%s' % (quote(c), quote(c))
+            for c in element.update_columns
+        ]
+
+    if element.touch_column:
+        assignments.append(
+            '%s = %s' % (quote(element.touch_column), _UTC_NOW[dialect])
+        )
+
+    if element.version_column:
+        column = quote(element.version_column)
+
+        assignments.append('%s = %s.%s + 1' % (
+            column, quote(element.table.name), column
+        ))
+
+    if dialect == 'mysql':
+        if not assignments:
+            # Keeps the existing row as it is.
+            column = quote(element.index_elements[0])
+            assignments = ['%s = %s' % (column, column)]
+
+        return '%s ON DUPLICATE KEY UPDATE %s' % (sql, ', '.join(assignments))
+
+    if not assignments:
+        return '%s ON CONFLICT DO NOTHING' % sql
+
+    return '%s ON CONFLICT (%s) DO UPDATE SET %s' % (
+        sql,
+        ', '.join(quote(c) for c in element.index_elements),
+        ', '.join(assignments)
+    )
+
+
+def is_supported(dialect):
+    """Returns True if the dialect supports single statement upserts."""
+    if dialect.name == 'mysql':
+        return True
+
+    if dialect.name == 'postgresql':
+        return (dialect.server_version_info or (0,)) >= (9, 5)
+
+    if dialect.name == 'sqlite':
+        return dialect.dbapi.sqlite_version_info >= (3, 24, 0)
+
+    return False
+
+
+def upsert(session, table, rows, index_elements, touch_column=None,
+           version_column=None):
+    """Inserts rows, updating the existing ones with the same index values.
+
+    Rows with the same set of columns are sent as one batch (executemany).
+    Columns missing in a row are left intact in the existing row.
+
+    :param session: Session to execute statements in.
+    :param table: Table to insert into.
+    :param rows: List of dictionaries with column values.
+    :param index_elements: Columns of the unique constraint identifying
+                           existing rows.
+    :param touch_column: Optional. Column set to the current time in
+                         updated rows.
+    :param version_column: Optional. Column incremented in updated rows.
+    """
+    batches = collections.OrderedDict()
+
+    for row in rows:
+        batches.setdefault(tuple(sorted(row)), []).append(row)
+
+    for columns, batch in batches.items():
+        update_columns = [
+            c for c in columns
+            if c not in index_elements
+            and c not in (touch_column, version_column)
+            and not table.c[c].primary_key
+        ]
+
+        session.execute(
+            Upsert(
+                table,
+                index_elements,
+                update_columns,
+                touch_column,
+                version_column
+            ),
+            batch
+        )
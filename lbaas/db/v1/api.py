@@ -12,8 +12,13 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 import contextlib
+import functools
+import threading
+import time
 
+from oslo_config import cfg
 from oslo_db import api as db_api
 from oslo_log import log as logging
 
@@ -24,11 +29,23 @@ _BACKEND_MAPPING = {
 IMPL = db_api.DBAPI('sqlalchemy', backend_mapping=_BACKEND_MAPPING)
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_group('cache', 'lbaas.config')
+
 
 def setup_db():
     IMPL.setup_db()
 
 
+def check_db(auto_create=False):
+    IMPL.check_db(auto_create=auto_create)
+
+
+def dispose_db():
+    """Closes the database connections, e.g. before forking."""
+    IMPL.dispose_db()
+
+
 def drop_db():
     IMPL.drop_db()
 
@@ -58,71 +75,564 @@ def transaction():
         yield
 
 
+# Reading own writes.
+
+
+def get_write_time():
+    """Returns the time of the last write in this context, or None."""
+    return IMPL.get_write_time()
+
+
+def set_write_time(write_time):
+    """Sets the time of the last write made by the client served.
+
+    Reads within [lbaas]/primary_read_window seconds after it use the
+    primary database, even if the write was made by another process.
+    """
+    IMPL.set_write_time(write_time)
+
+
+# Cache.
+
+
+class _Cache(object):
+    """LRU cache of read results, each used for [cache]/ttl seconds.
+
+    Local commits changing the data drop the cache right away. Commits
+    of other processes are noticed by checking the global revision at
+    most every [cache]/revision_check_interval seconds.
+    """
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented on invalidation, so that results read before it
+        # are not cached after it.
+        self._generation = 0
+        self._revision = None
+        self._revision_checked_at = 0
+        self.stats = collections.Counter()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def revision(self):
+        """The last global revision seen, or None."""
+        return self._revision
+
+    def get(self, key):
+        """Returns a (found, value) pair."""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[1] < time.time():
+                self.stats['misses'] += 1
+
+                return False, None
+
+            self._entries[key] = self._entries.pop(key)
+            self.stats['hits'] += 1
+
+            return True, entry[0]
+
+    def put(self, key, value, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.time() + CONF.cache.ttl)
+
+            while len(self._entries) > CONF.cache.size:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, revision=None):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._revision = revision
+            self.stats['invalidations'] += 1
+
+    def check_revision(self):
+        interval = CONF.cache.revision_check_interval
+
+        if time.time() - self._revision_checked_at >= interval:
+            self.observe_revision(IMPL.get_revision())
+
+    def observe_revision(self, revision):
+        """Drops the cache if the global revision read is a new one."""
+        self._revision_checked_at = time.time()
+
+        if revision != self._revision:
+            self.invalidate(revision)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_CACHE = _Cache()
+
+# Notified on every local commit changing the data.
+_revision_committed = threading.Condition()
+
+
+def _on_revision_committed(revision):
+    _CACHE.invalidate(revision)
+
+    with _revision_committed:
+        _revision_committed.notify_all()
+
+
+IMPL.add_revision_listener(_on_revision_committed)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+
+    if isinstance(value, set):
+        return frozenset(value)
+
+    return value
+
+
+def _cached(func):
+    """Decorator caching results of read methods.
+
+    Within a transaction the results are always read from the database,
+    so they are bound to its session. Cached objects are shared between
+    callers and must not be modified.
+    """
+    @functools.wraps(func)
+    def _read(*args, **kwargs):
+        if not CONF.cache.enabled or IMPL.in_transaction():
+            return func(*args, **kwargs)
+
+        key = (func.__name__, _freeze(args), _freeze(kwargs))
+
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        _CACHE.check_revision()
+
+        found, result = _CACHE.get(key)
+
+        if not found:
+            generation = _CACHE.generation
+
+            result = func(*args, **kwargs)
+
+            _CACHE.put(key, result, generation)
+
+        if isinstance(result, list):
+            result = list(result)
+
+        return result
+
+    return _read
+
+
+def _iter_pages(get_rows, fields, batch_size, limit=None, marker=None,
+                **kwargs):
+    id_index = fields.index('id')
+
+    while limit is None or limit > 0:
+        size = batch_size if limit is None else min(batch_size, limit)
+
+        rows = get_rows(fields, limit=size, marker=marker, **kwargs)
+
+        if rows:
+            yield rows
+
+        if len(rows) < size:
+            return
+
+        marker = rows[-1][id_index]
+
+        if limit is not None:
+            limit -= len(rows)
+
+
+def get_cache_stats():
+    """Returns numbers of cache hits, misses, evictions and invalidations."""
+    stats = dict(
+        (k, _CACHE.stats[k])
+        for k in ('hits', 'misses', 'evictions', 'invalidations')
+    )
+
+    stats['size'] = len(_CACHE)
+
+    return stats
+
+
+def invalidate_cache():
+    _CACHE.invalidate()
+
+
+# Revisions.
+
+def get_revision():
+    """Returns the global revision, incremented by every data change."""
+    revision = IMPL.get_revision()
+
+    # Data read after this is at least as new as the revision.
+    _CACHE.observe_revision(revision)
+
+    return revision
+
+
+def get_listener_revision(name):
+    """Returns the revision of the listener and its child objects.
+
+    It's incremented by every change of the listener, its members,
+    certificates or L7 policies. 0 if the listener doesn't exist or
+    wasn't changed yet.
+    """
+    global_revision, revision = IMPL.get_listener_revision(name)
+
+    _CACHE.observe_revision(global_revision)
+
+    return revision
+
+
+def wait_for_revision(since, timeout):
+    """Waits until the global revision is greater than 'since'.
+
+    Local commits wake the waiters at once. Commits of other processes
+    are noticed by the revision checks shared with the cache, so the
+    waiters don't query the database each on its own.
+
+    :return: The last global revision seen.
+    """
+    deadline = time.time() + timeout
+
+    while True:
+        _CACHE.check_revision()
+
+        revision = _CACHE.revision
+
+        if revision is None:
+            revision = get_revision()
+
+        remaining = deadline - time.time()
+
+        if revision > since or remaining <= 0:
+            return revision
+
+        interval = max(CONF.cache.revision_check_interval, 0.1)
+
+        with _revision_committed:
+            _revision_committed.wait(min(remaining, interval))
+
+
+# Change log.
+
+def get_changes(since):
+    """Returns changes made after the 'since' revision, oldest first."""
+    return IMPL.get_changes(since)
+
+
 # Members.
 
+@_cached
 def get_member(name):
     return IMPL.get_member(name)
 
 
+@_cached
 def load_member(name):
     """Unlike get_member this method is allowed to return None."""
     return IMPL.load_member(name)
 
 
-def get_members():
-    return IMPL.get_members()
+@_cached
+def get_members(limit=None, marker=None, sort_keys=None, sort_dirs=None,
+                fields=None, created_since=None, tags=None, tags_any=None,
+                names=None, **kwargs):
+    return IMPL.get_members(
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        fields=fields,
+        created_since=created_since,
+        tags=tags,
+        tags_any=tags_any,
+        names=names,
+        **kwargs
+    )
 
 
 def create_member(values):
     return IMPL.create_member(values)
 
 
-def update_member(name, values):
-    return IMPL.update_member(name, values)
+def create_members(values_list):
+    return IMPL.create_members(values_list)
+
+
+def update_member(name, values, version=None):
+    """Updates the named member.
+
+    :param version: Optional. Version the member is expected to have,
+                    PreconditionFailedException is raised otherwise.
+    """
+    return IMPL.update_member(name, values, version=version)
+
+
+def update_members(values_list):
+    """Updates members found by name. Versions in values are expected."""
+    return IMPL.update_members(values_list)
 
 
 def create_or_update_member(name, values):
     return IMPL.create_or_update_member(name, values)
 
 
+def create_or_update_members(values_list):
+    """Creates or updates (found by name) members in one statement."""
+    return IMPL.create_or_update_members(values_list)
+
+
+def get_member_version(name):
+    """Returns the version of the named member, None if it doesn't exist."""
+    return IMPL.get_member_version(name)
+
+
 def delete_member(name):
     IMPL.delete_member(name)
 
 
-def delete_members(**kwargs):
-    IMPL.delete_members(**kwargs)
+def delete_members(tags=None, tags_any=None, names=None, **kwargs):
+    return IMPL.delete_members(
+        tags=tags,
+        tags_any=tags_any,
+        names=names,
+        **kwargs
+    )
+
+
+@_cached
+def get_member_rows(fields, limit=None, marker=None, sort_keys=None,
+                    sort_dirs=None, created_since=None, tags=None,
+                    tags_any=None, names=None, **kwargs):
+    """Returns a page of members as rows of the field values.
+
+    Faster than get_members() for read only listings, as no ORM
+    objects are built.
+    """
+    return IMPL.get_member_rows(
+        fields,
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        created_since=created_since,
+        tags=tags,
+        tags_any=tags_any,
+        names=names,
+        **kwargs
+    )
+
+
+def iter_member_pages(fields, batch_size, limit=None, marker=None,
+                      **kwargs):
+    """Yields pages of members as rows of the field values.
+
+    Pages of at most batch_size rows are read by separate queries, each
+    starting after the last row of the previous one, so the memory used
+    doesn't depend on the number of members. Pages are not cached.
+
+    :param fields: Names of the columns to select, including 'id'.
+    :param limit: Optional. Maximum number of members in all pages.
+    :param kwargs: Other arguments of get_member_rows().
+    """
+    return _iter_pages(
+        IMPL.get_member_rows,
+        fields,
+        batch_size,
+        limit,
+        marker,
+        **kwargs
+    )
 
 
 # Listeners.
 
+@_cached
 def get_listener(name):
     return IMPL.get_listener(name)
 
 
+@_cached
 def load_listener(name):
     """Unlike get_listener this method is allowed to return None."""
     return IMPL.load_listener(name)
 
 
-def get_listeners():
-    return IMPL.get_listeners()
+@_cached
+def get_listeners(limit=None, marker=None, sort_keys=None, sort_dirs=None,
+                  fields=None, created_since=None, **kwargs):
+    return IMPL.get_listeners(
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        fields=fields,
+        created_since=created_since,
+        **kwargs
+    )
+
+
+@_cached
+def get_listener_rows(fields, limit=None, marker=None, sort_keys=None,
+                      sort_dirs=None, created_since=None, **kwargs):
+    """Returns a page of listeners as rows of the field values.
+
+    Faster than get_listeners() for read only listings, as no ORM
+    objects are built.
+    """
+    return IMPL.get_listener_rows(
+        fields,
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        created_since=created_since,
+        **kwargs
+    )
+
+
+@_cached
+def get_listener_member_rows(listener_ids, fields):
+    """Returns rows of the field values of members by listener id."""
+    return IMPL.get_listener_member_rows(listener_ids, fields)
+
+
+def iter_listener_pages(fields, batch_size, member_fields=None,
+                        limit=None, marker=None, **kwargs):
+    """Yields pages of listeners as rows of the field values.
+
+    Works like iter_member_pages(). Each page is yielded with rows of
+    member_fields of the members of its listeners (as returned by
+    get_listener_member_rows()), or with None if member_fields are not
+    given.
+    """
+    id_index = fields.index('id')
+
+    for rows in _iter_pages(IMPL.get_listener_rows, fields, batch_size,
+                            limit, marker, **kwargs):
+        members = None
+
+        if member_fields:
+            members = IMPL.get_listener_member_rows(
+                [row[id_index] for row in rows],
+                member_fields
+            )
+
+        yield rows, members
 
 
 def create_listener(values):
     return IMPL.create_listener(values)
 
 
-def update_listener(name, values):
-    return IMPL.update_listener(name, values)
+def update_listener(name, values, version=None):
+    """Updates the named listener.
+
+    :param version: Optional. Version the listener is expected to have,
+                    PreconditionFailedException is raised otherwise.
+    """
+    return IMPL.update_listener(name, values, version=version)
 
 
 def create_or_update_listener(name, values):
     return IMPL.create_or_update_listener(name, values)
 
 
+def create_or_update_listeners(values_list):
+    """Creates or updates (found by name) listeners in one statement."""
+    return IMPL.create_or_update_listeners(values_list)
+
+
+def get_listener_version(name):
+    """Returns the version of the named listener, None if it doesn't exist."""
+    return IMPL.get_listener_version(name)
+
+
 def delete_listener(name):
     IMPL.delete_listener(name)
 
 
 def delete_listeners(**kwargs):
     IMPL.delete_listeners(**kwargs)
+
+
+# Certificates.
+
+def get_certificate(name):
+    return IMPL.get_certificate(name)
+
+
+def load_certificate(name):
+    """Unlike get_certificate this method is allowed to return None."""
+    return IMPL.load_certificate(name)
+
+
+def get_certificates():
+    return IMPL.get_certificates()
+
+
+def create_certificate(values):
+    return IMPL.create_certificate(values)
+
+
+def update_certificate(name, values):
+    return IMPL.update_certificate(name, values)
+
+
+def delete_certificate(name):
+    IMPL.delete_certificate(name)
+
+
+def delete_certificates(**kwargs):
+    IMPL.delete_certificates(**kwargs)
+
+
+# L7 policies.
+
+def get_l7policy(name):
+    return IMPL.get_l7policy(name)
+
+
+def load_l7policy(name):
+    """Unlike get_l7policy this method is allowed to return None."""
+    return IMPL.load_l7policy(name)
+
+
+def get_l7policies():
+    return IMPL.get_l7policies()
+
+
+def create_l7policy(values):
+    return IMPL.create_l7policy(values)
+
+
+def update_l7policy(name, values):
+    return IMPL.update_l7policy(name, values)
+
+
+def delete_l7policy(name):
+    IMPL.delete_l7policy(name)
+
+
+def delete_l7policies(**kwargs):
+    IMPL.delete_l7policies(**kwargs)
@@ -12,22 +12,52 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 import contextlib
+import datetime
+import functools
+import hashlib
 import sys
+import time
 
 from oslo_config import cfg
 from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import utils as db_utils
 from oslo_log import log as logging
+from oslo_utils import timeutils
 import sqlalchemy as sa
+from sqlalchemy import orm
 
 from lbaas.db.sqlalchemy import base as b
+from lbaas.db.sqlalchemy import migration
+from lbaas.db.sqlalchemy import upsert
 from lbaas.db.v1.sqlalchemy import models
 from lbaas import exceptions as exc
+from lbaas import utils
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+GLOBAL_REVISION = 'global'
+
+# Highest revision whose changes were pruned from the change log.
+PRUNED_CHANGES_REVISION = 'pruned_changes'
+
+# Objects whose changes are logged, by model.
+_CHANGE_LOG_RESOURCES = {
+    models.Listener: 'listener',
+    models.Member: 'member',
+}
+
+# Seconds between prunings of the change log by this process.
+_CHANGE_LOG_PRUNE_INTERVAL = 60
+
+_change_log_pruned_at = 0
+
+# Functions called with the new global revision after each commit
+# changing the data.
+_revision_listeners = []
+
 
 def get_backend():
     """Consumed by openstack common code.
@@ -45,6 +75,49 @@ def setup_db():
         raise exc.DBException("Failed to setup database: %s" % e)
 
 
+def check_db(auto_create=False):
+    """Checks that the database was migrated to the latest revision.
+
+    :param auto_create: Create the tables if the database has none.
+    :raises DBException: If the database is not up to date.
+    """
+    engine = b.get_engine()
+
+    revision = migration.get_current_revision(engine)
+    head = migration.get_head_revision()
+
+    if revision == head:
+        return
+
+    if revision is not None:
+        raise exc.DBException(
+            "Database is at revision %s instead of %s, run "
+            "'lbaas-db-manage upgrade head'." % (revision, head)
+        )
+
+    if migration.has_table(engine, models.Listener.__tablename__):
+        raise exc.DBException(
+            "Database has no revision. If it was created before migrations "
+            "were used, run 'lbaas-db-manage stamp <revision>' with the "
+            "revision it matches, then 'lbaas-db-manage upgrade head'."
+        )
+
+    if not auto_create:
+        raise exc.DBException(
+            "Database is empty, run 'lbaas-db-manage upgrade head' or "
+            "set [lbaas]/auto_create_db."
+        )
+
+    LOG.info("Creating database at revision %s." % head)
+
+    setup_db()
+    migration.stamp_head(engine)
+
+
+def dispose_db():
+    b.dispose_engine()
+
+
 def drop_db():
     global _facade
 
@@ -83,6 +156,301 @@ def transaction():
         end_tx()
 
 
+def in_transaction():
+    return b.in_transaction()
+
+
+def get_write_time():
+    return b.get_write_time()
+
+
+def set_write_time(write_time):
+    b.set_write_time(write_time)
+
+
+# Revisions.
+
+def add_revision_listener(func):
+    """Registers a function to call with the new global revision.
+
+    It's called after every commit changing the data, in the thread
+    which committed.
+    """
+    _revision_listeners.append(func)
+
+
+@b.read_only_primary
+def get_revision(name=GLOBAL_REVISION, session=None):
+    """Returns the revision counter value, 0 if it was never incremented."""
+    revision = _secure_query(
+        models.Revision, models.Revision.revision
+    ).filter_by(name=name).scalar()
+
+    return revision or 0
+
+
+@b.read_only_primary
+def get_listener_revision(name, session=None):
+    """Returns the global revision and the revision of the named listener.
+
+    Both are read by one indexed lookup. The listener revision is 0 if
+    the listener doesn't exist or wasn't changed since it's tracked.
+    """
+    listener_revision_name = sa.select([
+        sa.literal(_listener_revision_name('')) + models.Listener.id
+    ]).where(models.Listener.name == name).as_scalar()
+
+    revisions = dict(
+        _secure_query(
+            models.Revision, models.Revision.name, models.Revision.revision
+        ).filter(
+            models.Revision.name.in_([GLOBAL_REVISION, listener_revision_name])
+        )
+    )
+
+    global_revision = revisions.pop(GLOBAL_REVISION, 0)
+
+    # What's left is the listener revision, if any.
+    return global_revision, sum(revisions.values())
+
+
+def _listener_revision_name(listener_id):
+    return 'listener:%s' % listener_id
+
+
+def _record_listener_changes(session, listener_ids):
+    session.info.setdefault('listener_ids', set()).update(
+        i for i in listener_ids if i
+    )
+
+
+def _log_change(session, model, name, action):
+    """Records a change to write to the change log on commit.
+
+    Several changes of an object in one transaction are merged into one.
+    """
+    resource = _CHANGE_LOG_RESOURCES.get(model)
+
+    if resource is None or name is None:
+        return
+
+    changes = session.info.setdefault('changes', collections.OrderedDict())
+    previous = changes.pop((resource, name), None)
+
+    if previous == 'created':
+        if action == 'deleted':
+            return
+
+        action = 'created'
+    elif previous == 'deleted' and action == 'created':
+        action = 'updated'
+
+    changes[(resource, name)] = action
+
+
+@sa.event.listens_for(orm.Session, 'after_flush')
+def _after_flush(session, flush_context):
+    # Records listeners whose own or child objects were flushed.
+    listener_ids = set()
+
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, models.Listener):
+            listener_ids.add(obj.id)
+        elif hasattr(type(obj), 'listener_id'):
+            listener_ids.update(
+                sa.inspect(obj).attrs.listener_id.history.sum()
+            )
+
+    if listener_ids:
+        _record_listener_changes(session, listener_ids)
+
+    for objs, action in ((session.new, 'created'),
+                         (session.dirty, 'updated'),
+                         (session.deleted, 'deleted')):
+        for obj in objs:
+            if type(obj) not in _CHANGE_LOG_RESOURCES:
+                continue
+
+            if action == 'updated' and not session.is_modified(
+                    obj, include_collections=False):
+                continue
+
+            _log_change(session, type(obj), obj.name, action)
+
+
+def _bump(session, name, revision=None):
+    """Increments the named revision or sets it to the given value."""
+    table = models.Revision.__table__
+    now = timeutils.utcnow()
+
+    updated = session.execute(
+        table.update().where(
+            table.c.name == name
+        ).values(
+            revision=table.c.revision + 1 if revision is None else revision,
+            updated_at=now
+        )
+    ).rowcount
+
+    if not updated:
+        session.execute(
+            table.insert().values(
+                name=name,
+                revision=1 if revision is None else revision,
+                created_at=now
+            )
+        )
+
+
+def _bump_revisions(session):
+    """Increments the global revision and the changed listener ones.
+
+    Revisions of deleted listeners are deleted. Called right before
+    commit, so the revision rows stay locked for a short time.
+    """
+    session.flush()
+
+    listener_ids = session.info.pop('listener_ids', set())
+
+    if listener_ids:
+        table = models.Revision.__table__
+
+        existing = set(
+            row[0] for row in session.execute(
+                sa.select([models.Listener.id]).where(
+                    models.Listener.id.in_(listener_ids)
+                )
+            )
+        )
+
+        for listener_id in sorted(existing):
+            _bump(session, _listener_revision_name(listener_id))
+
+        deleted = listener_ids - existing
+
+        if deleted:
+            session.execute(
+                table.delete().where(table.c.name.in_([
+                    _listener_revision_name(i) for i in deleted
+                ]))
+            )
+
+    _bump(session, GLOBAL_REVISION)
+
+    return session.execute(
+        sa.select([models.Revision.revision]).where(
+            models.Revision.name == GLOBAL_REVISION
+        )
+    ).scalar()
+
+
+def _changes_data(func):
+    """Decorator for methods changing the data within a session."""
+    @functools.wraps(func)
+    def _within_session(*args, **kw):
+        kw['session'].info['changed'] = True
+
+        return func(*args, **kw)
+
+    return _within_session
+
+
+def _write_change_log(session, revision):
+    changes = session.info.pop('changes', {})
+
+    if changes:
+        session.execute(
+            models.Change.__table__.insert(),
+            [
+                {
+                    'revision': revision,
+                    'resource': resource,
+                    'name': name,
+                    'action': action,
+                    'created_at': timeutils.utcnow()
+                }
+                for (resource, name), action in changes.items()
+            ]
+        )
+
+    global _change_log_pruned_at
+
+    if time.time() - _change_log_pruned_at >= _CHANGE_LOG_PRUNE_INTERVAL:
+        _change_log_pruned_at = time.time()
+
+        _prune_change_log(session)
+
+
+def _prune_change_log(session):
+    """Deletes changes older than [changes]/retention seconds."""
+    table = models.Change.__table__
+    expired = table.c.created_at < timeutils.utcnow() - datetime.timedelta(
+        seconds=CONF.changes.retention
+    )
+
+    revision = session.execute(
+        sa.select([sa.func.max(table.c.revision)]).where(expired)
+    ).scalar()
+
+    if revision is None:
+        return
+
+    session.execute(table.delete().where(table.c.revision <= revision))
+
+    _bump(session, PRUNED_CHANGES_REVISION, revision)
+
+
+@sa.event.listens_for(orm.Session, 'before_commit')
+def _before_commit(session):
+    if session.info.pop('changed', False):
+        revision = _bump_revisions(session)
+
+        _write_change_log(session, revision)
+
+        session.info['revision'] = revision
+
+
+@sa.event.listens_for(orm.Session, 'after_commit')
+def _after_commit(session):
+    revision = session.info.pop('revision', None)
+
+    if revision is None:
+        return
+
+    for func in _revision_listeners:
+        try:
+            func(revision)
+        except Exception:
+            LOG.exception("Revision listener %s failed" % func)
+
+
+@sa.event.listens_for(orm.Session, 'after_rollback')
+def _after_rollback(session):
+    for key in ('changed', 'listener_ids', 'changes', 'revision'):
+        session.info.pop(key, None)
+
+
+# Change log.
+
+@b.read_only_primary
+def get_changes(since, session=None):
+    """Returns changes made after the 'since' revision, oldest first.
+
+    :raises ChangesExpiredException: If some of them were pruned.
+    """
+    if since < get_revision(PRUNED_CHANGES_REVISION):
+        raise exc.ChangesExpiredException(
+            "Changes since revision %s are no longer available" % since
+        )
+
+    return _secure_query(models.Change).filter(
+        models.Change.revision > since
+    ).order_by(
+        models.Change.revision,
+        models.Change.id
+    ).all()
+
+
 def _secure_query(model, *columns):
     query = b.model_query(model, columns)
 
@@ -90,8 +458,8 @@ def _secure_query(model, *columns):
 
 
 def _paginate_query(model, limit=None, marker=None, sort_keys=None,
-                    sort_dirs=None, query=None):
-    if not query:
+                    sort_dirs=None, query=None, core=False):
+    if query is None:
         query = _secure_query(model)
 
     query = db_utils.paginate_query(
@@ -103,11 +471,120 @@ def _paginate_query(model, limit=None, marker=None, sort_keys=None,
         sort_dirs=sort_dirs
     )
 
+    if core:
+        return _execute_core(query)
+
     return query.all()
 
 
+def _execute_core(query):
+    """Runs the SELECT of a column query through Core.
+
+    Rows are returned as the driver gives them (column values are still
+    processed by their types), the ORM doesn't process them at all.
+    """
+    return query.session.execute(query.statement).fetchall()
+
+
+def _get_collection(model, limit=None, marker=None, sort_keys=None,
+                    sort_dirs=None, fields=None, created_since=None,
+                    criteria=(), query=None, core=False, **kwargs):
+    """Returns a page of objects following the marker.
+
+    Id is always the last sort key, so the order is unique and the next
+    page is an index range scan starting right after the marker row
+    (keyset pagination), no matter how deep the page is.
+
+    :param marker: Id of the last object of the previous page.
+    :param fields: Optional. Names of the columns to select. If given,
+                   rows of these columns are returned instead of objects.
+    :param created_since: Optional. Only objects created at this time or
+                          later are returned.
+    :param criteria: Optional. Additional SQL expressions to filter by.
+    :param core: Optional. If True, the SELECT of fields is run through
+                 Core, see _execute_core().
+    :param kwargs: Column values to filter by.
+    """
+    sort_keys = list(sort_keys or ['name'])
+    sort_dirs = list(sort_dirs or [])
+    sort_dirs += ['asc'] * (len(sort_keys) - len(sort_dirs))
+
+    if 'id' not in sort_keys:
+        sort_keys.append('id')
+        sort_dirs.append(sort_dirs[0])
+
+    marker_obj = None
+
+    if marker:
+        marker_obj = _get_db_object_by_id(model, marker)
+
+        if not marker_obj:
+            raise exc.DBQueryEntryException(
+                "Marker object not found [id=%s]" % marker
+            )
+
+    if query is None:
+        columns = [getattr(model, f) for f in fields or ()]
+
+        query = _secure_query(model, *columns)
+
+    query = query.filter_by(**kwargs)
+
+    for criterion in criteria:
+        query = query.filter(criterion)
+
+    if created_since:
+        query = query.filter(model.created_at >= created_since)
+
+    try:
+        return _paginate_query(
+            model,
+            limit,
+            marker_obj,
+            sort_keys,
+            sort_dirs,
+            query,
+            core
+        )
+    except db_exc.InvalidSortKey as e:
+        raise exc.DBQueryEntryException("Invalid sort key: %s" % e)
+
+
+def _listener_id_column(model):
+    """Returns the column referring to the listener the objects belong to."""
+    if model is models.Listener:
+        return model.id
+
+    return getattr(model, 'listener_id', None)
+
+
+def _record_bulk_changes(model, query, session, action=None):
+    """Records changes a bulk statement is to make to the queried objects.
+
+    Bulk statements bypass the session, so its flush doesn't see them.
+
+    :param action: Optional. If given, objects are logged in the change
+                   log with this action.
+    """
+    column = _listener_id_column(model)
+
+    if column is not None:
+        _record_listener_changes(
+            session,
+            [row[0] for row in query.with_entities(column).distinct()]
+        )
+
+    if action and model in _CHANGE_LOG_RESOURCES:
+        for row in query.with_entities(model.name):
+            _log_change(session, model, row[0], action)
+
+
 def _delete_all(model, session=None, **kwargs):
-    _secure_query(model).filter_by(**kwargs).delete()
+    query = _secure_query(model).filter_by(**kwargs)
+
+    _record_bulk_changes(model, query, session, 'deleted')
+
+    query.delete()
 
 
 def _get_collection_sorted_by_name(model, **kwargs):
@@ -120,6 +597,120 @@ def _get_collection_sorted_by_time(model, **kwargs):
     return query.filter_by(**kwargs).order_by(model.created_at).all()
 
 
+def _create_or_update_all(model, values_list, create_func, update_func,
+                          session):
+    """Creates objects or updates the ones with the same names.
+
+    Uses one INSERT ... ON CONFLICT UPDATE statement per batch where the
+    database supports it, so there's no window for a concurrent caller
+    to insert the same name in between. The objects are then read back
+    in one query, which tells the created ones by their first version,
+    since the statement increments the version of the updated ones.
+    Only if the values move objects to other listeners, the listeners
+    they are moved from are read before. Otherwise each object is read
+    and then created or updated.
+
+    :return: Objects in the order of values_list.
+    """
+    if not upsert.is_supported(session.bind.dialect):
+        return [
+            update_func(values['name'], values)
+            if _get_db_object_by_name(model, values['name'])
+            else create_func(values)
+            for values in values_list
+        ]
+
+    rows = collections.OrderedDict()
+
+    for values in values_list:
+        rows[values['name']] = dict(
+            (k, v) for k, v in values.items()
+            if k in model.__table__.c and k != 'version'
+        )
+
+    # Raw statements don't see pending ORM changes.
+    session.flush()
+
+    column = _listener_id_column(model)
+
+    if column is not None and any(column.key in r for r in rows.values()):
+        _record_bulk_changes(
+            model,
+            _secure_query(model).filter(model.name.in_(list(rows))),
+            session
+        )
+
+    upsert.upsert(
+        session,
+        model.__table__,
+        list(rows.values()),
+        index_elements=['name'],
+        touch_column='updated_at',
+        version_column='version'
+    )
+
+    objs = dict(
+        (obj.name, obj) for obj in
+        _secure_query(model).filter(
+            model.name.in_(list(rows))
+        ).populate_existing()
+    )
+
+    for name in rows:
+        _log_change(
+            session,
+            model,
+            name,
+            'created' if objs[name].version == 1 else 'updated'
+        )
+
+    if column is not None:
+        _record_listener_changes(
+            session,
+            [getattr(obj, column.key) for obj in objs.values()]
+        )
+
+    return [objs[values['name']] for values in values_list]
+
+
+def _without_version(values):
+    """Returns a copy of values without the version, which is generated."""
+    values = values.copy()
+    values.pop('version', None)
+
+    return values
+
+
+def _check_version(obj, version):
+    if version is not None and obj.version != version:
+        raise exc.PreconditionFailedException(
+            "%s version doesn't match [name=%s, version=%s, expected=%s]" %
+            (type(obj).__name__, obj.name, obj.version, version)
+        )
+
+
+def _flush_versioned(session, preconditions=False):
+    """Flushes updates of versioned objects.
+
+    The update of a row fails if it was updated by another transaction
+    since it was read. That's reported as a failed precondition if the
+    caller had some, or as a conflict otherwise.
+    """
+    try:
+        session.flush()
+    except orm.exc.StaleDataError as e:
+        if preconditions:
+            raise exc.PreconditionFailedException(str(e))
+
+        raise exc.ConflictException(
+            "Object was updated concurrently, retry the request: %s" % e
+        )
+
+
+def _get_version(model, name):
+    return _secure_query(model, model.version).filter_by(name=name).scalar()
+
+
 def _get_db_object_by_name(model, name):
     return _secure_query(model).filter_by(name=name).first()
 
@@ -130,7 +721,8 @@ def _get_db_object_by_id(model, id):
 
 # Member definitions.
 
-def get_member(name):
+@b.read_only
+def get_member(name, session=None):
     member = _get_member(name)
 
     if not member:
@@ -140,19 +732,110 @@ def get_member(name):
     return member
 
 
-def load_member(name):
+@b.read_only
+def load_member(name, session=None):
     return _get_member(name)
 
 
-def get_members(**kwargs):
-    return _get_collection_sorted_by_name(models.Member, **kwargs)
+@b.read_only
+def get_members(limit=None, marker=None, sort_keys=None, sort_dirs=None,
+                fields=None, created_since=None, tags=None, tags_any=None,
+                names=None, session=None, **kwargs):
+    """Returns a page of members.
+
+    :param tags: Optional. Only members having all these tags.
+    :param tags_any: Optional. Only members having any of these tags.
+    :param names: Optional. Only members with these names.
+    """
+    return _get_collection(
+        models.Member,
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        fields=fields,
+        created_since=created_since,
+        criteria=_get_member_criteria(tags, tags_any, names),
+        **kwargs
+    )
+
+
+@b.read_only
+def get_member_rows(fields, limit=None, marker=None, sort_keys=None,
+                    sort_dirs=None, created_since=None, tags=None,
+                    tags_any=None, names=None, session=None, **kwargs):
+    """Returns a page of members as rows of the field values.
+
+    Unlike get_members(), the SELECT is run through Core, no ORM objects
+    are built for the rows. Arguments are the ones of get_members().
+    """
+    return _get_collection(
+        models.Member,
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        fields=fields,
+        created_since=created_since,
+        criteria=_get_member_criteria(tags, tags_any, names),
+        core=True,
+        **kwargs
+    )
+
+
+def _get_member_criteria(tags=None, tags_any=None, names=None):
+    # Tags are semi joins over the tag index, member rows are not decoded.
+    criteria = []
+
+    if names is not None:
+        criteria.append(models.Member.name.in_(set(names)))
+
+    if tags:
+        tags = set(tags)
+
+        criteria.append(
+            models.Member.id.in_(
+                sa.select([models.MemberTag.member_id]).where(
+                    models.MemberTag.tag.in_(tags)
+                ).group_by(
+                    models.MemberTag.member_id
+                ).having(
+                    sa.func.count(models.MemberTag.tag) == len(tags)
+                )
+            )
+        )
+
+    if tags_any:
+        criteria.append(
+            models.Member.id.in_(
+                sa.select([models.MemberTag.member_id]).where(
+                    models.MemberTag.tag.in_(set(tags_any))
+                )
+            )
+        )
+
+    return criteria
+
+
+def _set_member_tags(member, tags):
+    tags = set(tags or [])
+    tag_rows = dict((r.tag, r) for r in member.tag_rows)
+
+    for tag in set(tag_rows) - tags:
+        member.tag_rows.remove(tag_rows[tag])
+
+    for tag in tags - set(tag_rows):
+        member.tag_rows.append(models.MemberTag(tag=tag))
 
 
 @b.session_aware()
+@_changes_data
 def create_member(values, session=None):
     member = models.Member()
 
-    member.update(values.copy())
+    member.update(_without_version(values))
+
+    _set_member_tags(member, member.tags)
 
     try:
         member.save(session=session)
@@ -165,27 +848,119 @@ def create_member(values, session=None):
 
 
 @b.session_aware()
-def update_member(name, values, session=None):
+@_changes_data
+def create_members(values_list, session=None):
+    """Creates members in one flush.
+
+    Ids are generated upfront so that the ORM batches the INSERT
+    statements instead of issuing one per member.
+    """
+    members = []
+
+    for values in values_list:
+        member = models.Member(id=utils.generate_unicode_uuid())
+
+        member.update(_without_version(values))
+
+        _set_member_tags(member, member.tags)
+
+        members.append(member)
+
+    session.add_all(members)
+
+    try:
+        session.flush()
+    except db_exc.DBDuplicateEntry as e:
+        raise exc.DBDuplicateEntryException(
+            "Duplicate entry for MemberDefinition: %s" % e.columns
+        )
+
+    return members
+
+
+@b.session_aware()
+@_changes_data
+def update_member(name, values, version=None, session=None):
+    """Updates the named member.
+
+    :param version: Optional. Version the member is expected to have.
+    """
     member = _get_member(name)
 
     if not member:
         raise exc.NotFoundException(
             "Member not found [member_name=%s]" % name)
 
-    member.update(values.copy())
+    _check_version(member, version)
+
+    member.update(_without_version(values))
+
+    if 'tags' in values:
+        _set_member_tags(member, member.tags)
+
+    _flush_versioned(session, version is not None)
 
     return member
 
 
 @b.session_aware()
+@_changes_data
+def update_members(values_list, session=None):
+    """Updates members found by the names in values, in one flush.
+
+    If values have a version, the member is expected to have it.
+    """
+    names = [values['name'] for values in values_list]
+    members = dict((m.name, m) for m in get_members(names=names))
+
+    for values in values_list:
+        member = members.get(values['name'])
+
+        if not member:
+            raise exc.NotFoundException(
+                "Member not found [member_name=%s]" % values['name'])
+
+        _check_version(member, values.get('version'))
+
+        member.update(_without_version(values))
+
+        if 'tags' in values:
+            _set_member_tags(member, member.tags)
+
+    _flush_versioned(
+        session,
+        any(values.get('version') is not None for values in values_list)
+    )
+
+    return [members[name] for name in names]
+
+
+@b.session_aware()
+@_changes_data
 def create_or_update_member(name, values, session=None):
-    if not _get_member(name):
-        return create_member(values)
-    else:
-        return update_member(name, values)
+    return create_or_update_members([dict(values, name=name)])[0]
 
 
 @b.session_aware()
+@_changes_data
+def create_or_update_members(values_list, session=None):
+    members = _create_or_update_all(
+        models.Member,
+        values_list,
+        create_member,
+        update_member,
+        session
+    )
+
+    for member, values in zip(members, values_list):
+        if 'tags' in values:
+            _set_member_tags(member, member.tags)
+
+    return members
+
+
+@b.session_aware()
+@_changes_data
 def delete_member(name, session=None):
     member = _get_member(name)
 
@@ -200,14 +975,52 @@ def _get_member(name):
     return _get_db_object_by_name(models.Member, name)
 
 
+@b.read_only_primary
+def get_member_version(name, session=None):
+    """Returns the version of the named member, None if it doesn't exist."""
+    return _get_version(models.Member, name)
+
+
 @b.session_aware()
-def delete_members(**kwargs):
-    return _delete_all(models.Member, **kwargs)
+@_changes_data
+def delete_members(tags=None, tags_any=None, names=None, session=None,
+                   **kwargs):
+    criteria = _get_member_criteria(tags, tags_any, names)
+
+    query = _secure_query(models.Member).filter_by(**kwargs)
+
+    for criterion in criteria:
+        query = query.filter(criterion)
+
+    _record_bulk_changes(models.Member, query, session, 'deleted')
+
+    # Ids are selected upfront since the tag criteria stop matching once
+    # the tags are deleted.
+    member_ids = [row[0] for row in query.with_entities(models.Member.id)]
+
+    if not member_ids:
+        return 0
+
+    # Bulk delete bypasses ORM cascades and not every backend enforces
+    # foreign keys, so tags are deleted explicitly.
+    _secure_query(models.MemberTag).filter(
+        models.MemberTag.member_id.in_(member_ids)
+    ).delete(synchronize_session=False)
+
+    count = _secure_query(models.Member).filter(
+        models.Member.id.in_(member_ids)
+    ).delete(synchronize_session=False)
+
+    # Listeners loaded in this session may still hold deleted members.
+    session.expire_all()
+
+    return count
 
 
 # Listeners.
 
-def get_listener(name):
+@b.read_only
+def get_listener(name, session=None):
     listener = _get_listener(name)
 
     if not listener:
@@ -216,19 +1029,98 @@ def get_listener(name):
     return listener
 
 
-def load_listener(name):
+@b.read_only
+def load_listener(name, session=None):
     return _get_listener(name)
 
 
-def get_listeners(**kwargs):
-    return _get_collection_sorted_by_name(models.Listener, **kwargs)
+@b.read_only
+def get_listeners(limit=None, marker=None, sort_keys=None, sort_dirs=None,
+                  fields=None, created_since=None, session=None, **kwargs):
+    query = None
+
+    if not fields:
+        # Members of the whole page are loaded by one more query.
+        query = _secure_query(models.Listener).options(
+            orm.subqueryload(models.Listener.members)
+        )
+
+    return _get_collection(
+        models.Listener,
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        fields=fields,
+        created_since=created_since,
+        query=query,
+        **kwargs
+    )
+
+
+@b.read_only
+def get_listener_rows(fields, limit=None, marker=None, sort_keys=None,
+                      sort_dirs=None, created_since=None, session=None,
+                      **kwargs):
+    """Returns a page of listeners as rows of the field values.
+
+    Unlike get_listeners(), the SELECT is run through Core, no ORM
+    objects are built for the rows. Members are fetched separately by
+    get_listener_member_rows().
+    """
+    return _get_collection(
+        models.Listener,
+        limit=limit,
+        marker=marker,
+        sort_keys=sort_keys,
+        sort_dirs=sort_dirs,
+        fields=fields,
+        created_since=created_since,
+        core=True,
+        **kwargs
+    )
+
+
+@b.read_only
+def get_listener_member_rows(listener_ids, fields, session=None):
+    """Returns members of listeners as rows of the field values.
+
+    Members of all the listeners are fetched by one SELECT run through
+    Core, then grouped by listener.
+
+    :return: Dictionary of member rows by listener id, each list is
+             ordered by member name.
+    """
+    if not listener_ids:
+        return {}
+
+    model = models.Member
+
+    query = _secure_query(
+        model,
+        model.listener_id,
+        *[getattr(model, f) for f in fields]
+    ).filter(
+        model.listener_id.in_(set(listener_ids))
+    ).order_by(
+        model.listener_id,
+        model.name
+    )
+
+    rows = dict((id, []) for id in listener_ids)
+
+    for row in _execute_core(query):
+        rows[row[0]].append(row[1:])
+
+    return rows
 
 
 @b.session_aware()
+@_changes_data
 def create_listener(values, session=None):
     listener = models.Listener()
 
-    listener.update(values)
+    listener.update(_without_version(values))
 
     try:
         listener.save(session=session)
@@ -241,28 +1133,46 @@ def create_listener(values, session=None):
 
 
 @b.session_aware()
-def update_listener(name, values, session=None):
+@_changes_data
+def update_listener(name, values, version=None, session=None):
+    """Updates the named listener.
+
+    :param version: Optional. Version the listener is expected to have.
+    """
     listener = _get_listener(name)
 
     if not listener:
         raise exc.NotFoundException("Listener not found [name=%s]" % name)
 
-    listener.update(values)
+    _check_version(listener, version)
+
+    listener.update(_without_version(values))
+
+    _flush_versioned(session, version is not None)
 
     return listener
 
 
 @b.session_aware()
+@_changes_data
 def create_or_update_listener(name, values, session=None):
-    listener = _get_listener(name)
+    return create_or_update_listeners([dict(values, name=name)])[0]
 
-    if not listener:
-        return create_listener(values)
-    else:
-        return update_listener(name, values)
+
+@b.session_aware()
+@_changes_data
+def create_or_update_listeners(values_list, session=None):
+    return _create_or_update_all(
+        models.Listener,
+        values_list,
+        create_listener,
+        update_listener,
+        session
+    )
 
 
 @b.session_aware()
+@_changes_data
 def delete_listener(name, session=None):
     listener = _get_listener(name)
 
@@ -276,6 +1186,178 @@ def _get_listener(name):
     return _get_db_object_by_name(models.Listener, name)
 
 
+@b.read_only_primary
+def get_listener_version(name, session=None):
+    """Returns the version of the named listener, None if it doesn't exist."""
+    return _get_version(models.Listener, name)
+
+
 @b.session_aware()
+@_changes_data
 def delete_listeners(**kwargs):
     return _delete_all(models.Listener, **kwargs)
+
+
+# Certificates.
+
+@b.read_only
+def get_certificate(name, session=None):
+    certificate = _get_certificate(name)
+
+    if not certificate:
+        raise exc.NotFoundException(
+            "Certificate not found [name=%s]" % name)
+
+    return certificate
+
+
+@b.read_only
+def load_certificate(name, session=None):
+    return _get_certificate(name)
+
+
+@b.read_only
+def get_certificates(session=None, **kwargs):
+    return _get_collection_sorted_by_name(models.Certificate, **kwargs)
+
+
+def _set_fingerprint(values):
+    """Fingerprint is the SHA-256 of the PEM content.
+
+    It is used as the on-disk name of the certificate on the balancer,
+    so identical bundles are stored only once.
+    """
+    content = values.get('content')
+
+    if content is not None:
+        values['fingerprint'] = hashlib.sha256(
+            content.encode('utf-8')
+        ).hexdigest()
+
+    return values
+
+
+@b.session_aware()
+@_changes_data
+def create_certificate(values, session=None):
+    certificate = models.Certificate()
+
+    certificate.update(_set_fingerprint(values.copy()))
+
+    try:
+        certificate.save(session=session)
+    except db_exc.DBDuplicateEntry as e:
+        raise exc.DBDuplicateEntryException(
+            "Duplicate entry for Certificate: %s" % e.columns
+        )
+
+    return certificate
+
+
+@b.session_aware()
+@_changes_data
+def update_certificate(name, values, session=None):
+    certificate = _get_certificate(name)
+
+    if not certificate:
+        raise exc.NotFoundException(
+            "Certificate not found [name=%s]" % name)
+
+    certificate.update(_set_fingerprint(values.copy()))
+
+    return certificate
+
+
+@b.session_aware()
+@_changes_data
+def delete_certificate(name, session=None):
+    certificate = _get_certificate(name)
+
+    if not certificate:
+        raise exc.NotFoundException(
+            "Certificate not found [name=%s]" % name)
+
+    session.delete(certificate)
+
+
+def _get_certificate(name):
+    return _get_db_object_by_name(models.Certificate, name)
+
+
+@b.session_aware()
+@_changes_data
+def delete_certificates(**kwargs):
+    return _delete_all(models.Certificate, **kwargs)
+
+
+# L7 policies.
+
+@b.read_only
+def get_l7policy(name, session=None):
+    l7policy = _get_l7policy(name)
+
+    if not l7policy:
+        raise exc.NotFoundException("L7 policy not found [name=%s]" % name)
+
+    return l7policy
+
+
+@b.read_only
+def load_l7policy(name, session=None):
+    return _get_l7policy(name)
+
+
+@b.read_only
+def get_l7policies(session=None, **kwargs):
+    return _get_collection_sorted_by_name(models.L7Policy, **kwargs)
+
+
+@b.session_aware()
+@_changes_data
+def create_l7policy(values, session=None):
+    l7policy = models.L7Policy()
+
+    l7policy.update(values.copy())
+
+    try:
+        l7policy.save(session=session)
+    except db_exc.DBDuplicateEntry as e:
+        raise exc.DBDuplicateEntryException(
+            "Duplicate entry for L7Policy: %s" % e.columns
+        )
+
+    return l7policy
+
+
+@b.session_aware()
+@_changes_data
+def update_l7policy(name, values, session=None):
+    l7policy = _get_l7policy(name)
+
+    if not l7policy:
+        raise exc.NotFoundException("L7 policy not found [name=%s]" % name)
+
+    l7policy.update(values.copy())
+
+    return l7policy
+
+
+@b.session_aware()
+@_changes_data
+def delete_l7policy(name, session=None):
+    l7policy = _get_l7policy(name)
+
+    if not l7policy:
+        raise exc.NotFoundException("L7 policy not found [name=%s]" % name)
+
+    session.delete(l7policy)
+
+
+def _get_l7policy(name):
+    return _get_db_object_by_name(models.L7Policy, name)
+
+
+@b.session_aware()
+@_changes_data
+def delete_l7policies(**kwargs):
+    return _delete_all(models.L7Policy, **kwargs)
@@ -34,6 +34,8 @@ class Listener(mb.LbaasModelBase):
 
     __table_args__ = (
         sa.UniqueConstraint('name'),
+        sa.Index('listeners_v1_created_at_id', 'created_at', 'id'),
+        sa.Index('listeners_v1_address_port', 'address', 'protocol_port'),
     )
 
     id = mb.id_column()
@@ -43,9 +45,16 @@ class Listener(mb.LbaasModelBase):
     protocol = sa.Column(sa.String(10))
     protocol_port = sa.Column(sa.Integer())
     algorithm = sa.Column(sa.String(30))
+    server_name = sa.Column(sa.String(255), nullable=True)
     options = sa.Column(st.JsonDictType(), default={})
     ssl_info = sa.Column(st.JsonDictType(), default={})
 
+    # Incremented by every update, which fails if the row was updated
+    # since it was read.
+    version = sa.Column(sa.Integer(), nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
+
 
 class Member(mb.LbaasModelBase):
     """Member object."""
@@ -54,6 +63,8 @@ class Member(mb.LbaasModelBase):
 
     __table_args__ = (
         sa.UniqueConstraint('name'),
+        sa.Index('members_v1_created_at_id', 'created_at', 'id'),
+        sa.Index('members_v1_address_port', 'address', 'protocol_port'),
     )
 
     # Main properties.
@@ -66,6 +77,109 @@ class Member(mb.LbaasModelBase):
     protocol_port = sa.Column(sa.Integer())
     tags = sa.Column(st.JsonListType())
 
+    version = sa.Column(sa.Integer(), nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
+
+
+class MemberTag(mb.LbaasModelBase):
+    """Member tag.
+
+    Mirrors Member.tags in an indexed form to look members up by tag.
+    """
+
+    __tablename__ = 'member_tags_v1'
+
+    __table_args__ = (
+        sa.Index('member_tags_v1_tag', 'tag', 'member_id'),
+    )
+
+    member_id = sa.Column(
+        sa.String(36),
+        sa.ForeignKey('members_v1.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    tag = sa.Column(sa.String(80), primary_key=True)
+
+
+class Revision(mb.LbaasModelBase):
+    """Revision counter.
+
+    Incremented by every transaction changing the data, so that readers
+    can tell whether what they loaded before is still up to date.
+    """
+
+    __tablename__ = 'revisions_v1'
+
+    name = sa.Column(sa.String(80), primary_key=True)
+    revision = sa.Column(sa.BigInteger(), nullable=False, default=0)
+
+
+class Change(mb.LbaasModelBase):
+    """Change log entry.
+
+    Records a listener or member created, updated or deleted by the
+    transaction which incremented the global revision to 'revision'.
+    """
+
+    __tablename__ = 'changes_v1'
+
+    __table_args__ = (
+        sa.Index('changes_v1_revision', 'revision'),
+    )
+
+    id = sa.Column(sa.Integer(), primary_key=True, autoincrement=True)
+    revision = sa.Column(sa.BigInteger(), nullable=False)
+    resource = sa.Column(sa.String(20), nullable=False)
+    name = sa.Column(sa.String(80), nullable=False)
+    action = sa.Column(sa.String(10), nullable=False)
+
+
+class Certificate(mb.LbaasModelBase):
+    """Certificate object.
+
+    Content is a PEM bundle (certificate chain and private key). It is
+    stored on the balancer under a name derived from its fingerprint, so
+    the same bundle used by several listeners is written only once.
+    """
+
+    __tablename__ = 'certificates_v1'
+
+    __table_args__ = (
+        sa.UniqueConstraint('name'),
+        sa.Index('certificates_v1_fingerprint', 'fingerprint'),
+    )
+
+    id = mb.id_column()
+    name = sa.Column(sa.String(80))
+    description = sa.Column(sa.String(255), nullable=True)
+
+    content = sa.Column(st.LongText())
+    fingerprint = sa.Column(sa.String(64))
+    sni = sa.Column(st.JsonListType())
+
+
+class L7Policy(mb.LbaasModelBase):
+    """L7 policy object.
+
+    Routes requests matching all of its rules to the backend of another
+    listener. Policies of a listener are evaluated in order of position.
+    """
+
+    __tablename__ = 'l7policies_v1'
+
+    __table_args__ = (
+        sa.UniqueConstraint('name'),
+    )
+
+    id = mb.id_column()
+    name = sa.Column(sa.String(80))
+    description = sa.Column(sa.String(255), nullable=True)
+
+    position = sa.Column(sa.Integer(), default=0)
+    backend = sa.Column(sa.String(80))
+    rules = sa.Column(st.JsonListType(), default=[])
+
 # Many-to-one for 'Member' and 'Listener'.
 
 
@@ -74,6 +188,8 @@ Member.listener_id = sa.Column(
     sa.ForeignKey(Listener.id)
 )
 
+sa.Index('members_v1_listener_id', Member.listener_id)
+
 Listener.members = relationship(
     Member,
     backref=backref('listener', remote_side=[Listener.id]),
@@ -81,3 +197,45 @@ Listener.members = relationship(
     foreign_keys=Member.listener_id,
     lazy='select'
 )
+
+# One-to-many for 'Member' and 'MemberTag'.
+
+Member.tag_rows = relationship(
+    MemberTag,
+    cascade='all, delete-orphan',
+    lazy='select'
+)
+
+# Many-to-one for 'Certificate' and 'Listener'.
+
+
+Certificate.listener_id = sa.Column(
+    sa.String(36),
+    sa.ForeignKey(Listener.id)
+)
+
+Listener.certificates = relationship(
+    Certificate,
+    backref=backref('listener', remote_side=[Listener.id]),
+    cascade='all, delete-orphan',
+    foreign_keys=Certificate.listener_id,
+    order_by=Certificate.name,
+    lazy='select'
+)
+
+# Many-to-one for 'L7Policy' and 'Listener'.
+
+
+L7Policy.listener_id = sa.Column(
+    sa.String(36),
+    sa.ForeignKey(Listener.id)
+)
+
+Listener.l7policies = relationship(
+    L7Policy,
+    backref=backref('listener', remote_side=[Listener.id]),
+    cascade='all, delete-orphan',
+    foreign_keys=L7Policy.listener_id,
+    order_by=(L7Policy.position, L7Policy.name),
+    lazy='select'
+)
@@ -40,6 +40,49 @@ class LoadBalancerDriver(object):
     def delete_member(self, member):
         pass
 
+    @abc.abstractmethod
+    def create_members(self, members):
+        pass
+
+    @abc.abstractmethod
+    def update_members(self, members):
+        pass
+
+    @abc.abstractmethod
+    def delete_members(self, members):
+        pass
+
+    @abc.abstractmethod
+    def create_certificate(self, certificate):
+        pass
+
+    @abc.abstractmethod
+    def update_certificate(self, certificate):
+        pass
+
+    @abc.abstractmethod
+    def delete_certificate(self, certificate):
+        pass
+
+    @abc.abstractmethod
+    def create_l7policy(self, l7policy):
+        pass
+
+    @abc.abstractmethod
+    def update_l7policy(self, l7policy):
+        pass
+
+    @abc.abstractmethod
+    def delete_l7policy(self, l7policy):
+        pass
+
     @abc.abstractmethod
     def apply_changes(self):
+        """Applies the changes made by the calls above to the balancer.
+
+        Controllers call it once the database transaction is committed,
+        so a slow restart doesn't hold the database. If it fails, the
+        changes stay in the database and are applied along with the
+        next ones.
+        """
         pass
@@ -12,20 +12,67 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
+import glob
 import itertools
+import os
+import re
+import socket
 
 from oslo_concurrency import processutils
+from oslo_log import log as logging
 
 from lbaas.db.v1 import api as db_api
 from lbaas.drivers import base
+from lbaas import exceptions as exc
 from lbaas.utils import file_utils
 
 
+LOG = logging.getLogger(__name__)
+
+
+class HAProxyRuntimeError(Exception):
+    """HAProxy runtime API rejected a command."""
+
+
+# Sample fetch and match method for each L7 rule type.
+_L7_MATCHERS = {
+    'host': ('req.hdr(host),field(1,:),lower', 'str'),
+    'path_prefix': ('path', 'beg'),
+    'header': ('req.hdr(%(key)s)', 'str'),
+    'method': ('method', 'str'),
+}
+
+# Sample fetches of the routing key of a shared frontend: HTTP host,
+# SNI of terminated or passed through TLS connection.
+_HOST_FETCH = 'req.hdr(host),field(1,:),lower'
+_SSL_FC_SNI_FETCH = 'ssl_fc_sni,lower'
+_SSL_SNI_FETCH = 'req.ssl_sni,lower'
+
+# Part of HAProxy runtime API reply telling that a command succeeded,
+# by command prefix. Errors are reported in many ways.
+_RUNTIME_REPLIES = (
+    ('new ssl cert ', 'New empty certificate store'),
+    ('set ssl cert ', 'Transaction '),
+    ('commit ssl cert ', 'Success!'),
+    ('add ssl crt-list ', 'Success!'),
+    ('del ssl crt-list ', 'deleted in crtlist'),
+    ('del ssl cert ', 'deleted!'),
+)
+
+
 class HAProxyDriver(base.LoadBalancerDriver):
     config_file = "/etc/haproxy/haproxy.cfg"
+    certs_dir = "/etc/haproxy/certs"
+    maps_dir = "/etc/haproxy/maps"
+    stats_socket = "/var/run/haproxy/admin.sock"
     config = []
 
     def __init__(self):
+        # Set by _save_config() when the change can not be applied
+        # through the runtime API and HAProxy has to be restarted.
+        self._reload_required = False
+
         self._sync_configuration()
 
     def _sync_configuration(self):
@@ -39,11 +86,15 @@ class HAProxyDriver(base.LoadBalancerDriver):
         if not listener.algorithm:
             listener.algorithm = 'roundrobin'
 
+        _check_bind_conflicts(listener, db_api.get_listeners())
+
         self._save_config()
 
         return listener
 
     def update_listener(self, listener):
+        _check_bind_conflicts(listener, db_api.get_listeners())
+
         self._save_config()
 
         return listener
@@ -64,27 +115,319 @@ class HAProxyDriver(base.LoadBalancerDriver):
 
         return member
 
+    def create_members(self, members):
+        self._save_config()
+
+        return members
+
+    def update_members(self, members):
+        self._save_config()
+
+        return members
+
+    def delete_members(self, members):
+        self._save_config()
+
+    def create_certificate(self, certificate):
+        _check_certificate_conflicts(certificate, db_api.get_listeners())
+
+        self._save_config()
+
+        return certificate
+
+    def update_certificate(self, certificate):
+        _check_certificate_conflicts(certificate, db_api.get_listeners())
+
+        self._save_config()
+
+        return certificate
+
+    def delete_certificate(self, certificate):
+        self._save_config()
+
+    def create_l7policy(self, l7policy):
+        self._save_config()
+
+        return l7policy
+
+    def update_l7policy(self, l7policy):
+        self._save_config()
+
+        return l7policy
+
+    def delete_l7policy(self, l7policy):
+        self._save_config()
+
+    def _cert_path(self, certificate):
+        return os.path.join(self.certs_dir, '%s.pem' % certificate.fingerprint)
+
+    def _crt_list_path(self, frontend_name):
+        return os.path.join(self.certs_dir, '%s.crtlist' % frontend_name)
+
     def _save_config(self):
         conf = []
-        conf.extend(_build_global())
+        conf.extend(_build_global(stats_socket=self.stats_socket))
         conf.extend(_build_defaults())
 
-        for l in db_api.get_listeners():
-            conf.extend(_build_frontend(l))
-            conf.extend(_build_backend(l))
+        # Certificate bundles by path and crt-list entries by crt-list path.
+        pems = {}
+        crt_lists = {}
+
+        # Contents of L7 map files by path.
+        maps = {}
+
+        listeners = db_api.get_listeners()
+        backends = set(l.name for l in listeners)
+
+        for name, group in _group_listeners(listeners):
+            crt_list = None
+            group_certs = [c for l in group for c in l.certificates]
+
+            if group_certs:
+                crt_list = self._crt_list_path(name)
+                crt_lists[crt_list] = []
+
+                for cert in group_certs:
+                    cert_path = self._cert_path(cert)
+                    entry = _build_crt_list_entry(cert, cert_path)
+
+                    # The same bundle may be shared by many listeners
+                    # but is stored only once.
+                    pems[cert_path] = cert.content
+
+                    if entry not in crt_lists[crt_list]:
+                        crt_lists[crt_list].append(entry)
+
+            rules, group_maps = _build_routing_rules(
+                name,
+                group,
+                self.maps_dir,
+                backends
+            )
+            maps.update(group_maps)
+
+            conf.extend(
+                _build_frontend(name, group, crt_list=crt_list, rules=rules)
+            )
+
+            for l in group:
+                conf.extend(_build_backend(l))
+
+        config_data = '\n'.join(conf)
+
+        config_changed = (
+            file_utils.read_file(self.config_file) != config_data
+        )
+        old_crt_lists = self._read_crt_lists()
+
+        self._save_certificates(pems, crt_lists)
+
+        # Map files are read on start only.
+        if self._save_maps(maps):
+            config_changed = True
 
-        file_utils.replace_file(self.config_file, '\n'.join(conf))
+        file_utils.replace_file(self.config_file, config_data)
+
+        if config_changed:
+            # Bind lines changed, the runtime API can not help here.
+            self._reload_required = True
+        elif not self._update_certificates_at_runtime(old_crt_lists,
+                                                      crt_lists, pems):
+            self._reload_required = True
+
+        self._remove_stale_certificates(pems, crt_lists)
+
+    def _read_crt_lists(self):
+        crt_lists = {}
+
+        for path in glob.glob(os.path.join(self.certs_dir, '*.crtlist')):
+            crt_lists[path] = file_utils.read_file(path).splitlines()
+
+        return crt_lists
+
+    def _save_certificates(self, pems, crt_lists):
+        for cert_path, content in pems.items():
+            # Names are content hashes, an existing file is up to date.
+            if not os.path.exists(cert_path):
+                file_utils.replace_file(cert_path, content, file_mode=0o600)
+
+        for crt_list, entries in crt_lists.items():
+            data = '\n'.join(entries) + '\n'
+
+            if file_utils.read_file(crt_list) != data:
+                file_utils.replace_file(crt_list, data)
+
+    def _save_maps(self, maps):
+        """Writes L7 map files, returns True if any of them changed."""
+        changed = False
+
+        for path, data in maps.items():
+            if file_utils.read_file(path) != data:
+                file_utils.replace_file(path, data)
+                changed = True
+
+        for path in glob.glob(os.path.join(self.maps_dir, '*.map')):
+            if path not in maps:
+                file_utils.remove_file(path)
+
+        return changed
+
+    def _remove_stale_certificates(self, pems, crt_lists):
+        for path in glob.glob(os.path.join(self.certs_dir, '*.pem')):
+            if path not in pems:
+                file_utils.remove_file(path)
+
+        for path in glob.glob(os.path.join(self.certs_dir, '*.crtlist')):
+            if path not in crt_lists:
+                file_utils.remove_file(path)
+
+    def _update_certificates_at_runtime(self, old_crt_lists, crt_lists,
+                                        pems):
+        """Pushes certificate changes through the HAProxy runtime API.
+
+        Only crt-list contents are updated here, so it is used when the
+        main configuration file did not change.
+
+        :return: True if all the changes are applied, False if HAProxy
+            has to be restarted to pick them up.
+        """
+        old_certs = set(
+            _crt_list_entry_path(entry)
+            for entries in old_crt_lists.values() for entry in entries
+        )
+
+        commands = []
+
+        for cert_path in sorted(set(pems) - old_certs):
+            commands += [
+                'new ssl cert %s' % cert_path,
+                'set ssl cert %s <<\n%s\n' % (
+                    cert_path, pems[cert_path].strip()
+                ),
+                'commit ssl cert %s' % cert_path,
+            ]
+
+        for crt_list, entries in sorted(crt_lists.items()):
+            old_entries = old_crt_lists.get(crt_list, [])
+
+            old_paths = [_crt_list_entry_path(e) for e in old_entries]
+            paths = [_crt_list_entry_path(e) for e in entries]
+
+            # Entries are deleted by path, which is ambiguous if the same
+            # bundle is listed more than once.
+            if (len(set(old_paths)) != len(old_paths) or
+                    len(set(paths)) != len(paths)):
+                return False
+
+            added = [e for e in entries if e not in old_entries]
+            removed = [
+                _crt_list_entry_path(e)
+                for e in old_entries if e not in entries
+            ]
+
+            # An entry changed in place (e.g. its SNI) is deleted first,
+            # other ones are deleted last, so their server names are
+            # served by either the old or the new bundle meanwhile.
+            readded = set(_crt_list_entry_path(e) for e in added)
+
+            for path in removed:
+                if path in readded:
+                    commands.append(
+                        'del ssl crt-list %s %s' % (crt_list, path)
+                    )
+
+            for entry in added:
+                commands.append(
+                    'add ssl crt-list %s <<\n%s\n' % (crt_list, entry)
+                )
+
+            for path in removed:
+                if path not in readded:
+                    commands.append(
+                        'del ssl crt-list %s %s' % (crt_list, path)
+                    )
+
+        for cert_path in sorted(old_certs - set(pems)):
+            commands.append('del ssl cert %s' % cert_path)
+
+        try:
+            for command in commands:
+                _runtime_command(self.stats_socket, command)
+        except (socket.error, HAProxyRuntimeError) as e:
+            LOG.warning(
+                "Failed to update certificates through HAProxy runtime API,"
+                " restart is required: %s" % e
+            )
+
+            return False
+
+        return True
 
     def apply_changes(self):
+        if not self._reload_required:
+            LOG.info("HAProxy configuration is applied at runtime.")
+
+            return
+
         if db_api.get_listeners():
             cmd = 'sudo service haproxy restart'.split()
         else:
             # There is no listeners at all.
             cmd = 'sudo service haproxy stop'.split()
-        return processutils.execute(*cmd)
 
+        result = processutils.execute(*cmd)
+
+        # The driver lives as long as the process, the next changes may
+        # be applied at runtime again.
+        self._reload_required = False
+
+        return result
+
+
+def _runtime_command(socket_path, command):
+    """Sends a single command to HAProxy runtime API and returns output."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.connect(socket_path)
+        sock.sendall(('%s\n' % command).encode('utf-8'))
+
+        chunks = []
 
-def _build_global(user_group='nogroup'):
+        while True:
+            data = sock.recv(4096)
+
+            if not data:
+                break
+
+            chunks.append(data)
+    finally:
+        sock.close()
+
+    output = b''.join(chunks).decode('utf-8')
+
+    expected = next(
+        reply for prefix, reply in _RUNTIME_REPLIES
+        if command.startswith(prefix)
+    )
+
+    if expected not in output:
+        raise HAProxyRuntimeError(
+            "%s [command=%s]" % (output.strip(), command.split('\n')[0])
+        )
+
+    return output
+
+
+def _build_crt_list_entry(certificate, cert_path):
+    return ' '.join([cert_path] + list(certificate.sni or []))
+
+
+def _crt_list_entry_path(entry):
+    return entry.split()[0]
+
+
+def _build_global(user_group='nogroup', stats_socket=None):
     opts = [
         'log 127.0.0.1   syslog info',
         'daemon',
@@ -92,6 +435,9 @@ def _build_global(user_group='nogroup'):
         'group %s' % user_group,
     ]
 
+    if stats_socket:
+        opts.append('stats socket %s mode 600 level admin' % stats_socket)
+
     return itertools.chain(['global'], ('\t' + o for o in opts))
 
 
@@ -109,31 +455,386 @@ def _build_defaults():
     return itertools.chain(['defaults'], ('\t' + o for o in opts))
 
 
-def _build_frontend(listener):
+def _bind_key(listener):
+    # Empty address means any address, as well as 0.0.0.0 does.
+    return (
+        listener.address or '0.0.0.0',
+        listener.protocol_port,
+        listener.protocol.lower()
+    )
+
+
+def _terminates_ssl(listener):
+    return bool(listener.ssl_info or listener.certificates)
+
+
+def _ssl_settings(listener):
+    ssl_info = listener.ssl_info or {}
+
+    return list(ssl_info.get('options', [])), ssl_info.get('ciphers', '')
+
+
+def _group_listeners(listeners):
+    """Groups listeners sharing address, port and protocol.
+
+    :return: List of (frontend name, listeners) in order of listeners.
+        A single listener frontend is named after the listener.
+    """
+    groups = collections.OrderedDict()
+
+    for l in listeners:
+        groups.setdefault(_bind_key(l), []).append(l)
+
+    result = []
+
+    for (address, port, _), group in groups.items():
+        if len(group) == 1:
+            result.append((group[0].name, group))
+        else:
+            name = 'shared_%s_%s' % (re.sub(r'\W', '_', address), port)
+
+            result.append((name, group))
+
+    return result
+
+
+def _check_bind_conflicts(listener, listeners):
+    """Checks that listener can share a frontend with other listeners.
+
+    Listeners on the same address and port are served by one frontend,
+    so they must use the same protocol, all of them or none terminate
+    SSL, and they must have the same SSL options (if any), distinct
+    server names (at most one without it) and compatible options.
+    Certificates of all the listeners are served by the frontend.
+    """
+    address, port, protocol = _bind_key(listener)
+
+    # Certificates are loaded along with the listeners only.
+    terminates_ssl = _terminates_ssl(
+        next((l for l in listeners if l.id == listener.id), listener)
+    )
+
+    for other in listeners:
+        if other.id == listener.id:
+            continue
+
+        other_address, other_port, other_protocol = _bind_key(other)
+
+        if (other_address, other_port) != (address, port):
+            continue
+
+        def _conflict(reason):
+            return exc.ConflictException(
+                "Listener can't share %s:%s with listener %s: %s." %
+                (address, port, other.name, reason)
+            )
+
+        if other_protocol != protocol:
+            raise _conflict('protocols differ')
+
+        if _terminates_ssl(other) != terminates_ssl:
+            raise _conflict('only one of them terminates SSL')
+
+        if (other.ssl_info and listener.ssl_info and
+                _ssl_settings(other) != _ssl_settings(listener)):
+            raise _conflict('SSL options differ')
+
+        server_name = (listener.server_name or '').lower()
+
+        if (other.server_name or '').lower() == server_name:
+            raise _conflict(
+                'server name %s is already used' % server_name
+                if server_name else 'both have no server name'
+            )
+
+        options = other.options or {}
+
+        for key, value in (listener.options or {}).items():
+            if key in options and options[key] != value:
+                raise _conflict('option %s differs' % key)
+
+
+def _check_certificate_conflicts(certificate, listeners):
+    """Checks that listener of the certificate can terminate SSL."""
+    for l in listeners:
+        if l.id == certificate.listener_id:
+            _check_bind_conflicts(l, listeners)
+
+
+def _build_bind(listeners, crt_list=None):
+    listener = listeners[0]
+
     bind_str = 'bind %s:%s' % (
         listener.address,
         listener.protocol_port
     )
 
-    if listener.ssl_info:
-        path = listener.ssl_info['path']
-        options = listener.ssl_info.get('options', '')
-        ciphers = listener.ssl_info.get('ciphers', '')
+    if not (any(l.ssl_info for l in listeners) or crt_list):
+        return bind_str
+
+    # Listeners having SSL options share the same ones, see
+    # _check_bind_conflicts().
+    options, ciphers = next(
+        (_ssl_settings(l) for l in listeners if l.ssl_info),
+        ([], '')
+    )
+
+    certs = []
+
+    for l in listeners:
+        path = (l.ssl_info or {}).get('path')
+
+        if path and 'crt %s' % path not in certs:
+            certs.append('crt %s' % path)
+
+    if crt_list:
+        certs.append('crt-list %s' % crt_list)
+
+    return "%s ssl %s" % (
+        bind_str,
+        ' '.join(certs + [' '.join(options), ciphers])
+    )
+
+
+def _l7_matcher(rule):
+    fetch, match = _L7_MATCHERS[rule['type']]
+
+    return fetch % {'key': rule.get('key')}, match
+
+
+def _l7_value(rule):
+    value = rule['value']
+
+    if rule['type'] == 'host':
+        return value.lower()
+
+    if rule['type'] == 'method':
+        return value.upper()
+
+    return value
 
-        bind_str = "%s ssl crt %s" % (
-            bind_str,
-            ' '.join([path, ' '.join(options), ciphers])
+
+def _build_l7_rules(listener, maps_dir, backends, condition=None):
+    """Compiles L7 policies of the listener into frontend rules.
+
+    Consecutive single-rule policies sharing a matcher are merged into
+    one map file lookup, so routing cost doesn't grow with their number.
+    Within such map prefixes shadowed by earlier policies are dropped,
+    which makes longest prefix match equal to the first match. Other
+    policies become use_backend rules over named ACLs, each distinct
+    rule is declared once.
+
+    :param condition: Optional ACL condition added to every rule.
+    :return: Tuple of acl lines, use_backend lines and map files
+        contents by path.
+    """
+    suffix = ' %s' % condition if condition else ''
+    acls = collections.OrderedDict()
+    use_backends = []
+    maps = {}
+
+    if not listener.l7policies:
+        return [], [], {}
+
+    if listener.protocol.lower() != 'http':
+        LOG.warning(
+            "L7 policies are ignored for non-HTTP listener [name=%s]" %
+            listener.name
         )
 
-    opts = [
-        'mode %s' % listener.protocol,
-        'default_backend %s' % listener.name,
-        bind_str
+        return [], [], {}
+
+    # Groups of consecutive policies, a group of policies sharing
+    # a single-rule matcher has the matcher as a key.
+    groups = []
+
+    for policy in listener.l7policies:
+        if not policy.rules:
+            continue
+
+        if policy.backend not in backends:
+            LOG.warning(
+                "L7 policy backend doesn't exist [policy=%s, backend=%s]" %
+                (policy.name, policy.backend)
+            )
+
+            continue
+
+        matcher = None
+
+        if len(policy.rules) == 1:
+            matcher = _l7_matcher(policy.rules[0])
+
+        if matcher and groups and groups[-1][0] == matcher:
+            groups[-1][1].append(policy)
+        else:
+            groups.append((matcher, [policy]))
+
+    for matcher, policies in groups:
+        if matcher and len(policies) > 1:
+            fetch, match = matcher
+
+            map_path = os.path.join(
+                maps_dir,
+                '%s_%d.map' % (listener.name, len(maps))
+            )
+
+            entries = collections.OrderedDict()
+
+            for policy in policies:
+                value = _l7_value(policy.rules[0])
+
+                if any(value.startswith(v) if match == 'beg' else value == v
+                       for v in entries):
+                    continue
+
+                entries[value] = policy.backend
+
+            maps[map_path] = ''.join(
+                '%s %s\n' % (k, v) for k, v in entries.items()
+            )
+
+            lookup = '%s,map_%s(%s)' % (fetch, match, map_path)
+
+            use_backends.append(
+                'use_backend %%[%s] if { %s -m found }%s' %
+                (lookup, lookup, suffix)
+            )
+
+            continue
+
+        for policy in policies:
+            names = []
+
+            for rule in policy.rules:
+                fetch, match = _l7_matcher(rule)
+                key = (fetch, match, _l7_value(rule))
+
+                if key not in acls:
+                    acls[key] = '%s_l7_%d' % (listener.name, len(acls))
+
+                names.append(acls[key])
+
+            use_backends.append(
+                'use_backend %s if %s%s' %
+                (policy.backend, ' '.join(names), suffix)
+            )
+
+    acl_lines = [
+        'acl %s %s -m %s %s' % (name, fetch, match, value)
+        for (fetch, match, value), name in acls.items()
     ]
 
-    listener_options = ['%s %s' % (k, v) for k, v in listener.options.items()]
+    return acl_lines, use_backends, maps
+
+
+def _build_routing_rules(name, listeners, maps_dir, backends):
+    """Builds frontend rules routing requests to listener backends.
+
+    These are L7 policies of the listeners and, for a shared frontend,
+    routing by server name through a map file lookup.
+
+    :return: Tuple of rule lines and map files contents by path.
+    """
+    if len(listeners) == 1:
+        acls, use_backends, maps = _build_l7_rules(
+            listeners[0],
+            maps_dir,
+            backends
+        )
+
+        return acls + use_backends, maps
+
+    listener = listeners[0]
+
+    if listener.protocol.lower() == 'http':
+        fetch = _HOST_FETCH
+    elif _terminates_ssl(listener):
+        fetch = _SSL_FC_SNI_FETCH
+    else:
+        fetch = _SSL_SNI_FETCH
+
+    hosts_map = os.path.join(maps_dir, '%s_hosts.map' % name)
+    lookup = '%s,map_str(%s)' % (fetch, hosts_map)
+
+    rules = []
+    use_backends = []
+    maps = {
+        hosts_map: ''.join(
+            '%s %s\n' % (l.server_name.lower(), l.name)
+            for l in listeners if l.server_name
+        )
+    }
+
+    if fetch == _SSL_SNI_FETCH:
+        # SNI is read from ClientHello of a passed through connection.
+        rules += [
+            'tcp-request inspect-delay 5s',
+            'tcp-request content accept if { req_ssl_hello_type 1 }',
+        ]
+
+    for l in listeners:
+        if not l.l7policies:
+            continue
+
+        # Policies only apply to requests routed to their listener.
+        if l.server_name:
+            condition = '%s_host' % l.name
+
+            rules.append(
+                'acl %s %s -m str %s' % (condition, fetch,
+                                         l.server_name.lower())
+            )
+        else:
+            condition = '!%s_routed' % name
+
+            rules.append('acl %s_routed %s -m found' % (name, lookup))
+
+        acls, l7_use_backends, l7_maps = _build_l7_rules(
+            l,
+            maps_dir,
+            backends,
+            condition=condition
+        )
+
+        rules += acls
+        use_backends += l7_use_backends
+        maps.update(l7_maps)
+
+    use_backends.append(
+        'use_backend %%[%s] if { %s -m found }' % (lookup, lookup)
+    )
+
+    return rules + use_backends, maps
+
+
+def _build_frontend(name, listeners, crt_list=None, rules=()):
+    listener = listeners[0]
+
+    bind_str = _build_bind(listeners, crt_list=crt_list)
+
+    opts = ['mode %s' % listener.protocol]
+
+    # A shared frontend falls back to the listener without server name.
+    default = [
+        l for l in listeners if len(listeners) == 1 or not l.server_name
+    ]
+
+    if default:
+        opts.append('default_backend %s' % default[0].name)
+
+    opts.append(bind_str)
+    opts.extend(rules)
+
+    listener_options = collections.OrderedDict()
+
+    for l in listeners:
+        for k, v in (l.options or {}).items():
+            listener_options.setdefault(k, v)
+
+    listener_options = ['%s %s' % (k, v) for k, v in listener_options.items()]
 
-    frontend_line = 'frontend %s' % listener.name
+    frontend_line = 'frontend %s' % name
 
     return itertools.chain(
         [frontend_line],
@@ -63,6 +63,16 @@ class DBDuplicateEntryException(LBaaSException):
     message = "Database object already exists"
 
 
+class ConflictException(LBaaSException):
+    http_code = 409
+    message = "Conflicting object settings"
+
+
+class PreconditionFailedException(LBaaSException):
+    http_code = 412
+    message = "Object was changed since it was read"
+
+
 class DBQueryEntryException(LBaaSException):
     http_code = 400
 
@@ -74,3 +84,8 @@ class InputException(LBaaSException):
 class NotAllowedException(LBaaSException):
     http_code = 403
     message = "Operation not allowed"
+
+
+class ChangesExpiredException(LBaaSException):
+    http_code = 410
+    message = "Changes since the given revision are no longer available"
@@ -0,0 +1,82 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+from oslo_config import cfg
+import webob
+
+from lbaas.api import hooks
+from lbaas.db.v1 import api as db_api
+from lbaas.tests.unit import base
+
+
+class ReadYourWritesHookTest(base.BaseTest):
+    def setUp(self):
+        super(ReadYourWritesHookTest, self).setUp()
+
+        cfg.CONF.set_override('primary_read_window', 2.5, group='lbaas')
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'primary_read_window',
+            'lbaas'
+        )
+        self.addCleanup(db_api.set_write_time, None)
+
+        self.hook = hooks.ReadYourWritesHook()
+
+    def _request(self, cookie=None):
+        request = webob.Request.blank('/v1/listeners')
+
+        if cookie:
+            request.headers['Cookie'] = 'lbaas_write_time=%s' % cookie
+
+        state = mock.Mock(request=request, response=webob.Response())
+
+        self.hook.before(state)
+
+        return state
+
+    def test_write_time_from_cookie(self):
+        self._request('1500000000.25')
+
+        self.assertEqual(1500000000.25, db_api.get_write_time())
+
+        # Another request of the same green thread.
+        self._request()
+
+        self.assertIsNone(db_api.get_write_time())
+
+        self._request('invalid')
+
+        self.assertIsNone(db_api.get_write_time())
+
+    def test_write_sets_cookie(self):
+        state = self._request('1500000000.25')
+
+        db_api.set_write_time(1500000001.5)
+
+        self.hook.after(state)
+
+        cookie = state.response.headers['Set-Cookie']
+
+        self.assertIn('lbaas_write_time=1500000001.500000', cookie)
+        self.assertIn('Max-Age=3', cookie)
+
+    def test_read_keeps_cookie(self):
+        state = self._request('1500000000.25')
+
+        self.hook.after(state)
+
+        self.assertNotIn('Set-Cookie', state.response.headers)
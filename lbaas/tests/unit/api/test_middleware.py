@@ -0,0 +1,156 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import gzip
+import io
+import json
+import zlib
+
+from oslo_config import cfg
+import webob
+
+from lbaas.api import middleware
+from lbaas.db.v1 import api as db_api
+from lbaas.tests.unit.api import base as api_base
+from lbaas.tests.unit import base
+
+
+def _app(chunks, content_type='application/json', length=True):
+    def _wsgi_app(environ, start_response):
+        headers = [('Content-Type', content_type)]
+
+        if length:
+            headers.append(
+                ('Content-Length', str(sum(len(c) for c in chunks)))
+            )
+
+        start_response('200 OK', headers)
+
+        return iter(chunks)
+
+    return middleware.GzipMiddleware(_wsgi_app, min_size=100, level=1)
+
+
+def _call(app, accept_encoding='gzip, deflate'):
+    """Returns the headers and the body chunks of the response.
+
+    webtest decodes gzip bodies itself, so the app is called directly.
+    """
+    response = {}
+
+    def _start_response(status, headers, exc_info=None):
+        response['headers'] = dict(headers)
+
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'HTTP_ACCEPT_ENCODING': accept_encoding
+    }
+
+    chunks = list(app(environ, _start_response))
+
+    return response['headers'], chunks
+
+
+def _gunzip(body):
+    return gzip.GzipFile(fileobj=io.BytesIO(body)).read()
+
+
+class GzipMiddlewareTest(base.BaseTest):
+    def test_compress(self):
+        body = b'{"name": "member"}' * 100
+
+        headers, chunks = _call(_app([body]))
+
+        self.assertEqual('gzip', headers['Content-Encoding'])
+        self.assertEqual('Accept-Encoding', headers['Vary'])
+        self.assertNotIn('Content-Length', headers)
+        self.assertLess(len(b''.join(chunks)), len(body))
+        self.assertEqual(body, _gunzip(b''.join(chunks)))
+
+    def test_compress_stream(self):
+        body = [('{"name": "member%d"}\n' % i).encode() for i in range(50)]
+
+        headers, chunks = _call(_app(body, length=False))
+
+        self.assertEqual('gzip', headers['Content-Encoding'])
+
+        # Each chunk can be decompressed as soon as it's received.
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        received = [decompressor.decompress(chunk) for chunk in chunks]
+
+        self.assertEqual(b''.join(body[:5]), received[0])
+        self.assertEqual(body[5], received[1])
+        self.assertEqual(b''.join(body), b''.join(received))
+
+    def test_skip(self):
+        small = b'{"name": "member"}'
+        large = small * 100
+
+        # Not accepted.
+        self.assertEqual([large], _call(_app([large]), 'identity')[1])
+        self.assertEqual([large], _call(_app([large]), 'gzip;q=0')[1])
+
+        # Small.
+        headers, chunks = _call(_app([small]))
+
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual([small], chunks)
+
+        headers, chunks = _call(_app([small, small], length=False))
+
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(str(len(small) * 2), headers['Content-Length'])
+        self.assertEqual([small * 2], chunks)
+
+        # Not compressible.
+        headers, chunks = _call(_app([large], content_type='image/png'))
+
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual([large], chunks)
+
+    def test_accepts_gzip(self):
+        self.assertTrue(middleware._accepts_gzip('gzip'))
+        self.assertTrue(middleware._accepts_gzip('deflate, GZIP;q=0.5'))
+        self.assertTrue(middleware._accepts_gzip('*'))
+        self.assertFalse(middleware._accepts_gzip(''))
+        self.assertFalse(middleware._accepts_gzip('gzip;q=0'))
+        self.assertFalse(middleware._accepts_gzip('x-gzip, br'))
+
+
+class GzipApiTest(api_base.FunctionalTest):
+    def setUp(self):
+        # The middleware is set up along with the app.
+        cfg.CONF.set_override('compress_min_size', 0, 'api')
+        self.addCleanup(cfg.CONF.clear_override, 'compress_min_size', 'api')
+
+        super(GzipApiTest, self).setUp()
+
+    def test_list(self):
+        db_api.create_listener(
+            {'name': 'listener', 'protocol': 'HTTP', 'protocol_port': 80}
+        )
+
+        req = webob.Request.blank(
+            '/v1/listeners',
+            headers={'Accept-Encoding': 'gzip'}
+        )
+
+        resp = req.get_response(self.app.app)
+
+        self.assertEqual('gzip', resp.content_encoding)
+
+        body = json.loads(_gunzip(resp.body).decode())
+
+        self.assertEqual('listener', body['listeners'][0]['name'])
@@ -0,0 +1,93 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+
+from wsme import exc as wsme_exc
+
+from lbaas.api.controllers.v1 import listener
+from lbaas.api.controllers.v1 import member
+from lbaas.db.v1.sqlalchemy import models
+from lbaas.tests.unit import base
+
+
+class ResourceTest(base.BaseTest):
+    def test_from_dict(self):
+        tags = ['web']
+        options = {'timeout': '10'}
+
+        members = [member.Member.from_dict({'name': 'member'})]
+
+        res = listener.Listener.from_dict({
+            'name': 'listener',
+            'protocol_port': 80,
+            'options': options,
+            'members': members,
+            'description': None,
+            'unknown': 'value'
+        })
+
+        self.assertEqual(
+            {
+                'name': 'listener',
+                'protocol_port': 80,
+                'options': options,
+                'members': members,
+                'description': None
+            },
+            res.to_dict()
+        )
+
+        # Containers are copied by the validation.
+        res = member.Member.from_dict({'tags': tags})
+
+        self.assertEqual(tags, res.tags)
+        self.assertIsNot(tags, res.tags)
+
+    def test_from_dict_validates(self):
+        self.assertRaises(
+            wsme_exc.InvalidInput,
+            member.Member.from_dict,
+            {'version': 'latest'}
+        )
+        self.assertRaises(
+            wsme_exc.InvalidInput,
+            member.Member.from_dict,
+            {'tags': [1]}
+        )
+
+    def test_list_to_dict(self):
+        res = member.Members.convert_with_links(
+            [member.Member.from_dict({'id': '123', 'name': 'member'})],
+            1,
+            'http://localhost'
+        )
+
+        self.assertEqual(
+            {
+                'members': [{'id': '123', 'name': 'member'}],
+                'next': 'http://localhost/v1/members?limit=1&marker=123'
+            },
+            res.to_dict()
+        )
+
+    def test_model_to_dict(self):
+        now = datetime.datetime(2016, 1, 1)
+
+        db_model = models.Member(name='member', created_at=now)
+
+        self.assertEqual(
+            {'name': 'member', 'created_at': '2016-01-01 00:00:00'},
+            db_model.to_dict()
+        )
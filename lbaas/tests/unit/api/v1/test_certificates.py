@@ -0,0 +1,186 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+
+import mock
+
+from lbaas.db.v1 import api as db_api
+from lbaas.db.v1.sqlalchemy import models
+from lbaas.drivers import driver
+from lbaas import exceptions as exc
+from lbaas.tests.unit.api import base
+
+
+CERTIFICATE_DB = models.Certificate(
+    id='123',
+    name='cert',
+    content='-----BEGIN CERTIFICATE-----',
+    fingerprint='abcdef',
+    sni=['www.example.com'],
+    created_at=datetime.datetime(1970, 1, 1),
+    updated_at=datetime.datetime(1970, 1, 1)
+)
+
+CERTIFICATE = {
+    'id': '123',
+    'name': 'cert',
+    'fingerprint': 'abcdef',
+    'sni': ['www.example.com'],
+    'created_at': '1970-01-01 00:00:00',
+    'updated_at': '1970-01-01 00:00:00'
+}
+
+MOCK_CERTIFICATE = mock.MagicMock(return_value=CERTIFICATE_DB)
+MOCK_CERTIFICATES = mock.MagicMock(return_value=[CERTIFICATE_DB])
+MOCK_DELETE = mock.MagicMock(return_value=None)
+MOCK_NOT_FOUND = mock.MagicMock(side_effect=exc.NotFoundException())
+MOCK_DUPLICATE = mock.MagicMock(side_effect=exc.DBDuplicateEntryException())
+
+
+class TestCertificatesController(base.FunctionalTest):
+    def setUp(self):
+        super(TestCertificatesController, self).setUp()
+
+        self.driver_origin = driver.LB_DRIVER
+        driver.LB_DRIVER = mock.Mock()
+
+    def tearDown(self):
+        driver.LB_DRIVER = self.driver_origin
+
+        super(TestCertificatesController, self).tearDown()
+
+    @mock.patch.object(db_api, "get_certificate", MOCK_CERTIFICATE)
+    def test_get(self):
+        resp = self.app.get('/v1/certificates/cert')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertDictEqual(CERTIFICATE, resp.json)
+
+    @mock.patch.object(db_api, "get_certificate", MOCK_NOT_FOUND)
+    def test_get_not_found(self):
+        resp = self.app.get('/v1/certificates/cert', expect_errors=True)
+
+        self.assertEqual(404, resp.status_int)
+
+    @mock.patch.object(db_api, "get_certificates", MOCK_CERTIFICATES)
+    def test_get_all(self):
+        resp = self.app.get('/v1/certificates')
+
+        self.assertEqual(200, resp.status_int)
+
+        self.assertEqual(1, len(resp.json['certificates']))
+        self.assertDictEqual(CERTIFICATE, resp.json['certificates'][0])
+
+    @mock.patch.object(db_api, "create_certificate", MOCK_CERTIFICATE)
+    @mock.patch.object(db_api, "get_listener", MOCK_CERTIFICATE)
+    def test_post(self):
+        driver.LB_DRIVER().create_certificate = MOCK_CERTIFICATE
+
+        resp = self.app.post_json(
+            '/v1/certificates',
+            {
+                'name': 'cert',
+                'content': '-----BEGIN CERTIFICATE-----',
+                'listener_name': 'listener_name'
+            }
+        )
+
+        self.assertEqual(201, resp.status_int)
+        self.assertEqual(CERTIFICATE, resp.json)
+        self.assertNotIn('content', resp.json)
+
+    def test_post_apply_failure(self):
+        listener = db_api.create_listener({
+            'name': 'listener',
+            'protocol': 'http',
+            'protocol_port': 443
+        })
+
+        lb_driver = driver.LB_DRIVER()
+        lb_driver.create_certificate.side_effect = lambda c: c
+        lb_driver.apply_changes.side_effect = RuntimeError('restart failed')
+
+        resp = self.app.post_json(
+            '/v1/certificates',
+            {
+                'name': 'cert',
+                'content': '-----BEGIN CERTIFICATE-----',
+                'listener_name': 'listener'
+            },
+            expect_errors=True
+        )
+
+        self.assertEqual(500, resp.status_int)
+
+        # Committed before the balancer was restarted.
+        self.assertEqual(
+            listener.id,
+            db_api.get_certificate('cert').listener_id
+        )
+
+    def test_post_without_content(self):
+        resp = self.app.post_json(
+            '/v1/certificates',
+            {'name': 'cert', 'listener_name': 'listener_name'},
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+
+    @mock.patch.object(db_api, "create_certificate", MOCK_DUPLICATE)
+    @mock.patch.object(db_api, "get_listener", MOCK_CERTIFICATE)
+    def test_post_dup(self):
+        resp = self.app.post_json(
+            '/v1/certificates',
+            {
+                'name': 'cert',
+                'content': '-----BEGIN CERTIFICATE-----',
+                'listener_name': 'listener_name'
+            },
+            expect_errors=True
+        )
+
+        self.assertEqual(409, resp.status_int)
+
+    @mock.patch.object(db_api, "update_certificate", MOCK_CERTIFICATE)
+    def test_put(self):
+        driver.LB_DRIVER().update_certificate = MOCK_CERTIFICATE
+
+        resp = self.app.put_json(
+            '/v1/certificates/cert',
+            {'content': '-----BEGIN CERTIFICATE-----'}
+        )
+
+        self.assertEqual(200, resp.status_int)
+        self.assertEqual(CERTIFICATE, resp.json)
+
+    @mock.patch.object(db_api, "get_certificate", MOCK_CERTIFICATE)
+    @mock.patch.object(
+        db_api,
+        "delete_certificate",
+        mock.Mock(return_value=None)
+    )
+    def test_delete(self):
+        driver.LB_DRIVER().delete_certificate = MOCK_DELETE
+
+        resp = self.app.delete('/v1/certificates/cert')
+
+        self.assertEqual(204, resp.status_int)
+
+    @mock.patch.object(db_api, "get_certificate", MOCK_NOT_FOUND)
+    def test_delete_not_found(self):
+        resp = self.app.delete('/v1/certificates/cert', expect_errors=True)
+
+        self.assertEqual(404, resp.status_int)
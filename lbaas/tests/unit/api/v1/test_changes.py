@@ -0,0 +1,97 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import threading
+import time
+
+import mock
+
+from lbaas.db.v1 import api as db_api
+from lbaas import exceptions as exc
+from lbaas.tests.unit.api import base
+
+
+LISTENER = {'name': 'listener1', 'protocol': 'HTTP', 'protocol_port': 80}
+
+
+class TestChangesController(base.FunctionalTest):
+    def test_get_current_revision(self):
+        db_api.create_listener(LISTENER)
+
+        resp = self.app.get('/v1/changes')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertEqual(
+            {'changes': [], 'revision': db_api.get_revision()},
+            resp.json
+        )
+
+    def test_get_since(self):
+        since = db_api.get_revision()
+
+        db_api.create_listener(LISTENER)
+
+        resp = self.app.get('/v1/changes?since=%s' % since)
+
+        self.assertEqual(since + 1, resp.json['revision'])
+        self.assertEqual(1, len(resp.json['changes']))
+        self.assertDictContainsSubset(
+            {
+                'revision': since + 1,
+                'resource': 'listener',
+                'name': 'listener1',
+                'action': 'created'
+            },
+            resp.json['changes'][0]
+        )
+
+    def test_get_wait(self):
+        since = db_api.get_revision()
+
+        writer = threading.Timer(0.2, db_api.create_listener, [LISTENER])
+        writer.start()
+
+        self.addCleanup(writer.join)
+
+        started = time.time()
+
+        resp = self.app.get('/v1/changes?since=%s&wait=10' % since)
+
+        self.assertLess(time.time() - started, 5)
+        self.assertEqual(
+            ['listener1'],
+            [c['name'] for c in resp.json['changes']]
+        )
+
+    def test_get_wait_timeout(self):
+        since = db_api.get_revision()
+
+        resp = self.app.get('/v1/changes?since=%s&wait=0.2' % since)
+
+        self.assertEqual({'changes': [], 'revision': since}, resp.json)
+
+    @mock.patch.object(
+        db_api,
+        'get_changes',
+        mock.MagicMock(side_effect=exc.ChangesExpiredException())
+    )
+    def test_get_expired(self):
+        resp = self.app.get('/v1/changes?since=1', expect_errors=True)
+
+        self.assertEqual(410, resp.status_int)
+
+    def test_get_negative(self):
+        resp = self.app.get('/v1/changes?since=-1', expect_errors=True)
+
+        self.assertEqual(400, resp.status_int)
@@ -0,0 +1,198 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+
+from lbaas.db.v1 import api as db_api
+from lbaas.drivers import driver
+from lbaas.tests.unit.api import base
+
+
+def _listener(name):
+    return {'name': name, 'protocol': 'HTTP', 'protocol_port': 80}
+
+
+def _member(name, listener_name):
+    return {
+        'name': name,
+        'address': '10.0.0.1',
+        'protocol_port': 8080,
+        'listener_id': db_api.get_listener(listener_name).id
+    }
+
+
+class TestETag(base.FunctionalTest):
+    def setUp(self):
+        super(TestETag, self).setUp()
+
+        db_api.create_listener(_listener('listener1'))
+        db_api.create_listener(_listener('listener2'))
+
+    def _get(self, url, etag=None, status=200):
+        headers = {'If-None-Match': etag} if etag else {}
+
+        return self.app.get(url, headers=headers, status=status)
+
+    def test_collection(self):
+        resp = self._get('/v1/listeners')
+
+        self.assertTrue(resp.headers['ETag'].startswith('W/'))
+
+        self._get('/v1/listeners', resp.headers['ETag'], status=304)
+
+        db_api.create_listener(_listener('listener3'))
+
+        new_resp = self._get('/v1/listeners', resp.headers['ETag'])
+
+        self.assertNotEqual(resp.headers['ETag'], new_resp.headers['ETag'])
+        self.assertEqual(3, len(new_resp.json['listeners']))
+
+    def test_not_modified_without_loading(self):
+        etag = self._get('/v1/members').headers['ETag']
+
+        with mock.patch.object(db_api, 'get_member_rows') as get_members:
+            self._get('/v1/members', etag, status=304)
+
+        self.assertFalse(get_members.called)
+
+    def test_listener(self):
+        url = '/v1/listeners/listener1'
+
+        etag = self._get(url).headers['ETag']
+
+        self.assertEqual(etag, self._get(url + '/members').headers['ETag'])
+
+        db_api.create_member(_member('member2', 'listener2'))
+
+        self._get(url, etag, status=304)
+
+        db_api.create_member(_member('member1', 'listener1'))
+
+        new_resp = self._get(url + '/members', etag)
+
+        self.assertEqual(1, len(new_resp.json['members']))
+        self.assertNotEqual(etag, new_resp.headers['ETag'])
+
+    def test_deleted_listener(self):
+        url = '/v1/listeners/listener1'
+
+        db_api.update_listener('listener1', {'protocol_port': 8080})
+
+        etag = self._get(url).headers['ETag']
+
+        db_api.delete_listener('listener1')
+
+        self._get(url, etag, status=404)
+
+    def test_no_etag_on_error(self):
+        resp = self._get('/v1/listeners?limit=-1', status=400)
+
+        self.assertNotIn('ETag', resp.headers)
+
+    def test_member(self):
+        db_api.create_member(_member('member1', 'listener1'))
+
+        url = '/v1/members/member1'
+
+        resp = self._get(url)
+
+        self.assertEqual('W/"1"', resp.headers['ETag'])
+        self.assertEqual(1, resp.json['version'])
+        self.assertIn('Accept', resp.headers['Vary'])
+
+        resp = self._get(url, 'W/"1"', status=304)
+
+        self.assertEqual('W/"1"', resp.headers['ETag'])
+
+        db_api.update_member('member1', {'description': 'new'})
+
+        self.assertEqual('W/"2"', self._get(url, 'W/"1"').headers['ETag'])
+
+    def test_member_msgpack(self):
+        db_api.create_member(_member('member1', 'listener1'))
+
+        url = '/v1/members/member1'
+
+        etag = self._get(url).headers['ETag']
+
+        # The same data in another format.
+        resp = self.app.get(
+            url,
+            headers={'Accept': 'application/x-msgpack'}
+        )
+
+        self.assertEqual(etag, resp.headers['ETag'])
+        self.assertIn('Accept', resp.headers['Vary'])
+
+
+class TestIfMatch(base.FunctionalTest):
+    def setUp(self):
+        super(TestIfMatch, self).setUp()
+
+        lb_driver = mock.Mock()
+        lb_driver.update_member.side_effect = lambda member: member
+        lb_driver.update_listener.side_effect = lambda listener: listener
+
+        patcher = mock.patch.object(driver, 'LB_DRIVER', lambda: lb_driver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        db_api.create_listener(_listener('listener1'))
+        db_api.create_member(_member('member1', 'listener1'))
+
+    def _put(self, url, body, etag=None, status=200):
+        headers = {'If-Match': etag} if etag else {}
+
+        return self.app.put_json(
+            url,
+            body,
+            headers=headers,
+            status=status,
+            expect_errors=status >= 400
+        )
+
+    def test_member(self):
+        url = '/v1/members/member1'
+
+        resp = self._put(url, {'description': 'new'}, '"1"')
+
+        self.assertEqual('W/"2"', resp.headers['ETag'])
+        self.assertEqual(2, resp.json['version'])
+
+        resp = self._put(url, {'description': 'newer'}, '"1"', status=412)
+
+        self.assertIn("version doesn't match", resp.json['faultstring'])
+        self.assertEqual('new', db_api.get_member('member1').description)
+
+        self._put(url, {'description': 'newer'}, '*')
+        self._put(url, {'description': 'newest'})
+
+    def test_listener(self):
+        url = '/v1/listeners/listener1'
+
+        self._put(url, {'description': 'new'}, '"2"', status=412)
+
+        resp = self._put(url, {'description': 'new'}, '"1"')
+
+        self.assertEqual('W/"2"', resp.headers['ETag'])
+
+    def test_invalid_etag(self):
+        url = '/v1/members/member1'
+
+        self._put(url, {'description': 'new'}, '"abc"', status=412)
+        self._put(url, {'description': 'new'}, '"1", "2"', status=400)
+
+        resp = self._put(url, {'description': 'new'}, 'W/"1"', status=412)
+
+        self.assertIn('weak entity tags never match', resp.json['faultstring'])
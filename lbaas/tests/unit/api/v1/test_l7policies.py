@@ -0,0 +1,204 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import copy
+import datetime
+
+import mock
+
+from lbaas.db.v1 import api as db_api
+from lbaas.db.v1.sqlalchemy import models
+from lbaas.drivers import driver
+from lbaas import exceptions as exc
+from lbaas.tests.unit.api import base
+
+
+L7POLICY_DB = models.L7Policy(
+    id='123',
+    name='api',
+    backend='api_listener',
+    position=1,
+    rules=[{'type': 'path_prefix', 'value': '/api'}],
+    created_at=datetime.datetime(1970, 1, 1),
+    updated_at=datetime.datetime(1970, 1, 1)
+)
+
+L7POLICY = {
+    'id': '123',
+    'name': 'api',
+    'backend': 'api_listener',
+    'position': 1,
+    'rules': [{'type': 'path_prefix', 'value': '/api'}],
+    'created_at': '1970-01-01 00:00:00',
+    'updated_at': '1970-01-01 00:00:00'
+}
+
+MOCK_L7POLICY = mock.MagicMock(return_value=L7POLICY_DB)
+MOCK_L7POLICIES = mock.MagicMock(return_value=[L7POLICY_DB])
+MOCK_LISTENER = mock.MagicMock(return_value=mock.Mock(id='456'))
+MOCK_NONE = mock.MagicMock(return_value=None)
+MOCK_DELETE = mock.MagicMock(return_value=None)
+MOCK_NOT_FOUND = mock.MagicMock(side_effect=exc.NotFoundException())
+
+
+class TestL7PoliciesController(base.FunctionalTest):
+    def setUp(self):
+        super(TestL7PoliciesController, self).setUp()
+
+        self.driver_origin = driver.LB_DRIVER
+        driver.LB_DRIVER = mock.Mock()
+
+    def tearDown(self):
+        driver.LB_DRIVER = self.driver_origin
+
+        super(TestL7PoliciesController, self).tearDown()
+
+    @mock.patch.object(db_api, "get_l7policy", MOCK_L7POLICY)
+    def test_get(self):
+        resp = self.app.get('/v1/l7policies/api')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertDictEqual(L7POLICY, resp.json)
+
+    @mock.patch.object(db_api, "get_l7policy", MOCK_NOT_FOUND)
+    def test_get_not_found(self):
+        resp = self.app.get('/v1/l7policies/api', expect_errors=True)
+
+        self.assertEqual(404, resp.status_int)
+
+    @mock.patch.object(db_api, "get_l7policies", MOCK_L7POLICIES)
+    def test_get_all(self):
+        resp = self.app.get('/v1/l7policies')
+
+        self.assertEqual(200, resp.status_int)
+
+        self.assertEqual(1, len(resp.json['l7policies']))
+        self.assertDictEqual(L7POLICY, resp.json['l7policies'][0])
+
+    @mock.patch.object(db_api, "create_l7policy")
+    @mock.patch.object(db_api, "get_listener", MOCK_LISTENER)
+    @mock.patch.object(db_api, "load_listener", MOCK_LISTENER)
+    def test_post(self, create_l7policy):
+        create_l7policy.return_value = L7POLICY_DB
+        driver.LB_DRIVER().create_l7policy = MOCK_L7POLICY
+
+        l7policy = copy.deepcopy(L7POLICY)
+        l7policy['listener_name'] = 'listener_name'
+
+        resp = self.app.post_json('/v1/l7policies', l7policy)
+
+        self.assertEqual(201, resp.status_int)
+        self.assertEqual(L7POLICY, resp.json)
+
+        values = create_l7policy.call_args[0][0]
+
+        self.assertEqual('456', values['listener_id'])
+        self.assertEqual(L7POLICY['rules'], values['rules'])
+
+    def test_post_apply_failure(self):
+        for name in ('listener_name', 'api_listener'):
+            db_api.create_listener({
+                'name': name,
+                'protocol': 'http',
+                'protocol_port': 80
+            })
+
+        lb_driver = driver.LB_DRIVER()
+        lb_driver.create_l7policy.side_effect = lambda p: p
+        lb_driver.apply_changes.side_effect = RuntimeError('restart failed')
+
+        resp = self.app.post_json(
+            '/v1/l7policies',
+            {
+                'name': 'api',
+                'listener_name': 'listener_name',
+                'backend': 'api_listener',
+                'rules': L7POLICY['rules']
+            },
+            expect_errors=True
+        )
+
+        self.assertEqual(500, resp.status_int)
+
+        # Committed before the balancer was restarted.
+        self.assertEqual('api_listener', db_api.get_l7policy('api').backend)
+
+    @mock.patch.object(db_api, "load_listener", MOCK_LISTENER)
+    def test_post_invalid_rule_type(self):
+        l7policy = copy.deepcopy(L7POLICY)
+        l7policy['listener_name'] = 'listener_name'
+        l7policy['rules'] = [{'type': 'cookie', 'value': 'x'}]
+
+        resp = self.app.post_json(
+            '/v1/l7policies',
+            l7policy,
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+
+    @mock.patch.object(db_api, "load_listener", MOCK_LISTENER)
+    def test_post_header_rule_without_key(self):
+        l7policy = copy.deepcopy(L7POLICY)
+        l7policy['listener_name'] = 'listener_name'
+        l7policy['rules'] = [{'type': 'header', 'value': 'x'}]
+
+        resp = self.app.post_json(
+            '/v1/l7policies',
+            l7policy,
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+
+    @mock.patch.object(db_api, "load_listener", MOCK_LISTENER)
+    def test_post_header_rule_invalid_key(self):
+        l7policy = copy.deepcopy(L7POLICY)
+        l7policy['listener_name'] = 'listener_name'
+
+        for key in ('x-id)', 'x id', 'x-id\n\tbind :80'):
+            l7policy['rules'] = [
+                {'type': 'header', 'key': key, 'value': 'x'}
+            ]
+
+            resp = self.app.post_json(
+                '/v1/l7policies',
+                l7policy,
+                expect_errors=True
+            )
+
+            self.assertEqual(400, resp.status_int)
+            self.assertIn('valid header name', resp.json['faultstring'])
+
+    @mock.patch.object(db_api, "load_listener", MOCK_NONE)
+    def test_post_unknown_backend(self):
+        l7policy = copy.deepcopy(L7POLICY)
+        l7policy['listener_name'] = 'listener_name'
+
+        resp = self.app.post_json(
+            '/v1/l7policies',
+            l7policy,
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+
+    @mock.patch.object(db_api, "get_l7policy", MOCK_L7POLICY)
+    @mock.patch.object(db_api, "delete_l7policy", MOCK_DELETE)
+    def test_delete(self):
+        driver.LB_DRIVER().delete_l7policy = MOCK_DELETE
+
+        resp = self.app.delete('/v1/l7policies/api')
+
+        self.assertEqual(204, resp.status_int)
@@ -59,7 +59,11 @@ UPDATED_LISTENER = copy.deepcopy(LISTENER)
 UPDATED_LISTENER_DB = db.Listener(**LISTENER_DB_DICT)
 
 MOCK_LISTENER = mock.MagicMock(return_value=LISTENER_DB)
-MOCK_LISTENERS = mock.MagicMock(return_value=[LISTENER_DB])
+MOCK_LISTENER_ROWS = mock.MagicMock(
+    side_effect=lambda fields, **kwargs: [
+        tuple(getattr(LISTENER_DB, f) for f in fields)
+    ]
+)
 MOCK_UPDATED_LISTENER = mock.MagicMock(return_value=UPDATED_LISTENER_DB)
 MOCK_EMPTY = mock.MagicMock(return_value=[])
 MOCK_NOT_FOUND = mock.MagicMock(side_effect=exc.NotFoundException())
@@ -79,13 +83,23 @@ class TestListenerController(base.FunctionalTest):
 
         super(TestListenerController, self).tearDown()
 
-    @mock.patch.object(db_api, 'get_listeners', MOCK_LISTENERS)
+    @mock.patch.object(db_api, 'get_listener_rows', MOCK_LISTENER_ROWS)
     def test_get_all(self):
         resp = self.app.get('/v1/listeners')
 
         self.assertEqual(200, resp.status_int)
         self.assertEqual(1, len(resp.json['listeners']))
 
+    @mock.patch.object(db_api, 'get_listener_rows', MOCK_LISTENER_ROWS)
+    def test_get_all_fields_with_members(self):
+        resp = self.app.get('/v1/listeners?fields=name,members')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertDictEqual(
+            {'id': LISTENER['id'], 'name': 'test', 'members': []},
+            resp.json['listeners'][0]
+        )
+
     def test_get_all_empty(self):
         resp = self.app.get('/v1/listeners')
 
@@ -99,6 +113,24 @@ class TestListenerController(base.FunctionalTest):
         self.assertEqual(200, resp.status_int)
         self.assertDictEqual(LISTENER, resp.json)
 
+    @mock.patch.object(db_api, 'get_listener', MOCK_LISTENER)
+    def test_get_fields(self):
+        resp = self.app.get('/v1/listeners/123?fields=name,protocol_port')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertDictEqual(
+            {'id': LISTENER['id'], 'name': 'test', 'protocol_port': 80},
+            resp.json
+        )
+
+    def test_get_invalid_fields(self):
+        resp = self.app.get(
+            '/v1/listeners/123?fields=members',
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+
     @mock.patch.object(db_api, "get_listener", MOCK_NOT_FOUND)
     def test_get_not_found(self):
         resp = self.app.get('/v1/listeners/123', expect_errors=True)
@@ -130,6 +162,20 @@ class TestListenerController(base.FunctionalTest):
 
         self.assertEqual(409, resp.status_int)
 
+    @mock.patch.object(db_api, "create_listener", MOCK_LISTENER)
+    def test_post_bind_conflict(self):
+        driver.LB_DRIVER().create_listener = mock.MagicMock(
+            side_effect=exc.ConflictException()
+        )
+
+        resp = self.app.post_json(
+            '/v1/listeners',
+            LISTENER,
+            expect_errors=True
+        )
+
+        self.assertEqual(409, resp.status_int)
+
     @mock.patch.object(db_api, "update_listener", MOCK_UPDATED_LISTENER)
     def test_put(self):
         driver.LB_DRIVER().update_listener = MOCK_UPDATED_LISTENER
@@ -15,7 +15,9 @@
 import copy
 import datetime
 import mock
+from six.moves.urllib import parse
 
+from lbaas.api.controllers.v1 import member
 from lbaas.db.v1 import api as db_api
 from lbaas.db.v1.sqlalchemy import models
 from lbaas.drivers import driver
@@ -48,6 +50,11 @@ UPDATED_MEMBER = copy.deepcopy(MEMBER)
 
 MOCK_MEMBER = mock.MagicMock(return_value=MEMBER_DB)
 MOCK_MEMBERS = mock.MagicMock(return_value=[MEMBER_DB])
+MOCK_MEMBER_ROWS = mock.MagicMock(
+    side_effect=lambda fields, **kwargs: [
+        tuple(getattr(MEMBER_DB, f) for f in fields)
+    ]
+)
 MOCK_UPDATED_MEMBER = mock.MagicMock(return_value=UPDATED_MEMBER_DB)
 MOCK_DELETE = mock.MagicMock(return_value=None)
 MOCK_EMPTY = mock.MagicMock(return_value=[])
@@ -74,6 +81,24 @@ class TestMembersController(base.FunctionalTest):
         self.assertEqual(200, resp.status_int)
         self.assertDictEqual(MEMBER, resp.json)
 
+    @mock.patch.object(db_api, "get_member", MOCK_MEMBER)
+    def test_get_fields(self):
+        resp = self.app.get('/v1/members/123?fields=name,address')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertDictEqual(
+            {'id': '123', 'name': 'member', 'address': '10.0.0.1'},
+            resp.json
+        )
+
+    def test_get_invalid_fields(self):
+        resp = self.app.get(
+            '/v1/members/123?fields=listener_name',
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+
     @mock.patch.object(db_api, "get_member", MOCK_NOT_FOUND)
     def test_get_not_found(self):
         resp = self.app.get('/v1/members/123', expect_errors=True)
@@ -92,6 +117,18 @@ class TestMembersController(base.FunctionalTest):
         self.assertEqual(200, resp.status_int)
         self.assertEqual(UPDATED_MEMBER, resp.json)
 
+    @mock.patch.object(db_api, "update_member")
+    def test_put_tag_too_long(self, mock_update_member):
+        resp = self.app.put_json(
+            '/v1/members/123',
+            {'tags': ['demo', 'x' * 81]},
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+        self.assertIn('at most 80 characters', resp.json['faultstring'])
+        self.assertFalse(mock_update_member.called)
+
     @mock.patch.object(db_api, "update_member", MOCK_NOT_FOUND)
     def test_put_not_found(self):
         driver.LB_DRIVER().update_member = MOCK_NOT_FOUND
@@ -120,6 +157,18 @@ class TestMembersController(base.FunctionalTest):
         self.assertEqual(201, resp.status_int)
         self.assertEqual(MEMBER, resp.json)
 
+    @mock.patch.object(db_api, "create_member")
+    def test_post_tag_too_long(self, mock_create_member):
+        member = copy.deepcopy(MEMBER)
+        member['listener_name'] = 'listener_name'
+        member['tags'] = ['x' * 81]
+
+        resp = self.app.post_json('/v1/members', member, expect_errors=True)
+
+        self.assertEqual(400, resp.status_int)
+        self.assertIn('at most 80 characters', resp.json['faultstring'])
+        self.assertFalse(mock_create_member.called)
+
     @mock.patch.object(db_api, "create_member", MOCK_DUPLICATE)
     @mock.patch.object(db_api, "get_listener", MOCK_MEMBER)
     def test_post_dup(self):
@@ -153,19 +202,294 @@ class TestMembersController(base.FunctionalTest):
 
         self.assertEqual(404, resp.status_int)
 
-    @mock.patch.object(db_api, "get_members", MOCK_MEMBERS)
+    @mock.patch.object(db_api, "get_member_rows", MOCK_MEMBER_ROWS)
     def test_get_all(self):
         resp = self.app.get('/v1/members')
 
         self.assertEqual(200, resp.status_int)
 
         self.assertEqual(1, len(resp.json['members']))
-        self.assertDictEqual(MEMBER, resp.json['members'][0])
+        self.assertDictEqual(
+            dict(MEMBER, description=None, version=None),
+            resp.json['members'][0]
+        )
+
+    @mock.patch.object(db_api, "get_member_rows")
+    def test_get_all_pagination(self, mock_get_members):
+        mock_get_members.side_effect = MOCK_MEMBER_ROWS.side_effect
+
+        resp = self.app.get(
+            '/v1/members?limit=1&sort_keys=created_at,name&sort_dirs=desc'
+        )
+
+        self.assertEqual(200, resp.status_int)
+        self.assertEqual(1, len(resp.json['members']))
+        self.assertIn('marker=123', resp.json['next'])
+        self.assertIn('/v1/members', resp.json['next'])
+
+        mock_get_members.assert_called_once_with(
+            member.get_columns(),
+            limit=1,
+            marker=None,
+            sort_keys=['created_at', 'name'],
+            sort_dirs=['desc', 'asc']
+        )
+
+    @mock.patch.object(db_api, "get_member_rows")
+    def test_get_all_next_encoded(self, mock_get_members):
+        mock_get_members.side_effect = MOCK_MEMBER_ROWS.side_effect
+
+        resp = self.app.get('/v1/members?tags=web%26db,demo&limit=1')
+
+        self.assertEqual(200, resp.status_int)
+
+        query = parse.parse_qs(parse.urlparse(resp.json['next']).query)
+
+        self.assertEqual(['web&db,demo'], query['tags'])
+        self.assertEqual(['123'], query['marker'])
+
+    @mock.patch.object(db_api, "get_member_rows")
+    def test_get_all_fields(self, mock_get_members):
+        mock_get_members.return_value = [('123', 'member', '10.0.0.1')]
+
+        resp = self.app.get('/v1/members?fields=name,address')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertDictEqual(
+            {'id': '123', 'name': 'member', 'address': '10.0.0.1'},
+            resp.json['members'][0]
+        )
+        self.assertEqual(
+            ['id', 'name', 'address'],
+            mock_get_members.call_args[0][0]
+        )
+
+    def test_get_all_listener_name_field(self):
+        resp = self.app.get(
+            '/v1/members?fields=name,listener_name',
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+        self.assertIn('listener_name', resp.json['faultstring'])
+
+    @mock.patch.object(db_api, "get_listener")
+    @mock.patch.object(db_api, "get_member_rows")
+    def test_get_all_filtered(self, mock_get_members, mock_get_listener):
+        mock_get_members.side_effect = MOCK_MEMBER_ROWS.side_effect
+        mock_get_listener.return_value = models.Listener(id='321')
+
+        resp = self.app.get(
+            '/v1/members?listener_name=app&address=10.0.0.1'
+            '&protocol_port=80&created_since=2016-01-01T00:00:00&limit=1'
+        )
+
+        self.assertEqual(200, resp.status_int)
+        self.assertIn('listener_name=app', resp.json['next'])
+
+        mock_get_listener.assert_called_once_with('app')
+
+        kwargs = mock_get_members.call_args[1]
+
+        self.assertEqual('321', kwargs['listener_id'])
+        self.assertEqual('10.0.0.1', kwargs['address'])
+        self.assertEqual(80, kwargs['protocol_port'])
+        self.assertEqual(
+            datetime.datetime(2016, 1, 1),
+            kwargs['created_since']
+        )
+        self.assertNotIn('protocol', kwargs)
+
+    @mock.patch.object(db_api, "get_member_rows")
+    def test_get_all_by_tags(self, mock_get_members):
+        mock_get_members.side_effect = MOCK_MEMBER_ROWS.side_effect
+
+        resp = self.app.get('/v1/members?tags=demo,deployment&tags_any=a,b')
+
+        self.assertEqual(200, resp.status_int)
+
+        kwargs = mock_get_members.call_args[1]
 
-    @mock.patch.object(db_api, "get_members", MOCK_EMPTY)
+        self.assertEqual(['demo', 'deployment'], kwargs['tags'])
+        self.assertEqual(['a', 'b'], kwargs['tags_any'])
+
+    @mock.patch.object(db_api, "get_listener")
+    @mock.patch.object(db_api, "get_member_rows", MOCK_MEMBER_ROWS)
+    def test_get_listener_members(self, mock_get_listener):
+        mock_get_listener.return_value = models.Listener(id='321')
+
+        resp = self.app.get('/v1/listeners/app/members')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertEqual(1, len(resp.json['members']))
+
+        mock_get_listener.assert_called_once_with('app')
+
+        self.assertEqual(
+            '321',
+            MOCK_MEMBER_ROWS.call_args[1]['listener_id']
+        )
+
+    @mock.patch.object(db_api, "get_listener", MOCK_NOT_FOUND)
+    def test_get_listener_members_not_found(self):
+        resp = self.app.get(
+            '/v1/listeners/app/members',
+            expect_errors=True
+        )
+
+        self.assertEqual(404, resp.status_int)
+
+    def test_get_all_invalid_fields(self):
+        resp = self.app.get(
+            '/v1/members?fields=name,secret',
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+
+    @mock.patch.object(db_api, "get_member_rows", MOCK_MEMBER_ROWS)
+    def test_get_all_last_page(self):
+        resp = self.app.get('/v1/members?limit=2&marker=100')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertNotIn('next', resp.json)
+
+    def test_get_all_invalid_limit(self):
+        resp = self.app.get('/v1/members?limit=0', expect_errors=True)
+
+        self.assertEqual(400, resp.status_int)
+
+    @mock.patch.object(db_api, "get_member_rows", MOCK_EMPTY)
     def test_get_all_empty(self):
         resp = self.app.get('/v1/members')
 
         self.assertEqual(200, resp.status_int)
 
         self.assertEqual(0, len(resp.json['members']))
+
+    @mock.patch.object(db_api, "get_listeners")
+    @mock.patch.object(db_api, "get_members")
+    @mock.patch.object(db_api, "create_members")
+    def test_post_bulk(self, mock_create_members, mock_get_members,
+                       mock_get_listeners):
+        mock_get_listeners.return_value = [('321', 'app')]
+        mock_get_members.return_value = [('taken',)]
+        mock_create_members.return_value = [MEMBER_DB]
+
+        items = [
+            {'name': 'member', 'address': '10.0.0.1', 'protocol_port': 80,
+             'listener_name': 'app'},
+            {'name': 'taken', 'address': '10.0.0.2', 'protocol_port': 80,
+             'listener_name': 'app'},
+            {'name': 'orphan', 'address': '10.0.0.3', 'protocol_port': 80,
+             'listener_name': 'unknown'},
+            {'name': 'member', 'address': '10.0.0.4', 'protocol_port': 80,
+             'listener_name': 'app'},
+            {'name': 'invalid'},
+            {'name': 'tagged', 'address': '10.0.0.5', 'protocol_port': 80,
+             'listener_name': 'app', 'tags': ['x' * 81]},
+        ]
+
+        resp = self.app.post_json('/v1/members/bulk', {'members': items})
+
+        self.assertEqual(200, resp.status_int)
+
+        results = resp.json['results']
+
+        self.assertEqual(
+            ['created', 'error', 'error', 'error', 'error', 'error'],
+            [r['status'] for r in results]
+        )
+        self.assertEqual(MEMBER, results[0]['member'])
+        self.assertIn('already exists', results[1]['error'])
+        self.assertIn('Listener not found', results[2]['error'])
+        self.assertIn('already exists', results[3]['error'])
+        self.assertIn('at most 80 characters', results[5]['error'])
+
+        mock_create_members.assert_called_once_with(
+            [{'name': 'member', 'address': '10.0.0.1', 'protocol_port': 80,
+              'listener_id': '321'}]
+        )
+
+        lb_driver = driver.LB_DRIVER()
+
+        lb_driver.create_members.assert_called_once_with([MEMBER_DB])
+        lb_driver.apply_changes.assert_called_once_with()
+
+    @mock.patch.object(db_api, "get_members")
+    @mock.patch.object(db_api, "update_members")
+    def test_put_bulk(self, mock_update_members, mock_get_members):
+        mock_get_members.return_value = [('member', 1), ('stale', 3)]
+        mock_update_members.return_value = [UPDATED_MEMBER_DB]
+
+        items = [
+            {'name': 'member', 'description': 'new'},
+            {'name': 'missing', 'description': 'new'},
+            {'name': 'stale', 'description': 'new', 'version': 2},
+            {'name': 'member', 'tags': ['x' * 81]},
+        ]
+
+        resp = self.app.put_json('/v1/members/bulk', {'members': items})
+
+        self.assertEqual(200, resp.status_int)
+        self.assertEqual(
+            ['updated', 'error', 'error', 'error'],
+            [r['status'] for r in resp.json['results']]
+        )
+        self.assertIn(
+            "version doesn't match",
+            resp.json['results'][2]['error']
+        )
+        self.assertIn(
+            'at most 80 characters',
+            resp.json['results'][3]['error']
+        )
+
+        mock_update_members.assert_called_once_with(
+            [{'name': 'member', 'description': 'new'}]
+        )
+
+        driver.LB_DRIVER().apply_changes.assert_called_once_with()
+
+    @mock.patch.object(db_api, "get_members", MOCK_MEMBERS)
+    @mock.patch.object(db_api, "delete_members")
+    def test_delete_bulk(self, mock_delete_members):
+        resp = self.app.delete('/v1/members/bulk?names=member,missing')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertEqual(
+            [('member', 'deleted'), ('missing', 'error')],
+            [(r['name'], r['status']) for r in resp.json['results']]
+        )
+
+        mock_delete_members.assert_called_once_with(names=['member'])
+
+        lb_driver = driver.LB_DRIVER()
+
+        lb_driver.delete_members.assert_called_once_with([MEMBER_DB])
+        lb_driver.apply_changes.assert_called_once_with()
+
+    def test_delete_bulk_from_db(self):
+        for name in ('member0', 'member1'):
+            db_api.create_member({
+                'name': name,
+                'address': '10.0.0.1',
+                'protocol_port': 80
+            })
+
+        resp = self.app.delete('/v1/members/bulk?names=member0')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertEqual(
+            [{'name': 'member0', 'status': 'deleted'}],
+            resp.json['results']
+        )
+        self.assertEqual(
+            ['member1'],
+            [m.name for m in db_api.get_members()]
+        )
+
+    def test_delete_bulk_without_filters(self):
+        resp = self.app.delete('/v1/members/bulk', expect_errors=True)
+
+        self.assertEqual(400, resp.status_int)
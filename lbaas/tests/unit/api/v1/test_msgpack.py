@@ -0,0 +1,164 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+import msgpack
+
+from lbaas.db.v1 import api as db_api
+from lbaas.drivers import driver
+from lbaas.tests.unit.api import base
+from lbaas.utils import rest_utils
+
+
+def _unpack(resp):
+    return msgpack.unpackb(resp.body, raw=False)
+
+
+class TestMsgPack(base.FunctionalTest):
+    def setUp(self):
+        super(TestMsgPack, self).setUp()
+
+        lb_driver = mock.Mock()
+        lb_driver.create_member.side_effect = lambda member: member
+
+        patcher = mock.patch.object(driver, 'LB_DRIVER', lambda: lb_driver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        db_api.create_listener(
+            {'name': 'listener', 'protocol': 'HTTP', 'protocol_port': 80}
+        )
+
+    def _post(self, url, data, **kwargs):
+        return self.app.post(
+            url,
+            msgpack.packb(data, use_bin_type=True),
+            headers={'Accept': rest_utils.MSGPACK},
+            content_type=rest_utils.MSGPACK,
+            **kwargs
+        )
+
+    def test_member(self):
+        resp = self._post(
+            '/v1/members',
+            {
+                'name': 'member',
+                'address': '10.0.0.1',
+                'protocol_port': 8080,
+                'listener_name': 'listener',
+                'tags': ['web']
+            }
+        )
+
+        self.assertEqual(201, resp.status_int)
+        self.assertEqual(rest_utils.MSGPACK, resp.content_type)
+
+        member = _unpack(resp)
+
+        self.assertEqual('member', member['name'])
+        self.assertEqual(['web'], member['tags'])
+
+        # Both formats have the same schema.
+        resp = self.app.get(
+            '/v1/members/member',
+            headers={'Accept': rest_utils.MSGPACK}
+        )
+
+        self.assertEqual(
+            self.app.get('/v1/members/member').json,
+            _unpack(resp)
+        )
+
+    def test_collections(self):
+        self._post(
+            '/v1/members/bulk',
+            {
+                'members': [
+                    {
+                        'name': 'member%d' % i,
+                        'address': '10.0.0.%d' % i,
+                        'protocol_port': 8080,
+                        'listener_name': 'listener'
+                    }
+                    for i in range(3)
+                ]
+            }
+        )
+
+        for url in ('/v1/members', '/v1/listeners/listener/members'):
+            resp = self.app.get(url, headers={'Accept': rest_utils.MSGPACK})
+
+            self.assertEqual(
+                ['member0', 'member1', 'member2'],
+                [m['name'] for m in _unpack(resp)['members']]
+            )
+
+        resp = self.app.get(
+            '/v1/listeners',
+            headers={'Accept': rest_utils.MSGPACK}
+        )
+
+        self.assertEqual(3, len(_unpack(resp)['listeners'][0]['members']))
+
+    def test_error(self):
+        resp = self._post(
+            '/v1/members',
+            {'name': 'member', 'protocol_port': 'http'},
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+        self.assertIn('protocol_port', _unpack(resp)['faultstring'])
+
+    def test_arguments_map(self):
+        for i in range(2):
+            db_api.create_member({
+                'name': 'member%d' % i,
+                'address': '10.0.0.%d' % i,
+                'protocol_port': 8080,
+                'listener_id': db_api.get_listener('listener').id
+            })
+
+        # Methods without a body argument read a map of arguments.
+        resp = self.app.delete(
+            '/v1/members/bulk',
+            msgpack.packb({'names': 'member0'}, use_bin_type=True),
+            headers={'Accept': rest_utils.MSGPACK},
+            content_type=rest_utils.MSGPACK
+        )
+
+        self.assertEqual(
+            [{'name': 'member0', 'status': 'deleted'}],
+            _unpack(resp)['results']
+        )
+        self.assertEqual(['member1'], [m.name for m in db_api.get_members()])
+
+        resp = self.app.delete(
+            '/v1/members/bulk',
+            msgpack.packb({'ids': 'member1'}, use_bin_type=True),
+            content_type=rest_utils.MSGPACK,
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
+
+    def test_invalid_body(self):
+        resp = self.app.post(
+            '/v1/members',
+            b'\xc1',
+            content_type=rest_utils.MSGPACK,
+            expect_errors=True
+        )
+
+        self.assertEqual(400, resp.status_int)
@@ -0,0 +1,112 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import json
+
+from oslo_config import cfg
+
+from lbaas.db.v1 import api as db_api
+from lbaas.tests.unit.api import base
+from lbaas.utils import rest_utils
+
+
+def _lines(resp):
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+class TestStream(base.FunctionalTest):
+    def setUp(self):
+        super(TestStream, self).setUp()
+
+        cfg.CONF.set_override('stream_batch_size', 2, 'api')
+        self.addCleanup(cfg.CONF.clear_override, 'stream_batch_size', 'api')
+
+        for i in range(2):
+            db_api.create_listener({
+                'name': 'listener%d' % i,
+                'protocol': 'HTTP',
+                'protocol_port': 80
+            })
+
+        listener_id = db_api.get_listener('listener0').id
+
+        for i in range(5):
+            db_api.create_member({
+                'name': 'member%d' % i,
+                'address': '10.0.0.%d' % i,
+                'protocol_port': 8080,
+                'listener_id': listener_id
+            })
+
+    def test_members(self):
+        resp = self.app.get('/v1/members?stream=true&fields=name')
+
+        self.assertEqual(200, resp.status_int)
+        self.assertEqual(rest_utils.NDJSON, resp.content_type)
+        self.assertEqual(
+            ['member%d' % i for i in range(5)],
+            [m['name'] for m in _lines(resp)]
+        )
+
+        resp = self.app.get('/v1/members?stream=true&limit=3')
+
+        self.assertEqual(
+            ['member0', 'member1', 'member2'],
+            [m['name'] for m in _lines(resp)]
+        )
+
+    def test_listeners(self):
+        resp = self.app.get(
+            '/v1/listeners',
+            headers={'Accept': rest_utils.NDJSON}
+        )
+
+        self.assertEqual(200, resp.status_int)
+
+        listeners = _lines(resp)
+
+        self.assertEqual(
+            ['listener0', 'listener1'],
+            [l['name'] for l in listeners]
+        )
+        self.assertEqual(5, len(listeners[0]['members']))
+        self.assertEqual([], listeners[1]['members'])
+
+    def test_json_by_default(self):
+        resp = self.app.get('/v1/listeners/listener0/members')
+
+        self.assertEqual('application/json', resp.content_type)
+        self.assertEqual(5, len(resp.json['members']))
+
+    def test_empty(self):
+        resp = self.app.get(
+            '/v1/members?stream=true&address=10.0.1.1',
+            status=204
+        )
+
+        self.assertEqual('', resp.text)
+
+    def test_error(self):
+        resp = self.app.get(
+            '/v1/members?marker=missing',
+            headers={'Accept': rest_utils.NDJSON},
+            expect_errors=True
+        )
+
+        # The error is a single JSON document.
+        self.assertEqual(400, resp.status_int)
+        self.assertIn(
+            'Marker object not found',
+            _lines(resp)[0]['faultstring']
+        )
@@ -12,9 +12,13 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import os
+import shutil
 import sys
+import tempfile
 import time
 
+import fixtures
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslotest import base
@@ -24,12 +28,74 @@ import testtools.matchers as ttm
 from lbaas import config
 from lbaas.db.sqlalchemy import base as db_sa_base
 from lbaas.db.v1 import api as db_api_v2
+from lbaas.db.v1.sqlalchemy import models
 
 
 LOG = logging.getLogger(__name__)
 CONF = config.CONF
 
 
+class SQLiteFileFixture(fixtures.Fixture):
+    """Makes the DB API use SQLite database files in a temp directory.
+
+    Unlike the in-memory database of DbTestCase, files are opened with
+    the connection settings applied to them in production.
+
+    :param slave: Use another file as [database]/slave_connection.
+    :param create_tables: Create the tables in the databases.
+    """
+
+    def __init__(self, slave=False, create_tables=True):
+        super(SQLiteFileFixture, self).__init__()
+
+        self.slave = slave
+        self.create_tables = create_tables
+
+    def _setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+
+        self.addCleanup(shutil.rmtree, tmp_dir)
+
+        default_facade = db_sa_base._facade
+
+        def _restore():
+            db_sa_base.dispose_engine()
+            db_sa_base._facade = default_facade
+            db_sa_base._last_write_time = 0
+            db_sa_base.set_write_time(None)
+
+        self._set_connection('connection', tmp_dir, 'lbaas.sqlite')
+
+        if self.slave:
+            self._set_connection('slave_connection', tmp_dir, 'slave.sqlite')
+
+        # Run before the overrides are cleared, so that the slave engine
+        # is disposed too.
+        self.addCleanup(_restore)
+
+        db_sa_base._facade = None
+        db_sa_base._last_write_time = 0
+
+        self.engine = db_sa_base.get_engine()
+
+        if self.create_tables:
+            models.Listener.metadata.create_all(self.engine)
+
+            if self.slave:
+                models.Listener.metadata.create_all(
+                    db_sa_base._get_facade().get_engine(use_slave=True)
+                )
+
+    def _set_connection(self, name, tmp_dir, file_name):
+        cfg.CONF.set_override(
+            name,
+            'sqlite:///%s' % os.path.join(tmp_dir, file_name),
+            group='database'
+        )
+
+        self.addCleanup(cfg.CONF.clear_override, name, 'database')
+
+
 class BaseTest(base.BaseTestCase):
     def assertListEqual(self, l1, l2):
         if tuple(sys.version_info)[0:2] < (2, 7):
@@ -167,6 +233,8 @@ class DbTestCase(BaseTest):
     def _clean_db(self):
         with db_api_v2.transaction():
             db_api_v2.delete_members()
+            db_api_v2.delete_certificates()
+            db_api_v2.delete_l7policies()
             db_api_v2.delete_listeners()
 
         if not cfg.CONF.database.connection.startswith('sqlite'):
@@ -177,6 +245,8 @@ class DbTestCase(BaseTest):
 
         self.__heavy_init()
 
+        db_api_v2.invalidate_cache()
+
         self.addCleanup(self._clean_db)
 
     def is_db_session_open(self):
@@ -0,0 +1,144 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from oslo_config import cfg
+
+from lbaas.db.sqlalchemy import base as db_sa_base
+from lbaas.db.v1 import api as db_api
+from lbaas.db.v1.sqlalchemy import models
+from lbaas.tests.unit import base
+
+
+LISTENER = {
+    'name': 'listener1',
+    'protocol': 'HTTP',
+    'protocol_port': 80,
+}
+
+
+class CacheTest(base.DbTestCase):
+    def setUp(self):
+        super(CacheTest, self).setUp()
+
+        self.override_config('revision_check_interval', 60, group='cache')
+
+        db_api.create_listener(LISTENER)
+
+        self.stats = db_api.get_cache_stats()
+
+    def override_config(self, name, value, group):
+        cfg.CONF.set_override(name, value, group=group)
+
+        self.addCleanup(cfg.CONF.clear_override, name, group)
+
+    def _stats_delta(self):
+        stats = db_api.get_cache_stats()
+
+        return dict((k, stats[k] - self.stats[k]) for k in ('hits', 'misses'))
+
+    def test_hit(self):
+        listener = db_api.get_listener('listener1')
+
+        self.assertIs(listener, db_api.get_listener('listener1'))
+        self.assertEqual({'hits': 1, 'misses': 1}, self._stats_delta())
+
+    def test_list_copied(self):
+        db_api.get_listeners().append(None)
+
+        self.assertEqual(1, len(db_api.get_listeners()))
+
+    def test_local_write_invalidates(self):
+        db_api.get_listener('listener1')
+
+        db_api.update_listener('listener1', {'protocol_port': 8080})
+
+        self.assertEqual(8080, db_api.get_listener('listener1').protocol_port)
+
+    def test_remote_write_invalidates(self):
+        db_api.get_listener('listener1')
+
+        table = models.Listener.__table__
+        revisions = models.Revision.__table__
+
+        # Another API node changes the data.
+        with db_sa_base.get_engine().begin() as conn:
+            conn.execute(
+                table.update().values(protocol_port=8080)
+            )
+            conn.execute(
+                revisions.update().values(revision=revisions.c.revision + 1)
+            )
+
+        self.assertEqual(80, db_api.get_listener('listener1').protocol_port)
+
+        self.override_config('revision_check_interval', 0, group='cache')
+
+        self.assertEqual(8080, db_api.get_listener('listener1').protocol_port)
+
+    def test_transaction_bypasses_cache(self):
+        listener = db_api.get_listener('listener1')
+
+        with db_api.transaction():
+            self.assertIsNot(listener, db_api.get_listener('listener1'))
+
+        self.assertEqual({'hits': 0, 'misses': 1}, self._stats_delta())
+
+    def test_lru_eviction(self):
+        self.override_config('size', 1, group='cache')
+
+        db_api.get_listener('listener1')
+        db_api.load_listener('listener1')
+        db_api.get_listener('listener1')
+
+        self.assertEqual({'hits': 0, 'misses': 3}, self._stats_delta())
+
+    def test_ttl(self):
+        self.override_config('ttl', 0, group='cache')
+
+        db_api.get_listener('listener1')
+        db_api.get_listener('listener1')
+
+        self.assertEqual({'hits': 0, 'misses': 2}, self._stats_delta())
+
+    def test_disabled(self):
+        self.override_config('enabled', False, group='cache')
+
+        db_api.get_listener('listener1')
+        db_api.get_listener('listener1')
+
+        self.assertEqual({'hits': 0, 'misses': 0}, self._stats_delta())
+
+
+class RevisionTest(base.DbTestCase):
+    def test_revision_incremented_once_per_transaction(self):
+        revision = db_api.get_revision()
+
+        with db_api.transaction():
+            db_api.create_listener(LISTENER)
+            db_api.update_listener('listener1', {'protocol_port': 8080})
+
+        self.assertEqual(revision + 1, db_api.get_revision())
+
+        db_api.delete_listener('listener1')
+
+        self.assertEqual(revision + 2, db_api.get_revision())
+
+    def test_rollback_keeps_revision(self):
+        revision = db_api.get_revision()
+
+        with db_api.transaction():
+            db_api.create_listener(LISTENER)
+            db_api.rollback_tx()
+
+        self.assertEqual(revision, db_api.get_revision())
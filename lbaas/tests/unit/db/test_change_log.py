@@ -0,0 +1,153 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+
+from oslo_config import cfg
+
+from lbaas.db.sqlalchemy import base as db_sa_base
+from lbaas.db.v1 import api as db_api
+from lbaas.db.v1.sqlalchemy import api as sql_db_api
+from lbaas.db.v1.sqlalchemy import models
+from lbaas import exceptions as exc
+from lbaas.tests.unit import base
+
+
+def _listener(name):
+    return {'name': name, 'protocol': 'HTTP', 'protocol_port': 80}
+
+
+def _member(name, **values):
+    return dict(
+        values,
+        name=name,
+        address='10.0.0.1',
+        protocol_port=8080
+    )
+
+
+class ChangeLogTest(base.DbTestCase):
+    def setUp(self):
+        super(ChangeLogTest, self).setUp()
+
+        self.since = db_api.get_revision()
+
+    def _changes(self):
+        return [
+            (c.resource, c.name, c.action)
+            for c in db_api.get_changes(self.since)
+        ]
+
+    def _force_pruning(self):
+        pruned_at = sql_db_api._change_log_pruned_at
+
+        def _restore():
+            sql_db_api._change_log_pruned_at = pruned_at
+
+        self.addCleanup(_restore)
+
+        sql_db_api._change_log_pruned_at = 0
+
+    def test_create_update_delete(self):
+        db_api.create_listener(_listener('listener1'))
+        db_api.update_listener('listener1', {'protocol_port': 8080})
+        db_api.delete_listener('listener1')
+
+        self.assertEqual(
+            [
+                ('listener', 'listener1', 'created'),
+                ('listener', 'listener1', 'updated'),
+                ('listener', 'listener1', 'deleted'),
+            ],
+            self._changes()
+        )
+        self.assertEqual(
+            [self.since + 1, self.since + 2, self.since + 3],
+            [c.revision for c in db_api.get_changes(self.since)]
+        )
+
+    def test_changes_merged_in_transaction(self):
+        db_api.create_member(_member('member1'))
+
+        with db_api.transaction():
+            db_api.create_member(_member('member2'))
+            db_api.update_member('member2', {'protocol_port': 80})
+            db_api.update_member('member1', {'protocol_port': 80})
+            db_api.delete_member('member1')
+
+        self.assertEqual(
+            [
+                ('member', 'member1', 'created'),
+                ('member', 'member1', 'deleted'),
+                ('member', 'member2', 'created'),
+            ],
+            sorted(self._changes())
+        )
+
+    def test_unchanged_object_not_logged(self):
+        db_api.create_member(_member('member1'))
+        db_api.update_member('member1', {'protocol_port': 8080})
+
+        self.assertEqual([('member', 'member1', 'created')], self._changes())
+
+    def test_bulk_changes(self):
+        db_api.create_or_update_members(
+            [_member('member1'), _member('member2')]
+        )
+        db_api.create_or_update_members(
+            [_member('member2', protocol_port=80)]
+        )
+        db_api.delete_members(names=['member1'])
+
+        self.assertEqual(
+            [
+                ('member', 'member1', 'created'),
+                ('member', 'member2', 'created'),
+                ('member', 'member2', 'updated'),
+                ('member', 'member1', 'deleted'),
+            ],
+            self._changes()
+        )
+
+    def test_pruning(self):
+        cfg.CONF.set_override('retention', 60, group='changes')
+
+        self.addCleanup(cfg.CONF.clear_override, 'retention', 'changes')
+
+        db_api.create_listener(_listener('listener1'))
+
+        with db_sa_base.get_engine().begin() as conn:
+            conn.execute(
+                models.Change.__table__.update().values(
+                    created_at=datetime.datetime(2016, 1, 1)
+                )
+            )
+
+        self._force_pruning()
+
+        db_api.create_listener(_listener('listener2'))
+
+        self.assertRaises(
+            exc.ChangesExpiredException,
+            db_api.get_changes,
+            self.since
+        )
+
+        self.assertEqual(
+            [('listener', 'listener2', 'created')],
+            [
+                (c.resource, c.name, c.action)
+                for c in db_api.get_changes(self.since + 1)
+            ]
+        )
@@ -0,0 +1,74 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import sqlalchemy as sa
+
+from lbaas.db.sqlalchemy import migration
+from lbaas.db.v1 import api as db_api
+from lbaas import exceptions as exc
+from lbaas.tests.unit import base
+
+
+class CheckDbTest(base.BaseTest):
+    def setUp(self):
+        super(CheckDbTest, self).setUp()
+
+        self.engine = self.useFixture(
+            base.SQLiteFileFixture(create_tables=False)
+        ).engine
+
+    def _get_revision(self):
+        return migration.get_current_revision(self.engine)
+
+    def test_empty(self):
+        self.assertIsNone(self._get_revision())
+
+        self.assertRaisesRegex(
+            exc.DBException,
+            'Database is empty',
+            db_api.check_db
+        )
+
+        db_api.check_db(auto_create=True)
+
+        self.assertEqual(migration.get_head_revision(), self._get_revision())
+        self.assertTrue(migration.has_table(self.engine, 'listeners_v1'))
+
+        db_api.check_db()
+
+    def test_outdated(self):
+        db_api.check_db(auto_create=True)
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                sa.text("UPDATE alembic_version SET version_num = '012'")
+            )
+
+        # Tables are never created over an older schema.
+        self.assertRaisesRegex(
+            exc.DBException,
+            'at revision 012 instead of',
+            db_api.check_db,
+            auto_create=True
+        )
+
+    def test_without_revision(self):
+        db_api.setup_db()
+
+        self.assertRaisesRegex(
+            exc.DBException,
+            'has no revision',
+            db_api.check_db,
+            auto_create=True
+        )
@@ -0,0 +1,104 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import time
+
+from oslo_config import cfg
+
+from lbaas.db.sqlalchemy import base as db_sa_base
+from lbaas.db.v1 import api as db_api
+from lbaas.tests.unit import base
+
+
+LISTENER = {
+    'name': 'listener1',
+    'protocol': 'HTTP',
+    'protocol_port': 80,
+}
+
+
+class ReadReplicaTest(base.BaseTest):
+    """Primary and slave databases are two independent SQLite files.
+
+    Nothing is replicated between them, so a read shows which database
+    it was routed to.
+    """
+
+    def setUp(self):
+        super(ReadReplicaTest, self).setUp()
+
+        self.useFixture(base.SQLiteFileFixture(slave=True))
+
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'primary_read_window',
+            'lbaas'
+        )
+
+        # Cached results would hide which database a read went to.
+        cfg.CONF.set_override('enabled', False, group='cache')
+
+        self.addCleanup(cfg.CONF.clear_override, 'enabled', 'cache')
+
+    def test_reads_go_to_slave(self):
+        db_api.create_listener(LISTENER)
+
+        self.assertEqual([], db_api.get_listeners())
+        self.assertIsNone(db_api.load_listener(LISTENER['name']))
+
+    def test_reads_in_transaction_go_to_primary(self):
+        with db_api.transaction():
+            db_api.create_listener(LISTENER)
+
+            self.assertEqual(1, len(db_api.get_listeners()))
+
+    def test_read_your_writes_window(self):
+        cfg.CONF.set_override('primary_read_window', 60, group='lbaas')
+
+        self.assertEqual([], db_api.get_listeners())
+
+        db_api.create_listener(LISTENER)
+
+        self.assertEqual(1, len(db_api.get_listeners()))
+
+        db_sa_base._last_write_time -= 60
+        db_api.set_write_time(db_api.get_write_time() - 60)
+
+        self.assertEqual([], db_api.get_listeners())
+
+    def test_write_time_of_client(self):
+        cfg.CONF.set_override('primary_read_window', 60, group='lbaas')
+
+        db_api.create_listener(LISTENER)
+
+        self.assertIsNotNone(db_api.get_write_time())
+
+        # The next request of the client is served by another process.
+        db_sa_base._last_write_time = 0
+        db_api.set_write_time(None)
+
+        self.assertEqual([], db_api.get_listeners())
+
+        db_api.set_write_time(time.time() - 1)
+
+        self.assertEqual(1, len(db_api.get_listeners()))
+
+    def test_revisions_read_from_primary(self):
+        db_api.create_listener(LISTENER)
+
+        self.assertEqual([], db_api.get_listeners())
+
+        self.assertEqual(1, db_api.get_revision())
+        self.assertEqual(1, db_api.get_listener_version(LISTENER['name']))
+        self.assertEqual(1, len(db_api.get_changes(0)))
@@ -0,0 +1,99 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import eventlet
+from eventlet import event
+
+from lbaas.db.sqlalchemy import base as db_sa_base
+from lbaas.db.v1 import api as db_api
+from lbaas.tests.unit import base
+
+
+class SQLiteFileTest(base.BaseTest):
+    def setUp(self):
+        super(SQLiteFileTest, self).setUp()
+
+        self.useFixture(base.SQLiteFileFixture())
+
+    def _pragma(self, name):
+        with db_sa_base.get_engine().connect() as conn:
+            return conn.execute('PRAGMA %s' % name).scalar()
+
+    def test_pragmas(self):
+        self.assertEqual('wal', self._pragma('journal_mode'))
+        # NORMAL.
+        self.assertEqual(1, self._pragma('synchronous'))
+        self.assertEqual(5000, self._pragma('busy_timeout'))
+        self.assertEqual(-65536, self._pragma('cache_size'))
+
+    def test_writes_are_serialized(self):
+        lock = db_sa_base._writer_lock()
+
+        self.assertFalse(lock.locked())
+
+        with db_api.transaction():
+            self.assertTrue(lock.locked())
+
+            db_api.create_listener({'name': 'listener1'})
+
+        self.assertFalse(lock.locked())
+
+        # Reads neither take the lock nor wait for it.
+        lock.acquire()
+
+        try:
+            self.assertEqual(1, len(db_api.get_listeners()))
+        finally:
+            lock.release()
+
+    def test_concurrent_writers(self):
+        active = []
+        overlaps = []
+        committed = event.Event()
+        applied = event.Event()
+
+        def _write(i):
+            with db_api.transaction():
+                active.append(i)
+                overlaps.append(len(active))
+
+                db_api.create_listener({'name': 'listener%d' % i})
+
+                # Other writers get to run, they must wait for this one.
+                eventlet.sleep(0)
+
+                active.remove(i)
+
+        def _write_and_apply():
+            _write(0)
+
+            # The lock is released on commit, so other writers go on
+            # while the changes are applied, e.g. the balancer restarts.
+            committed.send()
+            applied.wait()
+
+        first = eventlet.spawn(_write_and_apply)
+        others = [eventlet.spawn(_write, i) for i in range(1, 5)]
+
+        with eventlet.Timeout(10):
+            committed.wait()
+
+            for thread in others:
+                thread.wait()
+
+            applied.send()
+            first.wait()
+
+        self.assertEqual([1] * 5, overlaps)
+        self.assertEqual(5, len(db_api.get_listeners()))
@@ -0,0 +1,120 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+from oslo_serialization import jsonutils
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from sqlalchemy import schema
+
+from lbaas.db.sqlalchemy import types
+from lbaas.db.v1 import api as db_api
+from lbaas.db.v1.sqlalchemy import models
+from lbaas.tests.unit import base
+
+
+class JsonTypesTest(base.DbTestCase):
+    def setUp(self):
+        super(JsonTypesTest, self).setUp()
+
+        self.addCleanup(types.set_json_codec, types._json_dumps,
+                        types._json_loads)
+
+        self.dumps = mock.Mock(side_effect=jsonutils.dumps)
+
+        types.set_json_codec(self.dumps, jsonutils.loads)
+
+    def _create_table_sql(self, dialect):
+        return str(
+            schema.CreateTable(models.Listener.__table__).compile(
+                dialect=dialect
+            )
+        )
+
+    def test_native_json_columns(self):
+        self.assertIn('options JSONB', self._create_table_sql(
+            postgresql.dialect()
+        ))
+        self.assertIn('options TEXT', self._create_table_sql(
+            mysql.dialect()
+        ))
+        self.assertIn('options TEXT', self._create_table_sql(
+            sqlite.dialect()
+        ))
+
+    def test_json_codec(self):
+        db_api.create_listener({
+            'name': 'listener',
+            'protocol': 'http',
+            'protocol_port': 80,
+            'options': {'mode': 'http'}
+        })
+
+        self.dumps.assert_any_call({'mode': 'http'})
+
+        self.assertEqual(
+            {'mode': 'http'},
+            db_api.get_listener('listener').options
+        )
+
+    def test_unchanged_value_not_encoded(self):
+        dialect = sqlite.dialect()
+        json_type = types.JsonEncoded()
+
+        value = json_type.process_result_value('{"mode": "http"}', dialect)
+
+        self.assertIsInstance(value, types.MutableDict)
+        self.assertEqual(
+            '{"mode": "http"}',
+            json_type.process_bind_param(value, dialect)
+        )
+        self.assertFalse(self.dumps.called)
+
+        value['mode'] = 'tcp'
+
+        self.assertEqual(
+            '{"mode": "tcp"}',
+            json_type.process_bind_param(value, dialect)
+        )
+        self.assertTrue(self.dumps.called)
+
+    def test_changed_in_place_encoded(self):
+        db_api.create_listener({
+            'name': 'listener',
+            'protocol': 'http',
+            'protocol_port': 80,
+            'options': {'mode': 'http'}
+        })
+
+        self.dumps.reset_mock()
+
+        with db_api.transaction():
+            listener = db_api.get_listener('listener')
+
+            listener.options.update(mode='tcp')
+
+        self.dumps.assert_called_once_with({'mode': 'tcp'})
+        self.assertEqual(
+            {'mode': 'tcp'},
+            db_api.get_listener('listener').options
+        )
+
+    def test_load_json_codec_auto(self):
+        with mock.patch.object(types.importutils, 'try_import',
+                               return_value=None):
+            types.load_json_codec('auto')
+
+        self.assertIs(jsonutils.dumps, types._json_dumps)
+        self.assertIs(jsonutils.loads, types._json_loads)
@@ -0,0 +1,73 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+
+from lbaas.db.sqlalchemy import upsert
+from lbaas.db.v1.sqlalchemy import models
+from lbaas.tests.unit import base
+
+
+class UpsertTest(base.BaseTest):
+    def _compile(self, dialect, update_columns=('description',)):
+        stmt = upsert.Upsert(
+            models.Listener.__table__,
+            ['name'],
+            list(update_columns),
+            touch_column='updated_at'
+        ).values(name='l1', description='d')
+
+        return str(stmt.compile(dialect=dialect))
+
+    def test_postgresql(self):
+        sql = self._compile(postgresql.dialect())
+
+        self.assertIn('INSERT INTO listeners_v1', sql)
+        self.assertIn(
+            "ON CONFLICT (name) DO UPDATE SET description = "
+            "excluded.description, updated_at = timezone('utc', now())",
+            sql
+        )
+
+    def test_sqlite(self):
+        sql = self._compile(sqlite.dialect())
+
+        self.assertIn(
+            'ON CONFLICT (name) DO UPDATE SET description = '
+            'excluded.description, updated_at = CURRENT_TIMESTAMP',
+            sql
+        )
+
+    def test_mysql(self):
+        sql = self._compile(mysql.dialect())
+
+        self.assertIn(
+            'ON DUPLICATE KEY UPDATE description = VALUES(description), '
+            'updated_at = UTC_TIMESTAMP()',
+            sql
+        )
+
+    def test_is_supported(self):
+        self.assertTrue(upsert.is_supported(mysql.dialect()))
+
+        dialect = postgresql.dialect()
+        dialect.server_version_info = (9, 4)
+
+        self.assertFalse(upsert.is_supported(dialect))
+
+        dialect.server_version_info = (9, 5)
+
+        self.assertTrue(upsert.is_supported(dialect))
@@ -12,7 +12,15 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import datetime
+
+import mock
+import sqlalchemy as sa
+
+from lbaas.db.sqlalchemy import base as b
+from lbaas.db.sqlalchemy import upsert
 from lbaas.db.v1.sqlalchemy import api as db_api
+from lbaas.db.v1.sqlalchemy import models
 from lbaas import exceptions as exc
 from lbaas.tests.unit import base as test_base
 
@@ -68,6 +76,60 @@ class MemberTest(test_base.DbTestCase):
         self.assertEqual(updated, fetched)
         self.assertIsNotNone(fetched.updated_at)
 
+    def test_update_member_version(self):
+        created = db_api.create_member(MEMBERS[0])
+
+        self.assertEqual(1, created.version)
+
+        updated = db_api.update_member(
+            created.name,
+            {'description': 'my new description', 'version': 5},
+            version=1
+        )
+
+        self.assertEqual(2, updated.version)
+        self.assertEqual(2, db_api.get_member_version(created.name))
+
+        self.assertRaises(
+            exc.PreconditionFailedException,
+            db_api.update_member,
+            created.name,
+            {'description': 'stale'},
+            version=1
+        )
+
+        db_api.create_or_update_member(created.name, {'description': 'x'})
+
+        self.assertEqual(3, db_api.get_member_version(created.name))
+        self.assertIsNone(db_api.get_member_version('not-existing'))
+
+    def test_update_member_concurrently(self):
+        created = db_api.create_member(MEMBERS[0])
+
+        def _update_concurrently(member, version):
+            # Updates the row behind the back of the ORM, like another
+            # transaction would between the read and the write.
+            b._get_thread_local_session().execute(
+                models.Member.__table__.update().values(version=2)
+            )
+
+        with mock.patch.object(db_api, '_check_version',
+                               side_effect=_update_concurrently):
+            self.assertRaises(
+                exc.ConflictException,
+                db_api.update_member,
+                created.name,
+                {'description': 'my new description'}
+            )
+
+            self.assertRaises(
+                exc.PreconditionFailedException,
+                db_api.update_member,
+                created.name,
+                {'description': 'my new description'},
+                version=2
+            )
+
     def test_create_or_update_member(self):
         name = MEMBERS[0]['name']
 
@@ -96,6 +158,28 @@ class MemberTest(test_base.DbTestCase):
 
         self.assertEqual(updated, fetched)
 
+    def test_create_or_update_members_moved(self):
+        listener1 = db_api.create_listener(LISTENERS[0])
+        listener2 = db_api.create_listener(LISTENERS[1])
+
+        db_api.create_member(dict(MEMBERS[0], listener_id=listener1.id))
+
+        revisions = [
+            db_api.get_listener_revision(l.name)[1]
+            for l in (listener1, listener2)
+        ]
+
+        db_api.create_or_update_members([
+            {'name': MEMBERS[0]['name'], 'listener_id': listener2.id}
+        ])
+
+        # Both the listener it left and the one it joined changed.
+        for listener, revision in zip((listener1, listener2), revisions):
+            self.assertGreater(
+                db_api.get_listener_revision(listener.name)[1],
+                revision
+            )
+
     def test_get_members(self):
         created0 = db_api.create_member(MEMBERS[0])
         created1 = db_api.create_member(MEMBERS[1])
@@ -106,6 +190,117 @@ class MemberTest(test_base.DbTestCase):
         self.assertEqual(created0, fetched[0])
         self.assertEqual(created1, fetched[1])
 
+    def test_get_members_filtered(self):
+        created0 = db_api.create_member(MEMBERS[0])
+        created1 = db_api.create_member(MEMBERS[1])
+
+        fetched = db_api.get_members(address='10.0.0.2', protocol_port=80)
+
+        self.assertEqual([created1], fetched)
+
+        fetched = db_api.get_members(
+            fields=['name'],
+            address='10.0.0.1'
+        )
+
+        self.assertEqual([(created0.name,)], [tuple(r) for r in fetched])
+
+        fetched = db_api.get_members(created_since=created1.created_at)
+
+        self.assertIn(created1, fetched)
+
+        fetched = db_api.get_members(
+            created_since=created1.created_at + datetime.timedelta(days=1)
+        )
+
+        self.assertEqual([], fetched)
+
+    def test_get_member_rows(self):
+        created0 = db_api.create_member(MEMBERS[0])
+        created1 = db_api.create_member(MEMBERS[1])
+
+        fetched = db_api.get_member_rows(['id', 'tags', 'created_at'])
+
+        self.assertEqual(
+            [
+                (created0.id, ['mc'], created0.created_at),
+                (created1.id, ['mc'], created1.created_at)
+            ],
+            [tuple(r) for r in fetched]
+        )
+
+        fetched = db_api.get_member_rows(
+            ['name'],
+            limit=1,
+            marker=created0.id,
+            tags=['mc'],
+            address='10.0.0.2'
+        )
+
+        self.assertEqual([(created1.name,)], [tuple(r) for r in fetched])
+
+    def test_get_members_by_tags(self):
+        created0 = db_api.create_member(MEMBERS[0])
+        created1 = db_api.create_member(MEMBERS[1])
+
+        db_api.update_member(created1.name, {'tags': ['mc', 'canary']})
+
+        def _names(**kwargs):
+            return [m.name for m in db_api.get_members(**kwargs)]
+
+        self.assertEqual([created0.name, created1.name], _names(tags=['mc']))
+        self.assertEqual([created1.name], _names(tags=['mc', 'canary']))
+        self.assertEqual([created1.name], _names(tags_any=['canary', 'x']))
+        self.assertEqual([], _names(tags=['canary', 'x']))
+
+        db_api.update_member(created1.name, {'tags': []})
+
+        self.assertEqual([], _names(tags_any=['canary']))
+
+        db_api.delete_member(created0.name)
+
+        self.assertEqual([], _names(tags=['mc']))
+
+    def test_create_update_delete_members(self):
+        created = db_api.create_members(MEMBERS)
+
+        self.assertEqual(
+            ['my_member1', 'my_member2'],
+            [m.name for m in db_api.get_members(tags=['mc'])]
+        )
+
+        updated = db_api.update_members([
+            {'name': 'my_member2', 'tags': ['canary']},
+            {'name': 'my_member1', 'description': 'new'},
+        ])
+
+        self.assertEqual([created[1].id, created[0].id],
+                         [m.id for m in updated])
+        self.assertEqual('new', db_api.get_member('my_member1').description)
+        self.assertEqual(
+            ['my_member2'],
+            [m.name for m in db_api.get_members(tags=['canary'])]
+        )
+
+        self.assertRaises(
+            exc.NotFoundException,
+            db_api.update_members,
+            [{'name': 'not-existing'}]
+        )
+
+        self.assertEqual(1, db_api.delete_members(tags=['canary']))
+        self.assertEqual(
+            ['my_member1'],
+            [m.name for m in db_api.get_members()]
+        )
+        self.assertEqual(0, db_api.delete_members(names=['my_member2']))
+
+        self.assertRaises(
+            exc.DBDuplicateEntryException,
+            db_api.create_members,
+            [MEMBERS[0]]
+        )
+
     def test_delete_member(self):
         created = db_api.create_member(MEMBERS[0])
 
@@ -207,6 +402,71 @@ class ListenerTest(test_base.DbTestCase):
 
         self.assertEqual(updated, fetched)
 
+    def test_create_or_update_listeners(self):
+        created = db_api.create_listener(LISTENERS[0])
+
+        fetched = db_api.create_or_update_listeners([
+            {'name': LISTENERS[0]['name'], 'description': 'my new desc'},
+            LISTENERS[1],
+        ])
+
+        self.assertEqual(
+            [LISTENERS[0]['name'], LISTENERS[1]['name']],
+            [l.name for l in fetched]
+        )
+        self.assertEqual(created.id, fetched[0].id)
+        self.assertEqual('my new desc', fetched[0].description)
+        self.assertEqual(
+            LISTENERS[0]['protocol_port'],
+            fetched[0].protocol_port
+        )
+        self.assertIsNotNone(fetched[0].updated_at)
+        self.assertIsNone(fetched[1].updated_at)
+
+    def test_create_or_update_listeners_single_read(self):
+        db_api.create_listener(LISTENERS[0])
+
+        selects = []
+
+        def _before_execute(conn, cursor, statement, *args):
+            # Listener revisions are bumped by id on commit.
+            if (statement.startswith('SELECT')
+                    and 'listeners_v1.name IN' in statement):
+                selects.append(statement)
+
+        engine = b.get_engine()
+
+        sa.event.listen(engine, 'before_cursor_execute', _before_execute)
+        self.addCleanup(
+            sa.event.remove,
+            engine,
+            'before_cursor_execute',
+            _before_execute
+        )
+
+        fetched = db_api.create_or_update_listeners([
+            {'name': LISTENERS[0]['name'], 'description': 'my new desc'},
+            LISTENERS[1],
+        ])
+
+        # Only the objects are read back, created ones are told apart
+        # by their version.
+        self.assertEqual(1, len(selects))
+        self.assertEqual([2, 1], [l.version for l in fetched])
+
+    @mock.patch.object(upsert, 'is_supported', mock.Mock(return_value=False))
+    def test_create_or_update_listeners_fallback(self):
+        created = db_api.create_listener(LISTENERS[0])
+
+        fetched = db_api.create_or_update_listeners([
+            {'name': LISTENERS[0]['name'], 'description': 'my new desc'},
+            LISTENERS[1],
+        ])
+
+        self.assertEqual(created.id, fetched[0].id)
+        self.assertEqual('my new desc', fetched[0].description)
+        self.assertEqual(2, len(db_api.get_listeners()))
+
     def test_get_listeners(self):
         created0 = db_api.create_listener(LISTENERS[0])
         created1 = db_api.create_listener(LISTENERS[1])
@@ -217,6 +477,94 @@ class ListenerTest(test_base.DbTestCase):
         self.assertEqual(created0, fetched[0])
         self.assertEqual(created1, fetched[1])
 
+    def test_get_listeners_paginated(self):
+        created0 = db_api.create_listener(LISTENERS[0])
+        created1 = db_api.create_listener(LISTENERS[1])
+
+        fetched = db_api.get_listeners(limit=1)
+
+        self.assertEqual([created0], fetched)
+
+        fetched = db_api.get_listeners(limit=1, marker=created0.id)
+
+        self.assertEqual([created1], fetched)
+
+        fetched = db_api.get_listeners(limit=1, marker=created1.id)
+
+        self.assertEqual([], fetched)
+
+    def test_get_listeners_sorted(self):
+        created0 = db_api.create_listener(LISTENERS[0])
+        created1 = db_api.create_listener(LISTENERS[1])
+
+        fetched = db_api.get_listeners(sort_keys=['name'], sort_dirs=['desc'])
+
+        self.assertEqual([created1, created0], fetched)
+
+        fetched = db_api.get_listeners(
+            limit=1,
+            marker=created1.id,
+            sort_keys=['name'],
+            sort_dirs=['desc']
+        )
+
+        self.assertEqual([created0], fetched)
+
+    def test_get_listeners_fields(self):
+        created = db_api.create_listener(LISTENERS[0])
+
+        fetched = db_api.get_listeners(fields=['id', 'name', 'created_at'])
+
+        self.assertEqual(1, len(fetched))
+        self.assertEqual(
+            (created.id, created.name, created.created_at),
+            tuple(fetched[0])
+        )
+
+    def test_get_listener_rows(self):
+        created0 = db_api.create_listener(LISTENERS[0])
+        created1 = db_api.create_listener(LISTENERS[1])
+
+        fetched = db_api.get_listener_rows(
+            ['id', 'name'],
+            sort_keys=['name'],
+            sort_dirs=['desc']
+        )
+
+        self.assertEqual(
+            [(created1.id, created1.name), (created0.id, created0.name)],
+            [tuple(r) for r in fetched]
+        )
+
+        db_api.create_member(dict(MEMBERS[1], listener_id=created0.id))
+        db_api.create_member(dict(MEMBERS[0], listener_id=created0.id))
+
+        fetched = db_api.get_listener_member_rows(
+            [created0.id, created1.id],
+            ['name', 'tags']
+        )
+
+        self.assertEqual(
+            {
+                created0.id: [('my_member1', ['mc']), ('my_member2', ['mc'])],
+                created1.id: []
+            },
+            dict((k, [tuple(r) for r in v]) for k, v in fetched.items())
+        )
+        self.assertEqual({}, db_api.get_listener_member_rows([], ['name']))
+
+    def test_get_listeners_invalid_query(self):
+        self.assertRaises(
+            exc.DBQueryEntryException,
+            db_api.get_listeners,
+            sort_keys=['not-a-column']
+        )
+        self.assertRaises(
+            exc.DBQueryEntryException,
+            db_api.get_listeners,
+            marker='not-existing-id'
+        )
+
     def test_delete_listener(self):
         created = db_api.create_listener(LISTENERS[0])
 
@@ -240,6 +588,61 @@ class ListenerTest(test_base.DbTestCase):
         self.assertIn("'name': 'listener1'", s)
 
 
+CERTIFICATES = [
+    {
+        'name': 'cert1',
+        'description': 'Test certificate #1',
+        'content': '-----BEGIN CERTIFICATE-----\n1',
+        'sni': ['www.example.com'],
+    },
+    {
+        'name': 'cert2',
+        'description': 'Test certificate #2',
+        'content': '-----BEGIN CERTIFICATE-----\n1',
+    },
+]
+
+
+class CertificateTest(test_base.DbTestCase):
+    def test_create_and_get_and_load_certificate(self):
+        created = db_api.create_certificate(CERTIFICATES[0])
+
+        fetched = db_api.get_certificate(created.name)
+
+        self.assertEqual(created, fetched)
+
+        fetched = db_api.load_certificate(created.name)
+
+        self.assertEqual(created, fetched)
+
+        self.assertIsNone(db_api.load_certificate("not-existing-cert"))
+
+    def test_fingerprint_depends_on_content(self):
+        created0 = db_api.create_certificate(CERTIFICATES[0])
+        created1 = db_api.create_certificate(CERTIFICATES[1])
+
+        self.assertEqual(64, len(created0.fingerprint))
+        self.assertEqual(created0.fingerprint, created1.fingerprint)
+
+        updated = db_api.update_certificate(
+            created1.name,
+            {'content': '-----BEGIN CERTIFICATE-----\n2'}
+        )
+
+        self.assertNotEqual(created0.fingerprint, updated.fingerprint)
+
+    def test_delete_certificate(self):
+        created = db_api.create_certificate(CERTIFICATES[0])
+
+        db_api.delete_certificate(created.name)
+
+        self.assertRaises(
+            exc.NotFoundException,
+            db_api.get_certificate,
+            created.name
+        )
+
+
 class TXTest(test_base.DbTestCase):
     def test_rollback(self):
         db_api.start_tx()
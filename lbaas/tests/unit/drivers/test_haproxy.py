@@ -12,6 +12,10 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import os
+import shutil
+import tempfile
+
 import mock
 
 from lbaas.db.v1.sqlalchemy import api as db_api
@@ -292,3 +296,623 @@ class HAProxyDriverTest(test_base.DbTestCase):
             db_api.get_member,
             member.name
         )
+
+
+class HAProxyCertificatesTest(test_base.DbTestCase):
+    def setUp(self):
+        super(HAProxyCertificatesTest, self).setUp()
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+
+        self.haproxy = driver.HAProxyDriver()
+        self.haproxy.config_file = os.path.join(tmp_dir, 'haproxy.cfg')
+        self.haproxy.certs_dir = os.path.join(tmp_dir, 'certs')
+
+        self.listener = db_api.create_listener({
+            'name': 'test_listener',
+            'protocol': 'http',
+            'protocol_port': 443,
+            'address': '',
+            'algorithm': 'roundrobin'
+        })
+
+    def _create_certificate(self, name, content, listener=None):
+        return db_api.create_certificate({
+            'name': name,
+            'content': content,
+            'sni': ['%s.example.com' % name],
+            'listener_id': (listener or self.listener).id
+        })
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    @mock.patch.object(driver, '_runtime_command')
+    def test_create_certificate(self, runtime_command):
+        cert = self._create_certificate('www', 'PEM1')
+
+        self.haproxy.create_certificate(cert)
+
+        crt_list = self.haproxy._crt_list_path('test_listener')
+        cert_path = self.haproxy._cert_path(cert)
+
+        self.assertIn(
+            '\tbind :443 ssl crt-list %s' % crt_list,
+            self._read(self.haproxy.config_file)
+        )
+        self.assertEqual(
+            '%s www.example.com\n' % cert_path,
+            self._read(crt_list)
+        )
+        self.assertEqual('PEM1', self._read(cert_path))
+
+        # The first certificate changes bind line, restart is required.
+        self.assertTrue(self.haproxy._reload_required)
+        self.assertEqual(0, runtime_command.call_count)
+
+    @mock.patch.object(driver, '_runtime_command')
+    def test_certificate_deduplicated_across_listeners(self,
+                                                       runtime_command):
+        listener2 = db_api.create_listener({
+            'name': 'test_listener2',
+            'protocol': 'http',
+            'protocol_port': 8443,
+            'address': '',
+            'algorithm': 'roundrobin'
+        })
+
+        self._create_certificate('www', 'PEM1')
+        cert = self._create_certificate('api', 'PEM1', listener=listener2)
+
+        self.haproxy.create_certificate(cert)
+
+        pems = [
+            f for f in os.listdir(self.haproxy.certs_dir)
+            if f.endswith('.pem')
+        ]
+
+        self.assertEqual(['%s.pem' % cert.fingerprint], pems)
+
+        for name in ('test_listener', 'test_listener2'):
+            crt_list = os.path.join(
+                self.haproxy.certs_dir,
+                '%s.crtlist' % name
+            )
+
+            self.assertIn(cert.fingerprint, self._read(crt_list))
+
+    @mock.patch.object(driver, '_runtime_command')
+    def test_renew_certificate_at_runtime(self, runtime_command):
+        cert = self._create_certificate('www', 'PEM1')
+
+        self.haproxy.create_certificate(cert)
+
+        old_path = self.haproxy._cert_path(cert)
+
+        cert = db_api.update_certificate('www', {'content': 'PEM2'})
+
+        haproxy = driver.HAProxyDriver()
+        haproxy.config_file = self.haproxy.config_file
+        haproxy.certs_dir = self.haproxy.certs_dir
+
+        haproxy.update_certificate(cert)
+
+        new_path = haproxy._cert_path(cert)
+        crt_list = haproxy._crt_list_path('test_listener')
+
+        commands = [c[0][1] for c in runtime_command.call_args_list]
+
+        self.assertEqual(
+            [
+                'new ssl cert %s' % new_path,
+                'set ssl cert %s <<\nPEM2\n' % new_path,
+                'commit ssl cert %s' % new_path,
+                'add ssl crt-list %s <<\n%s www.example.com\n' %
+                (crt_list, new_path),
+                'del ssl crt-list %s %s' % (crt_list, old_path),
+                'del ssl cert %s' % old_path,
+            ],
+            commands
+        )
+
+        self.assertFalse(haproxy._reload_required)
+        self.assertFalse(os.path.exists(old_path))
+        self.assertEqual('PEM2', self._read(new_path))
+
+    @mock.patch.object(driver.processutils, 'execute')
+    @mock.patch.object(driver, '_runtime_command')
+    def test_renew_certificate_after_restart(self, runtime_command,
+                                             execute):
+        cert = self._create_certificate('www', 'PEM1')
+
+        self.haproxy.create_certificate(cert)
+        self.haproxy.apply_changes()
+
+        execute.assert_called_once_with(
+            'sudo', 'service', 'haproxy', 'restart'
+        )
+
+        cert = db_api.update_certificate('www', {'content': 'PEM2'})
+
+        self.haproxy.update_certificate(cert)
+        self.haproxy.apply_changes()
+
+        # Renewed at runtime, no restart this time.
+        self.assertEqual(1, execute.call_count)
+        self.assertTrue(runtime_command.called)
+
+    @mock.patch.object(driver, '_runtime_command')
+    def test_change_certificate_sni_at_runtime(self, runtime_command):
+        cert = self._create_certificate('www', 'PEM1')
+
+        self.haproxy.create_certificate(cert)
+
+        cert = db_api.update_certificate(
+            'www',
+            {'sni': ['www.example.com', 'example.com']}
+        )
+
+        haproxy = driver.HAProxyDriver()
+        haproxy.config_file = self.haproxy.config_file
+        haproxy.certs_dir = self.haproxy.certs_dir
+
+        haproxy.update_certificate(cert)
+
+        cert_path = haproxy._cert_path(cert)
+        crt_list = haproxy._crt_list_path('test_listener')
+
+        commands = [c[0][1] for c in runtime_command.call_args_list]
+
+        # The path can't be listed twice while the old entry is deleted.
+        self.assertEqual(
+            [
+                'del ssl crt-list %s %s' % (crt_list, cert_path),
+                'add ssl crt-list %s <<\n%s www.example.com example.com\n'
+                % (crt_list, cert_path),
+            ],
+            commands
+        )
+
+        self.assertFalse(haproxy._reload_required)
+
+    @mock.patch.object(driver, '_runtime_command')
+    def test_renew_certificate_runtime_failure(self, runtime_command):
+        runtime_command.side_effect = driver.HAProxyRuntimeError('Unknown')
+
+        cert = self._create_certificate('www', 'PEM1')
+
+        self.haproxy.create_certificate(cert)
+
+        cert = db_api.update_certificate('www', {'content': 'PEM2'})
+
+        haproxy = driver.HAProxyDriver()
+        haproxy.config_file = self.haproxy.config_file
+        haproxy.certs_dir = self.haproxy.certs_dir
+
+        haproxy.update_certificate(cert)
+
+        self.assertTrue(haproxy._reload_required)
+
+
+class HAProxyRuntimeCommandTest(test_base.BaseTest):
+    def _run(self, command, reply):
+        sock = mock.Mock()
+        sock.recv.side_effect = [reply.encode('utf-8'), b'']
+
+        with mock.patch('socket.socket', return_value=sock):
+            return driver._runtime_command('/admin.sock', command)
+
+    def test_success(self):
+        output = self._run(
+            'commit ssl cert /certs/a.pem',
+            'Committing /certs/a.pem\nSuccess!\n'
+        )
+
+        self.assertIn('Success!', output)
+
+    def test_failure(self):
+        # Only the expected reply means success.
+        for reply in ('Committing /certs/a.pem\nFailed!\n',
+                      'No ongoing transaction!\n', ''):
+            self.assertRaises(
+                driver.HAProxyRuntimeError,
+                self._run,
+                'commit ssl cert /certs/a.pem',
+                reply
+            )
+
+
+class HAProxyL7PoliciesTest(test_base.DbTestCase):
+    def setUp(self):
+        super(HAProxyL7PoliciesTest, self).setUp()
+
+        self.haproxy = driver.HAProxyDriver()
+
+        self.listener = db_api.create_listener({
+            'name': 'web',
+            'protocol': 'http',
+            'protocol_port': 80,
+            'address': '',
+            'algorithm': 'roundrobin'
+        })
+
+        for name in ('api', 'static', 'admin'):
+            db_api.create_listener({
+                'name': name,
+                'protocol': 'http',
+                'protocol_port': 8000,
+                'address': '127.0.0.1',
+                'algorithm': 'roundrobin'
+            })
+
+    def _create_l7policy(self, name, position, backend, *rules):
+        return db_api.create_l7policy({
+            'name': name,
+            'position': position,
+            'backend': backend,
+            'rules': list(rules),
+            'listener_id': self.listener.id
+        })
+
+    def _save_config(self):
+        replace_file = mock.patch.object(file_utils, 'replace_file').start()
+        self.addCleanup(mock.patch.stopall)
+
+        self.haproxy.create_l7policy(None)
+
+        return dict((c[0][0], c[0][1]) for c in replace_file.call_args_list)
+
+    def test_single_policy_uses_acl(self):
+        self._create_l7policy(
+            'p1', 1, 'api',
+            {'type': 'path_prefix', 'value': '/api'}
+        )
+
+        files = self._save_config()
+        config_data = files[self.haproxy.config_file]
+
+        self.assertIn('\tacl web_l7_0 path -m beg /api', config_data)
+        self.assertIn('\tuse_backend api if web_l7_0', config_data)
+
+    def test_policies_sharing_matcher_use_map(self):
+        self._create_l7policy(
+            'p1', 1, 'api',
+            {'type': 'host', 'value': 'API.example.com'}
+        )
+        self._create_l7policy(
+            'p2', 2, 'static',
+            {'type': 'host', 'value': 'static.example.com'}
+        )
+        self._create_l7policy(
+            'p3', 3, 'admin',
+            {'type': 'host', 'value': 'api.example.com'}
+        )
+
+        files = self._save_config()
+
+        map_path = os.path.join(self.haproxy.maps_dir, 'web_0.map')
+        lookup = 'req.hdr(host),field(1,:),lower,map_str(%s)' % map_path
+
+        self.assertIn(
+            '\tuse_backend %%[%s] if { %s -m found }' % (lookup, lookup),
+            files[self.haproxy.config_file]
+        )
+        self.assertNotIn('acl', files[self.haproxy.config_file])
+
+        # Duplicate key of a later policy is dropped.
+        self.assertEqual(
+            'api.example.com api\nstatic.example.com static\n',
+            files[map_path]
+        )
+
+    def test_shadowed_path_prefix_dropped(self):
+        self._create_l7policy(
+            'p1', 1, 'api',
+            {'type': 'path_prefix', 'value': '/api/v2'}
+        )
+        self._create_l7policy(
+            'p2', 2, 'static',
+            {'type': 'path_prefix', 'value': '/api'}
+        )
+        self._create_l7policy(
+            'p3', 3, 'admin',
+            {'type': 'path_prefix', 'value': '/api/v2/admin'}
+        )
+
+        files = self._save_config()
+
+        map_path = os.path.join(self.haproxy.maps_dir, 'web_0.map')
+
+        self.assertEqual('/api/v2 api\n/api static\n', files[map_path])
+
+    def test_compound_policies_share_acls(self):
+        self._create_l7policy(
+            'p1', 1, 'admin',
+            {'type': 'path_prefix', 'value': '/admin'},
+            {'type': 'method', 'value': 'post'}
+        )
+        self._create_l7policy(
+            'p2', 2, 'api',
+            {'type': 'header', 'key': 'X-Api', 'value': '1'},
+            {'type': 'method', 'value': 'POST'}
+        )
+
+        config_data = self._save_config()[self.haproxy.config_file]
+
+        self.assertIn('\tacl web_l7_0 path -m beg /admin', config_data)
+        self.assertIn('\tacl web_l7_1 method -m str POST', config_data)
+        self.assertIn('\tacl web_l7_2 req.hdr(X-Api) -m str 1', config_data)
+        self.assertEqual(3, config_data.count('\tacl '))
+
+        self.assertLess(
+            config_data.index('\tuse_backend admin if web_l7_0 web_l7_1'),
+            config_data.index('\tuse_backend api if web_l7_2 web_l7_1')
+        )
+
+    def test_order_is_kept_between_groups(self):
+        self._create_l7policy(
+            'p1', 1, 'api',
+            {'type': 'host', 'value': 'a.example.com'}
+        )
+        self._create_l7policy(
+            'p2', 2, 'admin',
+            {'type': 'path_prefix', 'value': '/admin'}
+        )
+        self._create_l7policy(
+            'p3', 3, 'static',
+            {'type': 'host', 'value': 'b.example.com'}
+        )
+
+        config_data = self._save_config()[self.haproxy.config_file]
+
+        self.assertLess(
+            config_data.index('use_backend api'),
+            config_data.index('use_backend admin')
+        )
+        self.assertLess(
+            config_data.index('use_backend admin'),
+            config_data.index('use_backend static')
+        )
+
+
+class HAProxySharedFrontendTest(test_base.DbTestCase):
+    def setUp(self):
+        super(HAProxySharedFrontendTest, self).setUp()
+
+        self.haproxy = driver.HAProxyDriver()
+
+        self.replace_file = mock.patch.object(
+            file_utils,
+            'replace_file'
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _create_listener(self, name, server_name=None, protocol='http',
+                         port=80, **kwargs):
+        values = {
+            'name': name,
+            'protocol': protocol,
+            'protocol_port': port,
+            'address': '0.0.0.0',
+            'algorithm': 'roundrobin',
+            'server_name': server_name
+        }
+        values.update(kwargs)
+
+        return self.haproxy.create_listener(db_api.create_listener(values))
+
+    def _files(self):
+        return dict(
+            (c[0][0], c[0][1]) for c in self.replace_file.call_args_list
+        )
+
+    def test_listeners_share_frontend(self):
+        self._create_listener('default')
+        self._create_listener('www', server_name='WWW.example.com')
+        self._create_listener('api', server_name='api.example.com')
+
+        files = self._files()
+        config_data = files[self.haproxy.config_file]
+
+        hosts_map = os.path.join(
+            self.haproxy.maps_dir,
+            'shared_0_0_0_0_80_hosts.map'
+        )
+        lookup = 'req.hdr(host),field(1,:),lower,map_str(%s)' % hosts_map
+
+        self.assertIn('frontend shared_0_0_0_0_80', config_data)
+        self.assertEqual(1, config_data.count('frontend '))
+        self.assertEqual(1, config_data.count('\tbind 0.0.0.0:80'))
+        self.assertIn('\tdefault_backend default', config_data)
+        self.assertIn(
+            '\tuse_backend %%[%s] if { %s -m found }' % (lookup, lookup),
+            config_data
+        )
+
+        for name in ('default', 'www', 'api'):
+            self.assertIn('backend %s' % name, config_data)
+
+        self.assertEqual(
+            'api.example.com api\nwww.example.com www\n',
+            files[hosts_map]
+        )
+
+    def test_tcp_listeners_route_by_sni(self):
+        self._create_listener(
+            'www',
+            server_name='www.example.com',
+            protocol='tcp',
+            port=443
+        )
+        self._create_listener(
+            'api',
+            server_name='api.example.com',
+            protocol='tcp',
+            port=443
+        )
+
+        config_data = self._files()[self.haproxy.config_file]
+
+        self.assertIn(
+            '\ttcp-request content accept if { req_ssl_hello_type 1 }',
+            config_data
+        )
+        self.assertIn('req.ssl_sni,lower,map_str(', config_data)
+        self.assertNotIn('default_backend', config_data)
+
+    def test_l7_policies_in_shared_frontend(self):
+        self._create_listener('default')
+        www = self._create_listener('www', server_name='www.example.com')
+
+        db_api.create_l7policy({
+            'name': 'p1',
+            'backend': 'default',
+            'rules': [{'type': 'path_prefix', 'value': '/static'}],
+            'listener_id': www.id
+        })
+
+        self.haproxy.create_l7policy(None)
+
+        config_data = self._files()[self.haproxy.config_file]
+
+        self.assertIn(
+            '\tacl www_host req.hdr(host),field(1,:),lower -m str '
+            'www.example.com',
+            config_data
+        )
+        self.assertIn('\tuse_backend default if www_l7_0 www_host',
+                      config_data)
+
+    def test_different_ports_not_shared(self):
+        self._create_listener('www', server_name='www.example.com')
+        self._create_listener('api', server_name='api.example.com',
+                              port=8080)
+
+        config_data = self._files()[self.haproxy.config_file]
+
+        self.assertIn('frontend www', config_data)
+        self.assertIn('frontend api', config_data)
+
+    def test_conflict_both_without_server_name(self):
+        self._create_listener('www')
+
+        self.assertRaises(
+            exc.ConflictException,
+            self._create_listener,
+            'api'
+        )
+
+    def test_conflict_same_server_name(self):
+        self._create_listener('www', server_name='www.example.com')
+
+        self.assertRaises(
+            exc.ConflictException,
+            self._create_listener,
+            'api',
+            server_name='WWW.example.com'
+        )
+
+    def test_conflict_protocol(self):
+        self._create_listener('www', server_name='www.example.com')
+
+        self.assertRaises(
+            exc.ConflictException,
+            self._create_listener,
+            'api',
+            server_name='api.example.com',
+            protocol='tcp'
+        )
+
+    def test_conflict_ssl_options(self):
+        self._create_listener(
+            'www',
+            server_name='www.example.com',
+            ssl_info={'path': '/config/www.pem', 'options': ['no-sslv3']}
+        )
+
+        self.assertRaises(
+            exc.ConflictException,
+            self._create_listener,
+            'api',
+            server_name='api.example.com',
+            ssl_info={'path': '/config/api.pem', 'options': ['no-tlsv10']}
+        )
+
+    def test_conflict_ssl_and_plain(self):
+        self._create_listener('www', server_name='www.example.com')
+
+        self.assertRaises(
+            exc.ConflictException,
+            self._create_listener,
+            'api',
+            server_name='api.example.com',
+            ssl_info={'path': '/config/api.pem', 'options': ['no-sslv3']}
+        )
+
+    def test_conflict_certificate_on_plain(self):
+        self._create_listener('www', server_name='www.example.com')
+        api = self._create_listener('api', server_name='api.example.com')
+
+        cert = db_api.create_certificate({
+            'name': 'api',
+            'content': 'PEM1',
+            'sni': ['api.example.com'],
+            'listener_id': api.id
+        })
+
+        self.assertRaises(
+            exc.ConflictException,
+            self.haproxy.create_certificate,
+            cert
+        )
+
+    def test_ssl_options_from_group(self):
+        www = db_api.create_listener({
+            'name': 'www',
+            'protocol': 'http',
+            'protocol_port': 443,
+            'address': '0.0.0.0',
+            'algorithm': 'roundrobin',
+            'server_name': 'www.example.com'
+        })
+        db_api.create_certificate({
+            'name': 'www',
+            'content': 'PEM1',
+            'sni': ['www.example.com'],
+            'listener_id': www.id
+        })
+
+        self.haproxy.create_listener(db_api.get_listener('www'))
+
+        self._create_listener(
+            'api',
+            server_name='api.example.com',
+            port=443,
+            ssl_info={
+                'path': '/config/api.pem',
+                'options': ['no-sslv3'],
+                'ciphers': 'HIGH'
+            }
+        )
+
+        config_data = self._files()[self.haproxy.config_file]
+
+        self.assertIn('crt /config/api.pem crt-list ', config_data)
+        self.assertIn(' no-sslv3 HIGH', config_data)
+
+    def test_conflict_options(self):
+        self._create_listener(
+            'www',
+            server_name='www.example.com',
+            options={'timeout': 'client 10s'}
+        )
+
+        self.assertRaises(
+            exc.ConflictException,
+            self._create_listener,
+            'api',
+            server_name='api.example.com',
+            options={'timeout': 'client 20s'}
+        )
@@ -0,0 +1,84 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import eventlet
+import mock
+from oslo_config import cfg
+
+from lbaas.tests.unit import base
+
+# The module patches the standard library on import.
+with mock.patch.object(eventlet, 'monkey_patch'):
+    from lbaas.cmd import launch
+
+
+class LaunchApiTest(base.BaseTest):
+    def setUp(self):
+        super(LaunchApiTest, self).setUp()
+
+        overrides = {
+            'workers': 1,
+            'pool_size': 10,
+            'backlog': 64,
+            'keep_alive': False,
+            'client_socket_timeout': 30
+        }
+
+        for name, value in overrides.items():
+            cfg.CONF.set_override(name, value, group='api')
+
+            self.addCleanup(cfg.CONF.clear_override, name, 'api')
+
+        for name in ('check_db', 'dispose_db'):
+            patcher = mock.patch.object(launch.db_api, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(launch.app, 'setup_app')
+        self.setup_app = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch.object(launch.wsgi, 'server')
+    @mock.patch.object(launch.eventlet, 'listen')
+    def test_server_options(self, mock_listen, mock_server):
+        launch.launch_api([])
+
+        mock_listen.assert_called_once_with(
+            (cfg.CONF.api.host, cfg.CONF.api.port),
+            backlog=64,
+            reuse_port=False
+        )
+
+        self.assertEqual(1, mock_server.call_count)
+
+        args, kwargs = mock_server.call_args
+
+        self.assertEqual(
+            (mock_listen.return_value, self.setup_app.return_value),
+            args
+        )
+        self.assertEqual(10, kwargs['custom_pool'].size)
+        self.assertFalse(kwargs['keepalive'])
+        self.assertEqual(30, kwargs['socket_timeout'])
+
+    @mock.patch.object(launch.wsgi, 'server')
+    @mock.patch.object(launch.eventlet, 'listen')
+    def test_no_socket_timeout(self, mock_listen, mock_server):
+        cfg.CONF.set_override('client_socket_timeout', 0, group='api')
+
+        launch.launch_api([])
+
+        _, kwargs = mock_server.call_args
+
+        self.assertIsNone(kwargs['socket_timeout'])
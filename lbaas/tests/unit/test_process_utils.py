@@ -0,0 +1,67 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import os
+import signal
+import tempfile
+import time
+
+import mock
+
+from lbaas.tests.unit import base
+from lbaas.utils import process_utils
+
+
+class SupervisorTest(base.BaseTest):
+    def setUp(self):
+        super(SupervisorTest, self).setUp()
+
+        fd, self.pid_file = tempfile.mkstemp()
+        os.close(fd)
+
+        self.addCleanup(os.remove, self.pid_file)
+
+    def _read_pids(self):
+        with open(self.pid_file) as f:
+            return f.read().split()
+
+    def _worker(self):
+        with open(self.pid_file, 'a') as f:
+            f.write('%d\n' % os.getpid())
+
+        # The first workers exit right away, the next ones wait for the
+        # signal forwarded by the supervisor.
+        if len(self._read_pids()) >= 4:
+            os.kill(os.getppid(), signal.SIGTERM)
+
+            time.sleep(10)
+
+    @mock.patch.object(process_utils, '_RESTART_DELAY', 0)
+    def test_run(self):
+        handler = signal.getsignal(signal.SIGTERM)
+
+        started_at = time.time()
+
+        process_utils.Supervisor(self._worker, 2).run()
+
+        pids = self._read_pids()
+
+        # Dead workers were started again.
+        self.assertGreaterEqual(len(set(pids)), 4)
+        self.assertNotIn(str(os.getpid()), pids)
+
+        # The waiting workers were stopped.
+        self.assertLess(time.time() - started_at, 10)
+
+        self.assertEqual(handler, signal.getsignal(signal.SIGTERM))
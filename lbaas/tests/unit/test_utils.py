@@ -0,0 +1,93 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import threading
+
+import eventlet
+import mock
+
+from lbaas.tests.unit import base
+from lbaas import utils
+
+
+class ContextLocalTest(base.BaseTest):
+    use_contextvars = utils._USE_CONTEXTVARS
+
+    def setUp(self):
+        super(ContextLocalTest, self).setUp()
+
+        with mock.patch.object(utils, '_USE_CONTEXTVARS',
+                               self.use_contextvars):
+            self.local = utils.ContextLocal('test_context_local')
+
+        self.addCleanup(self.local.set, None)
+
+    def _get_in_greenthread(self, value):
+        self.assertIsNone(self.local.get())
+
+        self.local.set(value)
+
+        eventlet.sleep(0)
+
+        return self.local.get()
+
+    def test_get_not_set(self):
+        self.assertIsNone(self.local.get())
+
+    def test_set(self):
+        self.local.set('value')
+
+        self.assertEqual('value', self.local.get())
+
+    def test_set_falsy(self):
+        self.local.set('value')
+        self.local.set(0)
+
+        self.assertEqual(0, self.local.get())
+
+    def test_greenthreads_isolated(self):
+        self.local.set('main')
+
+        threads = [
+            eventlet.spawn(self._get_in_greenthread, i) for i in range(5)
+        ]
+
+        self.assertEqual(list(range(5)), [t.wait() for t in threads])
+        self.assertEqual('main', self.local.get())
+
+    def test_threads_isolated(self):
+        self.local.set('main')
+
+        result = []
+
+        thread = threading.Thread(
+            target=lambda: result.append(self.local.get())
+        )
+
+        thread.start()
+        thread.join()
+
+        self.assertEqual([None], result)
+        self.assertEqual('main', self.local.get())
+
+    def test_dead_greenthreads_forgotten(self):
+        for i in range(5):
+            # A new greenthread may get the id of a dead one.
+            eventlet.spawn(self.local.set, 'value').wait()
+
+            self.assertIsNone(eventlet.spawn(self.local.get).wait())
+
+
+class GreenletContextLocalTest(ContextLocalTest):
+    use_contextvars = False
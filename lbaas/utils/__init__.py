@@ -26,9 +26,11 @@ import socket
 import tempfile
 import threading
 import uuid
+import weakref
 
 import eventlet
 from eventlet import corolocal
+import greenlet
 from oslo_concurrency import processutils
 import pkg_resources as pkg
 import random
@@ -36,6 +38,12 @@ import random
 from lbaas import exceptions as exc
 from lbaas import version
 
+try:
+    import contextvars
+except ImportError:
+    # Python 2.
+    contextvars = None
+
 
 # Thread local storage.
 _th_loc_storage = threading.local()
@@ -93,6 +101,49 @@ def set_thread_local(var_name, val):
         gl_storage[var_name] = val
 
 
+# Context variables are greenthread local only if greenlets run in their
+# own contexts (greenlet >= 0.4.17), otherwise all greenthreads of a thread
+# would share them.
+_USE_CONTEXTVARS = (
+    contextvars is not None
+    and hasattr(greenlet.getcurrent(), 'gr_context')
+)
+
+
+class ContextLocal(object):
+    """A variable having its own value in each greenthread and thread.
+
+    It's a single context variable lookup per call where supported, and
+    a lookup by the current greenlet otherwise. Any value is stored,
+    falsy ones included. get() returns None if the value was not set in
+    the current greenthread.
+    """
+
+    def __init__(self, name):
+        if _USE_CONTEXTVARS:
+            var = contextvars.ContextVar(name, default=None)
+
+            self.get = var.get
+            self.set = var.set
+
+            return
+
+        # Keyed by the greenlet itself rather than by its id, which a
+        # new greenlet may reuse once it's dead. Greenlets of different
+        # threads are different too.
+        values = weakref.WeakKeyDictionary()
+        getcurrent = greenlet.getcurrent
+
+        def get():
+            return values.get(getcurrent())
+
+        def set(value):
+            values[getcurrent()] = value
+
+        self.get = get
+        self.set = set
+
+
 def log_exec(logger, level=logging.DEBUG):
     """Decorator for logging function execution.
 
@@ -25,9 +25,30 @@ def replace_file(file_name, data, file_mode=0o644):
     """
 
     base_dir = os.path.dirname(os.path.abspath(file_name))
+
+    if not os.path.isdir(base_dir):
+        os.makedirs(base_dir)
+
     with tempfile.NamedTemporaryFile('w+',
                                      dir=base_dir,
                                      delete=False) as tmp_file:
         tmp_file.write(data)
     os.chmod(tmp_file.name, file_mode)
     os.rename(tmp_file.name, file_name)
+
+
+def read_file(file_name):
+    """Returns the contents of file_name or None if it does not exist."""
+
+    if not os.path.isfile(file_name):
+        return None
+
+    with open(file_name) as f:
+        return f.read()
+
+
+def remove_file(file_name):
+    """Removes file_name, ignoring the case when it is already absent."""
+
+    if os.path.isfile(file_name):
+        os.remove(file_name)
@@ -0,0 +1,167 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import errno
+import os
+import signal
+import time
+
+import eventlet
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# Forwarded to the workers, then the supervisor stops.
+_STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+# Forwarded to the workers, which are started again once they exited.
+_RESTART_SIGNALS = (signal.SIGHUP,)
+
+# Workers which exited sooner than this many seconds after being started
+# are started again only after that long, so a worker failing at start
+# doesn't make the supervisor spin.
+_RESTART_DELAY = 1
+
+_SIGNALS = _STOP_SIGNALS + _RESTART_SIGNALS
+
+
+def _block_signals():
+    # Python 2 can't do it.
+    if hasattr(signal, 'pthread_sigmask'):
+        signal.pthread_sigmask(signal.SIG_BLOCK, _SIGNALS)
+
+
+def _unblock_signals():
+    if hasattr(signal, 'pthread_sigmask'):
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, _SIGNALS)
+
+
+class Supervisor(object):
+    """Runs a function in pre-forked worker processes.
+
+    Workers which exit, whatever the reason, are started again.
+
+    :param target: Function run by the workers.
+    :param workers: Number of workers.
+    """
+
+    def __init__(self, target, workers):
+        self.target = target
+        self.workers = workers
+
+        # Start times of the workers by PID.
+        self._children = {}
+        self._running = False
+
+    def run(self):
+        """Runs the workers until SIGTERM or SIGINT.
+
+        Returns once all the workers exited.
+        """
+        self._running = True
+
+        handlers = {}
+
+        for signum in _STOP_SIGNALS:
+            handlers[signum] = signal.signal(signum, self._stop)
+
+        for signum in _RESTART_SIGNALS:
+            handlers[signum] = signal.signal(signum, self._forward)
+
+        try:
+            while self._running or self._children:
+                while self._running and len(self._children) < self.workers:
+                    self._start_worker()
+
+                self._wait_worker()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def _start_worker(self):
+        # Signals are held until the worker restores the default handlers,
+        # one received in between would be lost otherwise.
+        _block_signals()
+
+        try:
+            pid = os.fork()
+
+            if pid == 0:
+                self._run_worker()
+
+            self._children[pid] = time.time()
+        finally:
+            _unblock_signals()
+
+        LOG.info("Started API worker (PID=%s)" % pid)
+
+    def _run_worker(self):
+        for signum in _SIGNALS:
+            signal.signal(signum, signal.SIG_DFL)
+
+        _unblock_signals()
+
+        # The hub is shared with the parent, the worker needs its own.
+        eventlet.hubs.use_hub()
+
+        status = 1
+
+        try:
+            self.target()
+
+            status = 0
+        except Exception:
+            LOG.exception("API worker failed (PID=%s)" % os.getpid())
+        finally:
+            # Never return to the supervisor loop of the parent.
+            os._exit(status)
+
+    def _wait_worker(self):
+        try:
+            pid, status = os.waitpid(-1, 0)
+        except OSError as e:
+            if e.errno != errno.ECHILD:
+                raise
+
+            self._children.clear()
+
+            return
+
+        started_at = self._children.pop(pid, None)
+
+        if started_at is None:
+            return
+
+        if os.WIFSIGNALED(status):
+            reason = "signal %s" % os.WTERMSIG(status)
+        else:
+            reason = "exit code %s" % os.WEXITSTATUS(status)
+
+        LOG.info("API worker exited (PID=%s, %s)" % (pid, reason))
+
+        if self._running and time.time() - started_at < _RESTART_DELAY:
+            time.sleep(_RESTART_DELAY)
+
+    def _stop(self, signum, frame):
+        self._running = False
+
+        self._forward(signum, frame)
+
+    def _forward(self, signum, frame):
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                # Exited already.
+                pass
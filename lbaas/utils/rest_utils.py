@@ -14,17 +14,69 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import datetime
 import functools
 import json
 
+import itertools
+
+import msgpack
 import pecan
 import six
+from webob import etag
 from webob import Response
+from wsme import api as wsme_api
 from wsme import exc
+from wsme.rest import args as wsme_args
+from wsme.rest import json as wsme_json
+from wsme import types as wtypes
 
 from lbaas import exceptions as ex
 
 
+NDJSON = 'application/x-ndjson'
+MSGPACK = 'application/x-msgpack'
+
+
+class MsgPackRenderer(object):
+    """Pecan renderer of wsexpose'd results as MessagePack.
+
+    Results are converted the way they are for JSON, so both have
+    the same schema.
+    """
+
+    def __init__(self, path, extra_vars):
+        pass
+
+    @staticmethod
+    def render(template_path, namespace):
+        if 'faultcode' in namespace:
+            return msgpack.packb(namespace, use_bin_type=True)
+
+        return msgpack.packb(
+            wsme_json.tojson(namespace['datatype'], namespace['result']),
+            use_bin_type=True
+        )
+
+
+# Registered as 'wsmemsgpack' by the app.
+RENDERERS = {'wsmemsgpack': MsgPackRenderer}
+
+
+@wsme_args.from_param.when_type(wtypes.BaseMeta)
+def _complex_from_param(datatype, value):
+    # Complex arguments come from request bodies. Those of MessagePack
+    # bodies are passed decoded, see read_msgpack_body().
+    if value is None or isinstance(value, datatype):
+        return value
+
+    try:
+        return wsme_json.fromjson(datatype, value)
+    except ValueError as e:
+        # The argument name is unknown here.
+        raise exc.InvalidInput(datatype.__name__, value, e.args[0])
+
+
 def wrap_wsme_controller_exception(func):
     """Decorator for controllers method.
 
@@ -96,3 +148,178 @@ def validate_fields(fields, object_fields):
         raise exc.ClientSideError(
             'Field(s) %s are invalid.' % ', '.join(invalid_fields)
         )
+
+
+def select_fields(d, fields):
+    """Returns a copy of the resource dictionary holding only the fields.
+
+    Id is always kept. All fields are kept if none are given.
+
+    :param d: Resource dictionary.
+    :param fields: A list of fields requested by the user.
+    """
+    if not fields:
+        return d
+
+    return dict(
+        (k, v) for k, v in d.items() if k == 'id' or k in fields
+    )
+
+
+def row_to_dict(fields, row):
+    """Converts a row of a column query into a resource dictionary.
+
+    :param fields: Names of the queried columns.
+    :param row: Values of the queried columns, in the same order.
+    """
+    d = dict(zip(fields, row))
+
+    for key, val in d.items():
+        if isinstance(val, datetime.datetime):
+            d[key] = val.isoformat(' ')
+
+    return d
+
+
+def get_if_match_version():
+    """Returns the object version required by If-Match, or None.
+
+    Objects are versioned by integers, so other entity tags never match.
+    """
+    if_match = pecan.request.if_match
+
+    if if_match is etag.AnyETag:
+        return None
+
+    # Weak ones are dropped, they never match (RFC 7232, 3.1).
+    if not if_match.etags:
+        raise ex.PreconditionFailedException(
+            "If-Match must hold the version of the object, e.g. \"3\","
+            " weak entity tags never match [If-Match=%s]" %
+            pecan.request.headers['If-Match']
+        )
+
+    if len(if_match.etags) != 1:
+        raise ex.InputException(
+            "If-Match must hold one entity tag [If-Match=%s]" % if_match
+        )
+
+    version = if_match.etags[0]
+
+    if not version.isdigit():
+        raise ex.PreconditionFailedException(
+            "Entity tag doesn't match [If-Match=%s]" % if_match
+        )
+
+    return int(version)
+
+
+def set_version_etag(db_model):
+    """Sets the weak ETag of the response to the version of the object."""
+    version = getattr(db_model, 'version', None)
+
+    if version is not None:
+        pecan.response.etag = (str(version), False)
+
+
+def _accept(func, renderer, content_type):
+    func = pecan.expose(renderer, content_type=content_type)(func)
+
+    # Copied to the wsexposed method along with the pecan configuration.
+    func.negotiated = True
+
+    return func
+
+
+def is_negotiated(controller):
+    """Returns True if responses of the controller depend on Accept."""
+    return getattr(controller, 'negotiated', False)
+
+
+def accept_ndjson(func):
+    """Decorator letting a wsexposed method be asked for NDJSON.
+
+    Apply it right below wsexpose. Responses which aren't streamed,
+    e.g. errors, are then single JSON documents, i.e. a single line.
+    """
+    return _accept(func, 'wsmejson:', NDJSON)
+
+
+def accept_msgpack(func):
+    """Decorator letting a wsexposed method speak MessagePack.
+
+    Apply it right below wsexpose. Responses are sent as MessagePack if
+    asked with an Accept header. Request bodies are read as MessagePack
+    if their Content-Type says so, see read_msgpack_body().
+    """
+    return _accept(func, 'wsmemsgpack:', MSGPACK)
+
+
+def read_msgpack_body(funcdef, body):
+    """Returns the arguments held by a MessagePack request body.
+
+    As with JSON, the body is either the body argument or a map of
+    arguments by name. WSME only parses JSON and XML bodies, so the
+    arguments are passed to the wsexposed method as keyword arguments,
+    and complex ones are read into their WSME types straight from the
+    decoded data along with the others.
+
+    :param funcdef: WSME definition of the method.
+    :param body: Request body.
+    """
+    try:
+        data = msgpack.unpackb(body, raw=False)
+    except (msgpack.UnpackException, TypeError, ValueError):
+        raise exc.ClientSideError(
+            "Request is not in valid MessagePack format"
+        )
+
+    if funcdef.body_type is not None:
+        return {funcdef.arguments[-1].name: data}
+
+    if not isinstance(data, dict):
+        raise exc.ClientSideError("Request must be a MessagePack map")
+
+    unknown = set(data) - set(a.name for a in funcdef.arguments)
+
+    if unknown and not funcdef.ignore_extra_args:
+        raise exc.UnknownArgument(', '.join(sorted(unknown)))
+
+    return dict((k, v) for k, v in data.items() if k not in unknown)
+
+
+def is_stream_requested(stream=False):
+    """Returns True if the client asked for a NDJSON stream.
+
+    :param stream: Value of the stream query parameter.
+    """
+    return bool(stream) or pecan.request.pecan['content_type'] == NDJSON
+
+
+def stream_ndjson(datatype, pages):
+    """Sends objects as the response body, one JSON document per line.
+
+    The first page is read right away, so its errors are still reported
+    by the response status. The others are read and sent one by one
+    while the client receives the response.
+
+    :param datatype: WSME type of the objects.
+    :param pages: Iterable of lists of objects.
+    :return: Result for the wsexpose'd method to return.
+    """
+    pages = iter(pages)
+    first = next(pages, [])
+
+    def _chunks():
+        for page in itertools.chain([first], pages):
+            if page:
+                yield ''.join(
+                    json.dumps(wsme_json.tojson(datatype, obj)) + '\n'
+                    for obj in page
+                ).encode('utf-8')
+
+    pecan.response.app_iter = _chunks()
+    pecan.response.content_length = None
+    pecan.request.pecan['override_content_type'] = NDJSON
+
+    return wsme_api.Response(None, status_code=200, return_type=None)
@@ -0,0 +1,78 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Per-call overhead of the DB session registry.
+
+Each iteration does what session_aware does around a DB API call
+without a transaction in progress: get the session, set it, get it
+again and reset it.
+
+Usage: python tools/benchmarks/context_local.py [iterations]
+"""
+
+import sys
+import timeit
+
+import mock
+
+from lbaas import utils
+
+
+_NAME = 'benchmark_session'
+_SESSION = object()
+
+
+def greenlet_local():
+    utils.get_thread_local(_NAME)
+    utils.set_thread_local(_NAME, _SESSION)
+    utils.get_thread_local(_NAME)
+    utils.set_thread_local(_NAME, None)
+
+
+_local = utils.ContextLocal(_NAME)
+
+# The registry used where greenlets have no context of their own.
+with mock.patch.object(utils, '_USE_CONTEXTVARS', False):
+    _greenlet_local = utils.ContextLocal(_NAME)
+
+
+def context_local():
+    _local.get()
+    _local.set(_SESSION)
+    _local.get()
+    _local.set(None)
+
+
+def context_local_fallback():
+    _greenlet_local.get()
+    _greenlet_local.set(_SESSION)
+    _greenlet_local.get()
+    _greenlet_local.set(None)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    print("Context variables in use: %s" % utils._USE_CONTEXTVARS)
+
+    for func in (greenlet_local, context_local, context_local_fallback):
+        best = min(timeit.repeat(func, number=number, repeat=5))
+
+        print(
+            "%-22s %.3f usec per call" % (func.__name__, best / number * 1e6)
+        )
+
+
+if __name__ == '__main__':
+    main()
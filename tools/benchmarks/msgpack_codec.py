@@ -0,0 +1,125 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Cost of encoding and decoding member lists, JSON vs MessagePack.
+
+Measures, for a list of members:
+
+* server encode: the API renders a Members result;
+* client decode: a client reads the response body into dicts;
+* client encode: a client builds a PUT /v1/members/bulk body;
+* server decode: the API reads that body into a Members object.
+
+The server decodes both formats into plain data first, then builds
+the WSME objects from it the same way.
+
+Usage: python tools/benchmarks/msgpack_codec.py [members]
+"""
+
+import json
+import sys
+import timeit
+
+import msgpack
+from wsme.rest import json as wsme_json
+
+from lbaas.api.controllers.v1 import member as member_resource
+from lbaas.utils import rest_utils
+
+
+def _make_members(count):
+    now = '2016-01-01 00:00:00'
+
+    return member_resource.Members(members=[
+        member_resource.Member(
+            id='%036d' % i,
+            name='member%d' % i,
+            description='Member %d' % i,
+            address='10.0.%d.%d' % (i // 256 % 256, i % 256),
+            protocol='http',
+            protocol_port=8080,
+            tags=['web', 'zone-%d' % (i % 3)],
+            version=1,
+            created_at=now,
+            updated_at=now
+        )
+        for i in range(count)
+    ])
+
+
+def _server_decode_json(body):
+    return wsme_json.parse(body, {'bulk': member_resource.Members}, True)
+
+
+def _server_decode_msgpack(body):
+    data = msgpack.unpackb(body, raw=False)
+
+    return wsme_json.fromjson(member_resource.Members, data)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    members = _make_members(count)
+    namespace = {'datatype': member_resource.Members, 'result': members}
+
+    json_body = wsme_json.encode_result(members, member_resource.Members)
+    msgpack_body = rest_utils.MsgPackRenderer.render(None, namespace)
+    data = json.loads(json_body)
+
+    # Both must hold the same data.
+    assert data == msgpack.unpackb(msgpack_body, raw=False)
+
+    print("Body size: JSON %d bytes, MessagePack %d bytes" %
+          (len(json_body), len(msgpack_body)))
+
+    cases = [
+        (
+            'server encode',
+            lambda: wsme_json.encode_result(
+                members,
+                member_resource.Members
+            ),
+            lambda: rest_utils.MsgPackRenderer.render(None, namespace)
+        ),
+        (
+            'client decode',
+            lambda: json.loads(json_body),
+            lambda: msgpack.unpackb(msgpack_body, raw=False)
+        ),
+        (
+            'client encode',
+            lambda: json.dumps(data),
+            lambda: msgpack.packb(data, use_bin_type=True)
+        ),
+        (
+            'server decode',
+            lambda: _server_decode_json(json_body),
+            lambda: _server_decode_msgpack(msgpack_body)
+        )
+    ]
+
+    for name, json_func, msgpack_func in cases:
+        results = [
+            min(timeit.repeat(func, number=1, repeat=5))
+            for func in (json_func, msgpack_func)
+        ]
+
+        print("%-14s JSON %7.1f msec, MessagePack %7.1f msec, %.1fx" %
+              (name, results[0] * 1e3, results[1] * 1e3,
+               results[0] / results[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# Copyright 2016 - Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Cost of turning DB models into API resources.
+
+Converts members the way GET /v1/members does, with
+Member.from_dict(db_model.to_dict()), and compares it with the
+per-column introspection done before the conversion was precompiled.
+
+Usage: python tools/benchmarks/serialization.py [members]
+"""
+
+import datetime
+import sys
+import timeit
+
+from sqlalchemy.orm import attributes
+
+from lbaas.api.controllers.v1 import member as member_resource
+from lbaas.db.sqlalchemy import model_base
+from lbaas.db.v1.sqlalchemy import models
+
+
+def _generic_to_dict(db_model):
+    d = {}
+
+    unloaded = attributes.instance_state(db_model).unloaded
+
+    for col in db_model.__table__.columns:
+        if col.name not in unloaded and hasattr(db_model, col.name):
+            d[col.name] = getattr(db_model, col.name)
+
+    model_base.datetime_to_str(d, 'created_at')
+    model_base.datetime_to_str(d, 'updated_at')
+
+    return d
+
+
+def _generic_from_dict(cls, d):
+    obj = cls()
+
+    for key, val in d.items():
+        if hasattr(obj, key):
+            setattr(obj, key, val)
+
+    return obj
+
+
+def _make_members(count):
+    now = datetime.datetime.utcnow()
+
+    return [
+        models.Member(
+            id='%036d' % i,
+            name='member%d' % i,
+            description='Member %d' % i,
+            address='10.0.%d.%d' % (i // 256 % 256, i % 256),
+            protocol='http',
+            protocol_port=8080,
+            tags=['web', 'zone-%d' % (i % 3)],
+            version=1,
+            created_at=now,
+            updated_at=now
+        )
+        for i in range(count)
+    ]
+
+
+def generic(members):
+    return [
+        _generic_from_dict(member_resource.Member, _generic_to_dict(m))
+        for m in members
+    ]
+
+
+def precompiled(members):
+    return [member_resource.Member.from_dict(m.to_dict()) for m in members]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    members = _make_members(count)
+
+    # Both must give the same resources.
+    assert (
+        [r.to_dict() for r in generic(members[:10])] ==
+        [r.to_dict() for r in precompiled(members[:10])]
+    )
+
+    results = {}
+
+    for func in (generic, precompiled):
+        results[func] = min(
+            timeit.repeat(lambda: func(members), number=1, repeat=5)
+        )
+
+        print("%-12s %.1f msec per %d members" %
+              (func.__name__, results[func] * 1e3, count))
+
+    print("Speedup: %.1fx" % (results[generic] / results[precompiled]))
+
+
+if __name__ == '__main__':
+    main()